@@ -57,6 +57,10 @@ app.register_blueprint(utility_bp)
 
 @app.route('/health')
 def health_check():
+    # Not ready until the ephemeris warm-up has finished (see panchang.start_warm_up)
+    from modules import panchang
+    if not panchang.is_ready():
+        return 'STARTING', 503
     return 'OK', 200
 
 @app.before_request
@@ -130,6 +134,14 @@ else:
     # Optional: Check if tables exist or just run init to ensure (safe with IF NOT EXISTS)
     init_db()
 
+# Load the ephemeris and build any missing panchang tables in the background,
+# so the first calendar request does not pay for it. Disable with PANCHANG_WARMUP=0.
+if Config.PANCHANG_WARMUP:
+    from modules import panchang, calendar_days
+    panchang.start_warm_up()
+    # Rebuild the calendar_days date dimension if the span, location or version moved on
+    calendar_days.start_refresh(only_if_stale=True)
+
 @app.route('/')
 def index():
     from flask import session, redirect, url_for
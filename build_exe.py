@@ -15,6 +15,36 @@ def install_dependencies():
         print(f"[-] Failed to install dependencies: {e}")
         sys.exit(1)
 
+def prepare_data():
+    """
+    Stages the data folder for bundling: panchang tables built from the full
+    de421.bsp, then only the trimmed Sun/Moon/Earth ephemeris is shipped.
+    Returns the folder to bundle.
+    """
+    from modules import panchang
+
+    full = os.path.join('data', panchang.EPHEMERIS_FILE)
+    trimmed = os.path.join('data', panchang.TRIMMED_EPHEMERIS_FILE)
+    if not os.path.exists(full) and not os.path.exists(trimmed):
+        print("[!] Warning: no ephemeris in data/. It will be downloaded on first run.")
+        return 'data'
+
+    if os.path.exists(full):
+        # Tables first: they span 1900-2050, wider than the trimmed ephemeris
+        print("[*] Building panchang tables...")
+        sys.path.insert(0, 'scripts')
+        from build_panchang_tables import build_tables
+        build_tables()
+
+        print("[*] Trimming ephemeris...")
+        panchang.trim_ephemeris(source=full, output=trimmed)
+
+    stage = 'build_data'
+    if os.path.exists(stage): shutil.rmtree(stage)
+    shutil.copytree('data', stage, ignore=shutil.ignore_patterns(panchang.EPHEMERIS_FILE, '*.tmp'))
+    print(f"[+] Bundling {panchang.TRIMMED_EPHEMERIS_FILE} ({os.path.getsize(trimmed) / 1e6:.1f} MB) instead of {panchang.EPHEMERIS_FILE}")
+    return stage
+
 def build():
     try:
         import PyInstaller
@@ -34,6 +64,8 @@ def build():
     if os.path.exists('build'): shutil.rmtree('build')
     if os.path.exists('dist'): shutil.rmtree('dist')
     if os.path.exists('DevalayaBilling.spec'): os.remove('DevalayaBilling.spec')
+
+    data_dir = prepare_data()
     
     # Path separator
     sep = ';' if os.name == 'nt' else ':'
@@ -43,7 +75,7 @@ def build():
     datas = [
         f'static{sep}static',
         f'templates{sep}templates',
-        f'data{sep}data',
+        f'{data_dir}{sep}data',
         f'version.py{sep}.',
         # .env is deliberately NOT included so user can configure it externally.
         # If included, it would be frozen.
@@ -15,4 +15,14 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'default-secret-key'
     # Default to local file if not specified
     DB_PATH = os.environ.get('DB_PATH') or os.path.join(base_path, 'temple.db')
+    # Shared panchang result cache (safe to delete; rebuilt on demand)
+    PANCHANG_CACHE_PATH = os.environ.get('PANCHANG_CACHE_PATH') or os.path.join(os.path.dirname(DB_PATH), 'panchang_cache.db')
+    # 'skyfield' (de421 ephemeris) or 'analytic' (no ephemeris; faster start, less memory)
+    PANCHANG_ENGINE = os.environ.get('PANCHANG_ENGINE') or 'skyfield'
+    # Load the ephemeris in a background thread at startup
+    PANCHANG_WARMUP = os.environ.get('PANCHANG_WARMUP', '1').lower() not in ('0', 'false', 'no')
+    # Keep one configured connection per thread alive between requests
+    DB_POOL = os.environ.get('DB_POOL', '1').lower() not in ('0', 'false', 'no')
     BACKUP_PATH = os.environ.get('BACKUP_PATH') or os.path.join(base_path, 'backups')
+    # Yearly archive_YYYY.db files of closed financial years (default: next to temple.db)
+    ARCHIVE_PATH = os.environ.get('ARCHIVE_PATH')
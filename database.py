@@ -1,18 +1,63 @@
 import sqlite3
 import os
+import time
+import logging
+import threading
+import weakref
 from flask import g
 from config import Config
 from themes import get_theme_css
 import json
 
-# Settings Cache
-_settings_cache = None
-
-def get_cached_settings():
-    global _settings_cache
-    if _settings_cache:
-        return _settings_cache
-        
+# Reference data (temple settings, ...) cached in each worker process. Every
+# entry is stamped with its generation from the cache_generations table, which
+# is read once per request; a generation bumped by any worker (or by a trigger)
+# makes all workers reload on their next request.
+_reference_cache = {}
+
+def _generations():
+    if 'cache_generations' not in g:
+        try:
+            rows = get_db().execute('SELECT name, generation FROM cache_generations').fetchall()
+            g.cache_generations = {row[0]: row[1] for row in rows}
+        except sqlite3.OperationalError:
+            # Table missing (database not migrated yet): nothing is cached
+            g.cache_generations = {}
+    return g.cache_generations
+
+def get_reference(name, loader):
+    """Returns loader(), cached until the generation of name changes."""
+    generation = _generations().get(name)
+    cached = _reference_cache.get(name)
+    if cached is not None and generation is not None and cached[0] == generation:
+        return cached[1]
+    value = loader()
+    _reference_cache[name] = (generation, value)
+    return value
+
+def invalidate_reference(*names):
+    """
+    Bumps the generation of names (of everything when none are given) and
+    commits, so every worker reloads them. Generations move to at least the
+    current time in microseconds, so they also move forward after a restore
+    brings back older values.
+    """
+    db = get_db()
+    stamp = time.time_ns() // 1000
+    if names:
+        for name in names:
+            db.execute('''
+                INSERT INTO cache_generations (name, generation) VALUES (?, ?)
+                ON CONFLICT(name) DO UPDATE SET generation = MAX(generation + 1, excluded.generation)
+            ''', (name, stamp))
+            _reference_cache.pop(name, None)
+    else:
+        db.execute('UPDATE cache_generations SET generation = MAX(generation + 1, ?)', (stamp,))
+        _reference_cache.clear()
+    db.commit()
+    g.pop('cache_generations', None)
+
+def _load_settings():
     db = get_db()
     row = db.execute('SELECT * FROM temple_settings WHERE id=1').fetchone()
     settings = dict(row) if row else None
@@ -36,100 +81,118 @@ def get_cached_settings():
         logging.error(f"Error generating theme CSS in cache: {e}")
         theme_css = get_theme_css('kerala')
         
-    _settings_cache = (settings, theme_css)
-    return _settings_cache
+    return (settings, theme_css)
+
+def get_cached_settings():
+    return get_reference('settings', _load_settings)
 
 def clear_settings_cache():
-    global _settings_cache
-    _settings_cache = None
+    invalidate_reference('settings')
+
+# Per-thread connection pool. Each thread keeps its configured connection
+# between requests instead of reconnecting, so the page cache and mmap stay
+# warm. Connections are reset when returned and dropped after a fork.
+_pool = threading.local()
+_pool_lock = threading.Lock()
+_pool_stats = {'created': 0, 'reused': 0, 'released': 0, 'discarded': 0}
+# Threads currently keeping a connection (a thread's connection goes with it)
+_pool_threads = weakref.WeakSet()
+
+def _connect():
+    conn = sqlite3.connect(
+        Config.DB_PATH,
+        detect_types=sqlite3.PARSE_DECLTYPES
+    )
+    conn.row_factory = sqlite3.Row
+
+    # Optimize performance
+    conn.execute('PRAGMA journal_mode=WAL;')
+    conn.execute('PRAGMA synchronous=NORMAL;')
+    conn.execute('PRAGMA foreign_keys=ON;')
+    conn.execute('PRAGMA cache_size=-64000;') # 64MB cache
+    conn.execute('PRAGMA mmap_size=268435456;') # 256MB mmap
+    return conn
+
+def _count(key):
+    with _pool_lock:
+        _pool_stats[key] += 1
+
+def _acquire():
+    entry = getattr(_pool, 'entry', None)
+    _pool.entry = None
+    if entry is not None:
+        path, pid, conn = entry
+        if path == Config.DB_PATH and pid == os.getpid():
+            _count('reused')
+            return conn
+        # Another database, or inherited across a fork (never touch those)
+        if pid == os.getpid():
+            conn.close()
+        _count('discarded')
+    _count('created')
+    return _connect()
+
+def _release(conn):
+    """Resets a connection to its freshly configured state and keeps it for this thread."""
+    try:
+        if conn.in_transaction:
+            conn.rollback()
+        # Yearly archives attached for a historical query (modules/archive.py);
+        # one still read by a streaming response is detached on a later release
+        for row in conn.execute('PRAGMA database_list').fetchall():
+            if row[1] not in ('main', 'temp'):
+                try:
+                    conn.execute(f'DETACH DATABASE {row[1]}')
+                except sqlite3.OperationalError:
+                    pass
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA foreign_keys=ON;')
+    except sqlite3.Error as e:
+        logging.warning(f"Discarding pooled connection: {e}")
+        conn.close()
+        _count('discarded')
+        return
+    _pool.entry = (Config.DB_PATH, os.getpid(), conn)
+    with _pool_lock:
+        _pool_stats['released'] += 1
+        _pool_threads.add(threading.current_thread())
+
+def pool_stats():
+    """Connection counters for this process plus the number of threads keeping one open."""
+    with _pool_lock:
+        stats = dict(_pool_stats)
+        stats['pooled'] = sum(1 for t in _pool_threads if t.is_alive())
+    stats['enabled'] = Config.DB_POOL
+    return stats
 
 def get_db():
     if 'db' not in g:
-        g.db = sqlite3.connect(
-            Config.DB_PATH,
-            detect_types=sqlite3.PARSE_DECLTYPES
-        )
-        g.db.row_factory = sqlite3.Row
-        
-        # Optimize performance
-        g.db.execute('PRAGMA journal_mode=WAL;')
-        g.db.execute('PRAGMA synchronous=NORMAL;')
-        g.db.execute('PRAGMA foreign_keys=ON;')
-        g.db.execute('PRAGMA cache_size=-64000;') # 64MB cache
-        g.db.execute('PRAGMA mmap_size=268435456;') # 256MB mmap
+        if Config.DB_POOL:
+            g.db = _acquire()
+        else:
+            g.db = _connect()
+            _count('created')
 
     return g.db
 
 def close_db(e=None):
     db = g.pop('db', None)
     if db is not None:
-        db.close()
-
-def init_db():
-    conn = sqlite3.connect(Config.DB_PATH)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    
-    # 1. Temple Settings
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS temple_settings (
-            id INTEGER PRIMARY KEY DEFAULT 1,
-            name_mal TEXT NOT NULL,
-            name_eng TEXT,
-            place TEXT,
-            receipt_footer TEXT,
-            backup_enabled INTEGER DEFAULT 0,
-            print_template_content TEXT,
-            subtitle_mal TEXT,
-            subtitle_eng TEXT
-        )
-    ''')
-    
-    # Ensure at least one setting row exists
-    c.execute('SELECT count(*) FROM temple_settings')
-    if c.fetchone()[0] == 0:
-        c.execute('''
-            INSERT INTO temple_settings (id, name_mal, name_eng, place, receipt_footer)
-            VALUES (1, 'TEMPLE NAME', 'Temple Name', 'Place', 'Thank You')
-        ''')
-
-    # Migration: Add print_template_content if missing
-    c.execute("PRAGMA table_info(temple_settings)")
-    setting_cols = [row[1] for row in c.fetchall()]
-    
-    # Check for subtitles
-    if 'subtitle_mal' not in setting_cols:
-        c.execute("ALTER TABLE temple_settings ADD COLUMN subtitle_mal TEXT")
-    if 'subtitle_eng' not in setting_cols:
-        c.execute("ALTER TABLE temple_settings ADD COLUMN subtitle_eng TEXT")
-    
-    # Check for color_theme
-    if 'color_theme' not in setting_cols:
-        c.execute("ALTER TABLE temple_settings ADD COLUMN color_theme TEXT DEFAULT 'kerala'")
-        
-    if 'custom_theme_colors' not in setting_cols:
-        # Default to a safe fallback JSON
-        import json
-        default_custom = json.dumps({
-            'primary': '#000000',
-            'secondary': '#ffffff',
-            'background': '#f0f0f0',
-            'success': '#00ff00'
-        })
-        c.execute("ALTER TABLE temple_settings ADD COLUMN custom_theme_colors TEXT")
-        c.execute("UPDATE temple_settings SET custom_theme_colors = ?", (default_custom,))
+        if Config.DB_POOL:
+            _release(db)
+        else:
+            db.close()
 
-    if 'logo_path' not in setting_cols:
-        c.execute("ALTER TABLE temple_settings ADD COLUMN logo_path TEXT")
+# Schema migrations. Each entry is (version, description, function(cursor)) and
+# runs once, inside a transaction, in version order; the versions applied are
+# recorded in schema_version. Append new migrations at the end, never edit or
+# renumber applied ones. Migration 1 is the original idempotent schema setup,
+# so databases created before versioning are brought up to date by it as well.
 
-    # Migration: Add Latitude/Longitude
-    if 'latitude' not in setting_cols:
-        c.execute("ALTER TABLE temple_settings ADD COLUMN latitude REAL DEFAULT 10.85") # Default Kerala Lat
-    if 'longitude' not in setting_cols:
-        c.execute("ALTER TABLE temple_settings ADD COLUMN longitude REAL DEFAULT 76.27") # Default Kerala Lon
+# Bump when DEFAULT_PRINT_TEMPLATE changes: the stored template is replaced once
+PRINT_TEMPLATE_VERSION = 1
 
-    # Set default template (Defined here so it's available for updates)
-    default_template = """<!DOCTYPE html>
+DEFAULT_PRINT_TEMPLATE = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -345,12 +408,156 @@ def init_db():
 </body>
 </html>"""
 
+def init_db():
+    migrate()
+
+def _current_version(conn):
+    try:
+        return conn.execute("SELECT MAX(version) FROM schema_version").fetchone()[0] or 0
+    except sqlite3.OperationalError:
+        # No schema_version table yet: a new or pre-versioning database
+        return 0
+
+def _template_current(conn):
+    try:
+        row = conn.execute("SELECT print_template_version FROM temple_settings WHERE id = 1").fetchone()
+    except sqlite3.OperationalError:
+        return False
+    return row is not None and row[0] == PRINT_TEMPLATE_VERSION
+
+def schema_status(db_path=None):
+    """(applied version, latest version) of the database."""
+    conn = sqlite3.connect(db_path or Config.DB_PATH, timeout=30)
+    try:
+        return _current_version(conn), MIGRATIONS[-1][0]
+    finally:
+        conn.close()
+
+# Oldest SQLite library the migrations (and the schema they leave) work with:
+# upserts (3.24), generated columns on bills (migration 5, 3.31) and
+# UPDATE ... FROM in the item summary triggers (migration 7, 3.33).
+MIN_SQLITE_VERSION = (3, 33, 0)
+
+def migrate(db_path=None):
+    """
+    Applies pending migrations and, if its version changed, the default print
+    template. Costs two small reads when the database is current. Returns the
+    (version, description) pairs applied.
+    """
+    if sqlite3.sqlite_version_info < MIN_SQLITE_VERSION:
+        raise RuntimeError(
+            f"SQLite {sqlite3.sqlite_version} is too old; "
+            f"version {'.'.join(map(str, MIN_SQLITE_VERSION))} or newer is required "
+            "(upgrade the system sqlite3 library or use a newer Python build)"
+        )
+
+    # Runs at import (in the gunicorn master when preloading), so the connection
+    # must be closed even on failure or it would be inherited by workers.
+    latest = MIGRATIONS[-1][0]
+    conn = sqlite3.connect(db_path or Config.DB_PATH, timeout=30, isolation_level=None)
+    try:
+        if _current_version(conn) >= latest and _template_current(conn):
+            return []
+
+        conn.row_factory = sqlite3.Row
+        # BEGIN IMMEDIATE takes the write lock up front, so workers starting
+        # together wait here and then see the migrations already applied.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            applied = []
+            c = conn.cursor()
+            c.execute('''
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
+                    description TEXT,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            current = _current_version(conn)
+            for version, description, func in MIGRATIONS:
+                if version <= current:
+                    continue
+                func(c)
+                c.execute("INSERT INTO schema_version (version, description) VALUES (?, ?)", (version, description))
+                applied.append((version, description))
+
+            if not _template_current(conn):
+                c.execute(
+                    "UPDATE temple_settings SET print_template_content = ?, print_template_version = ? WHERE id = 1",
+                    (DEFAULT_PRINT_TEMPLATE, PRINT_TEMPLATE_VERSION)
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        for version, description in applied:
+            logging.info(f"Applied schema migration {version}: {description}")
+        return applied
+    finally:
+        conn.close()
+
+def _migration_1_baseline(c):
+    # 1. Temple Settings
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS temple_settings (
+            id INTEGER PRIMARY KEY DEFAULT 1,
+            name_mal TEXT NOT NULL,
+            name_eng TEXT,
+            place TEXT,
+            receipt_footer TEXT,
+            backup_enabled INTEGER DEFAULT 0,
+            print_template_content TEXT,
+            subtitle_mal TEXT,
+            subtitle_eng TEXT
+        )
+    ''')
+    
+    # Ensure at least one setting row exists
+    c.execute('SELECT count(*) FROM temple_settings')
+    if c.fetchone()[0] == 0:
+        c.execute('''
+            INSERT INTO temple_settings (id, name_mal, name_eng, place, receipt_footer)
+            VALUES (1, 'TEMPLE NAME', 'Temple Name', 'Place', 'Thank You')
+        ''')
+
+    # Migration: Add print_template_content if missing
+    c.execute("PRAGMA table_info(temple_settings)")
+    setting_cols = [row[1] for row in c.fetchall()]
+    
     if 'print_template_content' not in setting_cols:
         c.execute("ALTER TABLE temple_settings ADD COLUMN print_template_content TEXT")
-        c.execute("UPDATE temple_settings SET print_template_content = ? WHERE id = 1", (default_template,))
+
+    # Check for subtitles
+    if 'subtitle_mal' not in setting_cols:
+        c.execute("ALTER TABLE temple_settings ADD COLUMN subtitle_mal TEXT")
+    if 'subtitle_eng' not in setting_cols:
+        c.execute("ALTER TABLE temple_settings ADD COLUMN subtitle_eng TEXT")
     
-    # Always update the template on startup to ensure latest version
-    c.execute("UPDATE temple_settings SET print_template_content = ? WHERE id = 1", (default_template,))
+    # Check for color_theme
+    if 'color_theme' not in setting_cols:
+        c.execute("ALTER TABLE temple_settings ADD COLUMN color_theme TEXT DEFAULT 'kerala'")
+        
+    if 'custom_theme_colors' not in setting_cols:
+        # Default to a safe fallback JSON
+        import json
+        default_custom = json.dumps({
+            'primary': '#000000',
+            'secondary': '#ffffff',
+            'background': '#f0f0f0',
+            'success': '#00ff00'
+        })
+        c.execute("ALTER TABLE temple_settings ADD COLUMN custom_theme_colors TEXT")
+        c.execute("UPDATE temple_settings SET custom_theme_colors = ?", (default_custom,))
+
+    if 'logo_path' not in setting_cols:
+        c.execute("ALTER TABLE temple_settings ADD COLUMN logo_path TEXT")
+
+    # Migration: Add Latitude/Longitude
+    if 'latitude' not in setting_cols:
+        c.execute("ALTER TABLE temple_settings ADD COLUMN latitude REAL DEFAULT 10.85") # Default Kerala Lat
+    if 'longitude' not in setting_cols:
+        c.execute("ALTER TABLE temple_settings ADD COLUMN longitude REAL DEFAULT 76.27") # Default Kerala Lon
 
     # 2. Printers
     c.execute('''
@@ -482,5 +689,303 @@ def init_db():
     for q in index_queries:
         c.execute(q)
 
-    conn.commit()
-    conn.close()
+def _migration_2_calendar_days(c):
+    # Date dimension, filled by modules/calendar_days.py
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS calendar_days (
+            day DATE PRIMARY KEY,
+            mal_day INTEGER NOT NULL,
+            mal_month_index INTEGER NOT NULL,
+            mal_month TEXT NOT NULL,
+            mal_year INTEGER NOT NULL,
+            star_index INTEGER NOT NULL,
+            star TEXT NOT NULL,
+            is_sankranti INTEGER DEFAULT 0,
+            is_month_start INTEGER DEFAULT 0,
+            festival TEXT
+        ) WITHOUT ROWID
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS calendar_days_meta (
+            id INTEGER PRIMARY KEY DEFAULT 1,
+            location TEXT,
+            version TEXT,
+            start_date DATE,
+            end_date DATE,
+            refreshed_at TIMESTAMP
+        )
+    ''')
+
+    c.execute("CREATE INDEX IF NOT EXISTS idx_calendar_days_mal ON calendar_days(mal_year, mal_month_index, mal_day)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_calendar_days_star ON calendar_days(star_index)")
+
+def _migration_3_print_template_version(c):
+    c.execute("ALTER TABLE temple_settings ADD COLUMN print_template_version INTEGER")
+
+def _migration_4_cache_generations(c):
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS cache_generations (
+            name TEXT PRIMARY KEY,
+            generation INTEGER NOT NULL
+        ) WITHOUT ROWID
+    ''')
+    c.execute('''
+        INSERT OR IGNORE INTO cache_generations (name, generation)
+        VALUES ('settings', CAST((julianday('now') - 2440587.5) * 86400000000 AS INTEGER))
+    ''')
+    # Any write to temple_settings invalidates the cached settings in every worker
+    for event in ('INSERT', 'UPDATE', 'DELETE'):
+        c.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_temple_settings_generation_{event.lower()}
+            AFTER {event} ON temple_settings
+            BEGIN
+                UPDATE cache_generations
+                SET generation = MAX(generation + 1, CAST((julianday('now') - 2440587.5) * 86400000000 AS INTEGER))
+                WHERE name = 'settings';
+            END
+        ''')
+
+def _migration_5_bill_date_columns(c):
+    # Calendar dates of a bill as indexable columns. effective_date is the cash
+    # basis date (payment date when paid, else creation) used by the dashboard and
+    # reports; created_date serves the per-day bill history. ALTER TABLE can only
+    # add VIRTUAL generated columns; their indexes store the computed values.
+    c.execute("ALTER TABLE bills ADD COLUMN effective_date TEXT GENERATED ALWAYS AS (date(COALESCE(payment_date, created_at))) VIRTUAL")
+    c.execute("ALTER TABLE bills ADD COLUMN created_date TEXT GENERATED ALWAYS AS (date(created_at)) VIRTUAL")
+
+    # Equality on payment_status, range on effective_date, and status plus
+    # total_amount carried along so the revenue sums never touch the table
+    c.execute("CREATE INDEX IF NOT EXISTS idx_bills_payment_effective ON bills(payment_status, effective_date, status, total_amount)")
+    # Date range with any payment status (reports default to 'all')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_bills_effective_date ON bills(effective_date, status)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_bills_created_date ON bills(created_date)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_bills_cashier_created_date ON bills(cashier_id, created_date)")
+    # Superseded: no query filters on raw created_at with status and payment_status
+    c.execute("DROP INDEX IF EXISTS idx_bills_dashboard")
+
+def _migration_6_bill_summaries(c):
+    # Daily and hourly rollups of bills (see modules/rollups.py)
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS bill_daily_summary (
+            effective_date TEXT NOT NULL,
+            cashier_id INTEGER NOT NULL,
+            payment_status TEXT NOT NULL,
+            status TEXT NOT NULL,
+            bill_count INTEGER NOT NULL DEFAULT 0,
+            total_amount REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (effective_date, cashier_id, payment_status, status)
+        ) WITHOUT ROWID
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS bill_hourly_summary (
+            created_date TEXT NOT NULL,
+            hour INTEGER NOT NULL,
+            bill_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (created_date, hour)
+        ) WITHOUT ROWID
+    ''')
+
+    add_daily = '''
+        INSERT INTO bill_daily_summary (effective_date, cashier_id, payment_status, status, bill_count, total_amount)
+        VALUES (IFNULL(NEW.effective_date, ''), IFNULL(NEW.cashier_id, 0), IFNULL(NEW.payment_status, ''),
+                IFNULL(NEW.status, ''), 1, IFNULL(NEW.total_amount, 0))
+        ON CONFLICT (effective_date, cashier_id, payment_status, status) DO UPDATE SET
+            bill_count = bill_count + 1, total_amount = total_amount + excluded.total_amount;
+    '''
+    remove_daily = '''
+        UPDATE bill_daily_summary SET bill_count = bill_count - 1, total_amount = total_amount - IFNULL(OLD.total_amount, 0)
+        WHERE effective_date = IFNULL(OLD.effective_date, '') AND cashier_id = IFNULL(OLD.cashier_id, 0)
+          AND payment_status = IFNULL(OLD.payment_status, '') AND status = IFNULL(OLD.status, '');
+        DELETE FROM bill_daily_summary
+        WHERE effective_date = IFNULL(OLD.effective_date, '') AND cashier_id = IFNULL(OLD.cashier_id, 0)
+          AND payment_status = IFNULL(OLD.payment_status, '') AND status = IFNULL(OLD.status, '') AND bill_count <= 0;
+    '''
+    add_hourly = '''
+        INSERT INTO bill_hourly_summary (created_date, hour, bill_count)
+        VALUES (IFNULL(NEW.created_date, ''), IFNULL(CAST(strftime('%H', NEW.created_at) AS INTEGER), -1), 1)
+        ON CONFLICT (created_date, hour) DO UPDATE SET bill_count = bill_count + 1;
+    '''
+    remove_hourly = '''
+        UPDATE bill_hourly_summary SET bill_count = bill_count - 1
+        WHERE created_date = IFNULL(OLD.created_date, '') AND hour = IFNULL(CAST(strftime('%H', OLD.created_at) AS INTEGER), -1);
+        DELETE FROM bill_hourly_summary
+        WHERE created_date = IFNULL(OLD.created_date, '') AND hour = IFNULL(CAST(strftime('%H', OLD.created_at) AS INTEGER), -1)
+          AND bill_count <= 0;
+    '''
+    c.execute(f"CREATE TRIGGER IF NOT EXISTS trg_bills_summary_insert AFTER INSERT ON bills BEGIN {add_daily} {add_hourly} END")
+    c.execute(f"CREATE TRIGGER IF NOT EXISTS trg_bills_summary_delete AFTER DELETE ON bills BEGIN {remove_daily} {remove_hourly} END")
+    c.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_bills_summary_update
+        AFTER UPDATE OF created_at, payment_date, cashier_id, payment_status, status, total_amount ON bills
+        BEGIN {remove_daily} {add_daily} END
+    ''')
+    c.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_bills_hourly_update
+        AFTER UPDATE OF created_at ON bills
+        BEGIN {remove_hourly} {add_hourly} END
+    ''')
+
+    from modules import rollups
+    rollups.rebuild(c, ['bill_daily_summary', 'bill_hourly_summary'])
+
+def _migration_7_item_summary(c):
+    # Items sold per bill date, scheduled date and puja, over live bills only
+    # (not cancelled or draft). See modules/rollups.py.
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS item_daily_summary (
+            bill_date TEXT NOT NULL,
+            scheduled_date TEXT NOT NULL,
+            puja_id INTEGER NOT NULL,
+            item_count INTEGER NOT NULL DEFAULT 0,
+            total_amount REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (bill_date, scheduled_date, puja_id)
+        ) WITHOUT ROWID
+    ''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_item_daily_summary_scheduled ON item_daily_summary(scheduled_date)")
+
+    live = "IFNULL({bill}.status, '') NOT IN ('cancelled', 'draft')"
+    upsert = '''
+        ON CONFLICT (bill_date, scheduled_date, puja_id) DO UPDATE SET
+            item_count = item_count + excluded.item_count, total_amount = total_amount + excluded.total_amount;
+    '''
+
+    # One bill_items row, looked up against its (live) bill
+    def add_item(row):
+        return f'''
+            INSERT INTO item_daily_summary (bill_date, scheduled_date, puja_id, item_count, total_amount)
+            SELECT IFNULL(b.created_date, ''), IFNULL(b.scheduled_date, ''), {row}.puja_id,
+                   IFNULL({row}.count, 0), IFNULL({row}.total, 0)
+            FROM bills b WHERE b.id = {row}.bill_id AND {live.format(bill='b')}
+            {upsert}
+        '''
+
+    def remove_item(row):
+        key = f'''
+            puja_id = {row}.puja_id AND (bill_date, scheduled_date) IN (
+                SELECT IFNULL(b.created_date, ''), IFNULL(b.scheduled_date, '')
+                FROM bills b WHERE b.id = {row}.bill_id AND {live.format(bill='b')})
+        '''
+        return f'''
+            UPDATE item_daily_summary
+            SET item_count = item_count - IFNULL({row}.count, 0), total_amount = total_amount - IFNULL({row}.total, 0)
+            WHERE {key};
+            DELETE FROM item_daily_summary WHERE item_count <= 0 AND {key};
+        '''
+
+    # All items of one bill, when the bill itself changes or goes away
+    add_bill = f'''
+        INSERT INTO item_daily_summary (bill_date, scheduled_date, puja_id, item_count, total_amount)
+        SELECT IFNULL(NEW.created_date, ''), IFNULL(NEW.scheduled_date, ''), puja_id,
+               SUM(IFNULL(count, 0)), SUM(IFNULL(total, 0))
+        FROM bill_items WHERE bill_id = NEW.id AND {live.format(bill='NEW')}
+        GROUP BY puja_id
+        {upsert}
+    '''
+    remove_bill = f'''
+        UPDATE item_daily_summary
+        SET item_count = item_daily_summary.item_count - i.item_count,
+            total_amount = item_daily_summary.total_amount - i.total_amount
+        FROM (SELECT puja_id, SUM(IFNULL(count, 0)) AS item_count, SUM(IFNULL(total, 0)) AS total_amount
+              FROM bill_items WHERE bill_id = OLD.id GROUP BY puja_id) AS i
+        WHERE {live.format(bill='OLD')} AND item_daily_summary.puja_id = i.puja_id
+          AND bill_date = IFNULL(OLD.created_date, '') AND scheduled_date = IFNULL(OLD.scheduled_date, '');
+        DELETE FROM item_daily_summary
+        WHERE item_count <= 0 AND bill_date = IFNULL(OLD.created_date, '') AND scheduled_date = IFNULL(OLD.scheduled_date, '');
+    '''
+
+    c.execute(f"CREATE TRIGGER IF NOT EXISTS trg_bill_items_summary_insert AFTER INSERT ON bill_items BEGIN {add_item('NEW')} END")
+    c.execute(f"CREATE TRIGGER IF NOT EXISTS trg_bill_items_summary_delete AFTER DELETE ON bill_items BEGIN {remove_item('OLD')} END")
+    c.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_bill_items_summary_update
+        AFTER UPDATE OF bill_id, puja_id, count, total ON bill_items
+        BEGIN {remove_item('OLD')} {add_item('NEW')} END
+    ''')
+    c.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_bills_item_summary_update
+        AFTER UPDATE OF status, created_at, scheduled_date ON bills
+        BEGIN {remove_bill} {add_bill} END
+    ''')
+    # Items still attached to a deleted bill; deleting them afterwards is then a no-op
+    c.execute(f"CREATE TRIGGER IF NOT EXISTS trg_bills_item_summary_delete AFTER DELETE ON bills BEGIN {remove_bill} END")
+
+    from modules import rollups
+    rollups.rebuild(c, ['item_daily_summary'])
+
+def _migration_8_bill_search(c):
+    # Full-text search over bills (see modules/bill_search.py)
+    from modules import bill_search
+
+    c.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS bill_search USING fts5(
+            bill_no, devotee_name, phone, star, items,
+            tokenize="{bill_search.TOKENIZE}",
+            prefix='2 3'
+        )
+    ''')
+
+    def reindex(bill_id):
+        return f'''
+            DELETE FROM bill_search WHERE rowid = {bill_id};
+            INSERT INTO bill_search (rowid, bill_no, devotee_name, phone, star, items)
+            {bill_search.row_sql(f'b.id = {bill_id}')};
+        '''
+
+    c.execute(f"CREATE TRIGGER IF NOT EXISTS trg_bills_search_insert AFTER INSERT ON bills BEGIN {reindex('NEW.id')} END")
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_bills_search_delete AFTER DELETE ON bills
+        BEGIN DELETE FROM bill_search WHERE rowid = OLD.id; END
+    ''')
+    c.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_bills_search_update
+        AFTER UPDATE OF bill_no, devotee_name, phone, star ON bills
+        BEGIN {reindex('NEW.id')} END
+    ''')
+    c.execute(f"CREATE TRIGGER IF NOT EXISTS trg_bill_items_search_insert AFTER INSERT ON bill_items BEGIN {reindex('NEW.bill_id')} END")
+    c.execute(f"CREATE TRIGGER IF NOT EXISTS trg_bill_items_search_delete AFTER DELETE ON bill_items BEGIN {reindex('OLD.bill_id')} END")
+    c.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_bill_items_search_update
+        AFTER UPDATE OF bill_id, puja_id ON bill_items
+        BEGIN {reindex('OLD.bill_id')} {reindex('NEW.bill_id')} END
+    ''')
+    # Renaming a vazhipadu re-indexes the bills that contain it
+    c.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_puja_master_search_update
+        AFTER UPDATE OF name ON puja_master
+        BEGIN
+            DELETE FROM bill_search WHERE rowid IN (SELECT bill_id FROM bill_items WHERE puja_id = NEW.id);
+            INSERT INTO bill_search (rowid, bill_no, devotee_name, phone, star, items)
+            {bill_search.row_sql('b.id IN (SELECT bill_id FROM bill_items WHERE puja_id = NEW.id)')};
+        END
+    ''')
+
+    bill_search.rebuild(c)
+
+def _migration_9_bill_archives(c):
+    # Closed financial years moved out to archive_YYYY.db files (see modules/archive.py);
+    # first_date / last_date span every created, effective and scheduled date in the file
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS bill_archives (
+            fiscal_year INTEGER PRIMARY KEY,
+            filename TEXT NOT NULL,
+            first_date TEXT,
+            last_date TEXT,
+            bill_count INTEGER NOT NULL DEFAULT 0,
+            max_bill_seq INTEGER,
+            archived_at TIMESTAMP
+        )
+    ''')
+    # Foreign key checks when bills are deleted would otherwise scan these tables per bill
+    c.execute("CREATE INDEX IF NOT EXISTS idx_bill_items_bill_id ON bill_items(bill_id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_bills_original_bill_id ON bills(original_bill_id)")
+
+MIGRATIONS = [
+    (1, 'Base schema', _migration_1_baseline),
+    (2, 'calendar_days date dimension', _migration_2_calendar_days),
+    (3, 'Track print template version', _migration_3_print_template_version),
+    (4, 'Cache generations for cross-worker invalidation', _migration_4_cache_generations),
+    (5, 'Indexed effective_date and created_date on bills', _migration_5_bill_date_columns),
+    (6, 'Daily and hourly bill summaries', _migration_6_bill_summaries),
+    (7, 'Item sales summary', _migration_7_item_summary),
+    (8, 'Full-text bill search', _migration_8_bill_search),
+    (9, 'Yearly bill archives', _migration_9_bill_archives),
+]
@@ -20,3 +20,53 @@ loglevel = "info"
 
 # Preload app for better memory efficiency
 preload_app = True
+
+# The panchang warm-up runs synchronously in the master (when_ready) instead of
+# on a thread started by app.py: a thread holding a lock at fork time would
+# leave that lock held forever in every worker. PANCHANG_WARMUP=0 still turns
+# it off; the data is then loaded on demand in each worker.
+import os
+_warmup = os.environ.get('PANCHANG_WARMUP', '1').lower() not in ('0', 'false', 'no')
+os.environ['PANCHANG_WARMUP'] = '0'
+
+def _temple_location():
+    """Reads the configured location directly, without leaving a connection open."""
+    import sqlite3
+    from config import Config
+    from modules import panchang
+    try:
+        conn = sqlite3.connect(Config.DB_PATH)
+        try:
+            row = conn.execute('SELECT latitude, longitude FROM temple_settings WHERE id=1').fetchone()
+        finally:
+            conn.close()
+        if row and row[0] is not None and row[1] is not None:
+            return row[0], row[1]
+    except sqlite3.Error:
+        pass
+    return panchang.DEFAULT_LAT, panchang.DEFAULT_LON
+
+def when_ready(server):
+    # Master, after the app is preloaded and before workers are forked:
+    # ephemeris, tables and this year's and next year's days are loaded once
+    # and shared copy-on-write by all workers.
+    if not _warmup:
+        server.log.info("Panchang warm-up disabled (PANCHANG_WARMUP=0)")
+        return
+    from modules import panchang
+    lat, lon = _temple_location()
+    server.log.info(f"Warming up panchang data for ({lat}, {lon})...")
+    panchang.warm_up_before_fork(lat, lon)
+    server.log.info(f"Panchang warm-up: {panchang.LOAD_METRICS}")
+
+    from modules import calendar_days
+    try:
+        if calendar_days.refresh_if_stale(lat, lon):
+            server.log.info("calendar_days rebuilt")
+    except Exception as e:
+        server.log.error(f"calendar_days refresh failed: {e}")
+
+def post_fork(server, worker):
+    # Never reuse SQLite handles from the master in a worker
+    from modules import panchang_cache
+    panchang_cache.reset_after_fork()
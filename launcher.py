@@ -48,6 +48,17 @@ def open_browser(url):
     except Exception as e:
         print(f"[-] Failed to open browser: {e}")
 
+def report_warm_up():
+    """Print when the calendar engine (ephemeris warm-up started by app.py) is ready."""
+    from modules import panchang
+    while not panchang.is_ready():
+        sleep(0.5)
+    metrics = panchang.get_load_metrics()
+    if metrics['state'] == 'failed':
+        print(f"[-] Calendar engine failed to load: {metrics['error']}")
+    elif metrics['ephemeris_seconds'] is not None:
+        print(f"[*] Calendar engine ready ({metrics['ephemeris_seconds']}s)")
+
 def main():
     # Set console title
     if os.name == 'nt':
@@ -120,6 +131,8 @@ def main():
     print(" [!] Close this window to SHUT DOWN the system.")
     print("="*60 + "\n")
     
+    threading.Thread(target=report_warm_up, daemon=True).start()
+
     # Schedule browser launch
     threading.Timer(2.0, open_browser, args=[local_url]).start()
     
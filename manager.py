@@ -152,6 +152,18 @@ Categories=Utility;
 
 def run_migrations():
     print("\n[+] Checking for database migrations...")
+    try:
+        import database
+        applied = database.migrate()
+        for version, description in applied:
+            print(f"Applied schema migration {version}: {description}")
+        current, latest = database.schema_status()
+        print(f"Schema version {current} (latest {latest}).")
+    except Exception as e:
+        print(f"[-] Schema migration failed: {e}")
+        return
+
+    # One-off data scripts
     migrations_dir = "migrations"
     
     if not os.path.exists(migrations_dir):
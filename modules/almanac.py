@@ -0,0 +1,132 @@
+import io
+import csv
+import datetime
+
+# Output formats for the annual almanac. Every function takes the row iterator
+# from panchang.iter_almanac and yields text chunks, one day at a time, so the
+# export can be streamed straight into the response.
+
+CSV_HEADERS = [
+    'Date', 'Weekday', 'Malayalam Date', 'Star at Sunrise', 'Star (Malayalam)',
+    'Star Changes (IST)', 'Sunrise', 'Sankranti (IST)', 'Month Start'
+]
+
+# RFC 5545 limits content lines to 75 octets, continued with CRLF + space
+ICS_LINE_OCTETS = 75
+
+
+def format_mal_date(mal_date):
+    return f"{mal_date['day']} {mal_date['mal_month']} {mal_date['mal_year']}"
+
+
+def format_changes(changes):
+    """'Rohini till 14:05:10, then Makayiram; ...' or '' for a day with no change."""
+    return '; '.join(
+        f"{c['nakshatra']} till {c['end_time']}, then {c['next_nakshatra']}" for c in changes
+    )
+
+
+def iter_csv(rows):
+    # BOM so Excel recognises UTF-8 (same as the bill export)
+    yield '\ufeff'
+
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(CSV_HEADERS)
+    yield output.getvalue()
+
+    for row in rows:
+        output.seek(0)
+        output.truncate(0)
+        sankranti = row['sankranti']
+        writer.writerow([
+            row['date'].isoformat(),
+            row['weekday'],
+            format_mal_date(row['mal_date']),
+            row['nakshatra_eng'],
+            row['nakshatra_mal'],
+            format_changes(row['transitions']),
+            row['sunrise'] or '',
+            f"{sankranti['mal_month']} {sankranti['time']}" if sankranti else '',
+            'Yes' if row['month_start'] else ''
+        ])
+        yield output.getvalue()
+
+
+def _ics_escape(text):
+    return (text.replace('\\', '\\\\').replace(';', '\\;')
+            .replace(',', '\\,').replace('\n', '\\n'))
+
+
+def _ics_line(line):
+    """Folds one content line at 75 octets without splitting a UTF-8 character."""
+    data = line.encode('utf-8')
+    parts = []
+    limit = ICS_LINE_OCTETS
+    while len(data) > limit:
+        cut = limit
+        # Step back off UTF-8 continuation bytes
+        while cut > 0 and (data[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(data[:cut].decode('utf-8'))
+        data = data[cut:]
+        # Continuation lines start with a space, which counts towards the limit
+        limit = ICS_LINE_OCTETS - 1
+    parts.append(data.decode('utf-8'))
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def _ics_event(uid, stamp, fields):
+    lines = ['BEGIN:VEVENT', f'UID:{uid}', f'DTSTAMP:{stamp}'] + fields + ['END:VEVENT']
+    return ''.join(_ics_line(line) for line in lines)
+
+
+def iter_ics(rows, calendar_name, uid_domain='devalaya.local'):
+    """
+    One all-day event per day (star and Malayalam date in the title, star changes
+    in the description) plus a timed event at each sankranti.
+    """
+    stamp = datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+    yield ''.join(_ics_line(line) for line in [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//Devalaya Pro//Almanac//EN',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{_ics_escape(calendar_name)}',
+        'X-WR-TIMEZONE:Asia/Kolkata'
+    ])
+
+    for row in rows:
+        day = row['date']
+        mal = row['mal_date']
+        description = [f"{row['nakshatra_mal']} | {mal['day']} {mal['mal_month_mal']} {mal['mal_year']}"]
+        if row['transitions']:
+            description.append(f"Star changes (IST): {format_changes(row['transitions'])}")
+        if row['sunrise']:
+            description.append(f"Sunrise: {row['sunrise']}")
+
+        yield _ics_event(f"{day.strftime('%Y%m%d')}-day@{uid_domain}", stamp, [
+            f"DTSTART;VALUE=DATE:{day.strftime('%Y%m%d')}",
+            f"DTEND;VALUE=DATE:{(day + datetime.timedelta(days=1)).strftime('%Y%m%d')}",
+            f"SUMMARY:{_ics_escape(row['nakshatra_eng'] + ' - ' + format_mal_date(mal))}",
+            f"DESCRIPTION:{_ics_escape(chr(10).join(description))}",
+            'TRANSP:TRANSPARENT'
+        ])
+
+        sankranti = row['sankranti']
+        if sankranti:
+            moment = datetime.datetime.combine(
+                day, datetime.datetime.strptime(sankranti['time'], '%H:%M:%S').time()
+            ).replace(tzinfo=datetime.timezone(datetime.timedelta(hours=5, minutes=30)))
+            utc = moment.astimezone(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+            yield _ics_event(f"{day.strftime('%Y%m%d')}-sankranti@{uid_domain}", stamp, [
+                f"DTSTART:{utc}",
+                f"DTEND:{utc}",
+                f"SUMMARY:{_ics_escape(sankranti['mal_month'] + ' Sankranti')}",
+                f"DESCRIPTION:{_ics_escape(sankranti['mal_month_mal'] + ' സംക്രമം ' + sankranti['time'] + ' IST')}",
+                'TRANSP:TRANSPARENT'
+            ])
+
+    yield _ics_line('END:VCALENDAR')
@@ -0,0 +1,304 @@
+import os
+import time
+import logging
+import sqlite3
+import datetime
+
+# Yearly archives: bills and bill_items of closed financial years (April to
+# March) are moved out of temple.db into archive_YYYY.db files (YYYY = the year
+# the financial year starts), so the hot database, its WAL, backups and VACUUM
+# stay proportional to the current year. Each archive also carries its own
+# summary tables, bill search index and a puja_master snapshot, rebuilt from
+# its bills, and is listed in bill_archives with the span of its dates.
+#
+# Pending (unpaid) bills, drafts and bills referenced by a correction
+# (original_bill_id) stay in temple.db. Archived bills are read-only history:
+# reports, exports and history search attach the archives their date range
+# needs (attach_for_range) and read through source(), which is the plain table
+# name when no archive is involved; reprinting attaches the one archive holding
+# the bill (attach_for_bill). Pooled connections detach them on release.
+#
+# Moving a year is copy, then delete, then clean up, each in its own
+# transaction: a bill is only deleted from temple.db once the archive holding
+# an identical copy is committed, and copies of bills that stayed (or were
+# left behind by an interrupted run) are dropped from the archive in the last
+# step, which every run repeats.
+
+FISCAL_YEAR_START_MONTH = 4
+HOT = ['main']
+
+# Built in each archive from its own bills; puja_master is a snapshot for item names
+DERIVED_TABLES = ('bill_daily_summary', 'bill_hourly_summary', 'item_daily_summary', 'bill_search', 'puja_master')
+
+ARCHIVE_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_bills_created_date ON bills(created_date)",
+    "CREATE INDEX IF NOT EXISTS idx_bills_effective_date ON bills(effective_date, status)",
+    "CREATE INDEX IF NOT EXISTS idx_bills_cashier_created_date ON bills(cashier_id, created_date)",
+    "CREATE INDEX IF NOT EXISTS idx_bill_items_bill_id ON bill_items(bill_id)",
+    "CREATE INDEX IF NOT EXISTS idx_item_daily_summary_scheduled ON item_daily_summary(scheduled_date)",
+]
+
+# Bills of temple.db (attached as schema s) that may be moved to an archive
+ELIGIBLE_SQL = '''
+    SELECT id FROM {s}.bills
+    WHERE created_date BETWEEN ? AND ?
+      AND IFNULL(status, '') != 'draft'
+      AND IFNULL(payment_status, '') != 'pending'
+      AND id NOT IN (SELECT original_bill_id FROM {s}.bills WHERE original_bill_id IS NOT NULL)
+'''
+
+
+def fiscal_year(day):
+    """Financial year (its starting calendar year) of a date."""
+    return day.year if day.month >= FISCAL_YEAR_START_MONTH else day.year - 1
+
+
+def fiscal_year_span(year):
+    """(first, last) ISO dates of a financial year."""
+    first = datetime.date(year, FISCAL_YEAR_START_MONTH, 1)
+    last = datetime.date(year + 1, FISCAL_YEAR_START_MONTH, 1) - datetime.timedelta(days=1)
+    return first.isoformat(), last.isoformat()
+
+
+def archive_dir(db_path=None):
+    from config import Config
+    return Config.ARCHIVE_PATH or os.path.dirname(os.path.abspath(db_path or Config.DB_PATH))
+
+
+def archive_filename(year):
+    return f"archive_{year}.db"
+
+
+def _columns(conn, schema, table):
+    """(name, declared type) of every column, generated ones included."""
+    return [(row[1], row[2]) for row in conn.execute(f"PRAGMA {schema}.table_xinfo({table})") if row[6] != 1]
+
+
+def _ensure_schema(conn):
+    """Creates (or widens) the archive tables, main being the archive and live temple.db."""
+    for table in ('bills', 'bill_items'):
+        live_columns = _columns(conn, 'live', table)
+        present = {name for name, _ in _columns(conn, 'main', table)}
+        if not present:
+            # Plain columns: effective_date / created_date keep the values computed in temple.db
+            defs = ', '.join('id INTEGER PRIMARY KEY' if name == 'id' else f"{name} {col_type}".strip()
+                             for name, col_type in live_columns)
+            conn.execute(f"CREATE TABLE {table} ({defs})")
+        else:
+            for name, col_type in live_columns:
+                if name not in present:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {col_type}".strip())
+
+    existing = {row[0] for row in conn.execute("SELECT name FROM main.sqlite_master")}
+    for table in DERIVED_TABLES:
+        if table not in existing:
+            sql = conn.execute("SELECT sql FROM live.sqlite_master WHERE name = ?", (table,)).fetchone()[0]
+            conn.execute(sql)
+    for sql in ARCHIVE_INDEXES:
+        conn.execute(sql)
+
+
+def closed_years(conn, today=None):
+    """Closed financial years that still have bills eligible for archiving in conn (temple.db)."""
+    current = fiscal_year(today or datetime.date.today())
+    first_open = fiscal_year_span(current)[0]
+    rows = conn.execute(f'''
+        SELECT DISTINCT CAST(strftime('%Y', created_date, '-{FISCAL_YEAR_START_MONTH - 1} months') AS INTEGER)
+        FROM bills WHERE id IN ({ELIGIBLE_SQL.format(s='main')})
+        ORDER BY 1
+    ''', ('0000-00-00', first_open)).fetchall()
+    return [row[0] for row in rows if row[0] < current]
+
+
+def archive_year(year, db_path=None, today=None):
+    """
+    Moves the eligible bills of a closed financial year (and their items) from
+    temple.db into its archive file, creating it when needed. Returns the number
+    of bills moved.
+    """
+    from config import Config
+    from modules import rollups, bill_search
+    from utils.timezone_utils import get_ist_timestamp
+
+    if year >= fiscal_year(today or datetime.date.today()):
+        raise ValueError(f"Financial year {year}-{(year + 1) % 100:02d} is not closed yet")
+
+    db_path = db_path or Config.DB_PATH
+    directory = archive_dir(db_path)
+    filename = archive_filename(year)
+    path = os.path.join(directory, filename)
+    first, last = fiscal_year_span(year)
+    eligible = ELIGIBLE_SQL.format(s='live')
+
+    t0 = time.perf_counter()
+    os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    try:
+        conn.execute("ATTACH DATABASE ? AS live", (db_path,))
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS archive_ids (id INTEGER PRIMARY KEY)")
+
+        # 1. Copy the bills and their items into the archive
+        conn.execute("BEGIN")
+        try:
+            _ensure_schema(conn)
+            conn.execute(f"INSERT INTO temp.archive_ids {eligible}", (first, last))
+            for table, key in (('bills', 'id'), ('bill_items', 'bill_id')):
+                cols = ', '.join(name for name, _ in _columns(conn, 'live', table))
+                conn.execute(f"DELETE FROM main.{table} WHERE {key} IN (SELECT id FROM temp.archive_ids)")
+                conn.execute(f'''
+                    INSERT INTO main.{table} ({cols}) SELECT {cols} FROM live.{table}
+                    WHERE {key} IN (SELECT id FROM temp.archive_ids)
+                ''')
+            cols = ', '.join(name for name, _ in _columns(conn, 'live', 'puja_master'))
+            conn.execute(f"INSERT OR REPLACE INTO main.puja_master ({cols}) SELECT {cols} FROM live.puja_master")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        # 2. Delete from temple.db the bills whose archived copy is still identical;
+        #    the summary and search triggers there take them out of the rollups
+        bill_columns = [name for name, _ in _columns(conn, 'live', 'bills')]
+        same = ' AND '.join(f"a.{name} IS b.{name}" for name in bill_columns)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(f'''
+                DELETE FROM temp.archive_ids
+                WHERE id NOT IN (SELECT b.id FROM live.bills b JOIN main.bills a ON a.id = b.id WHERE {same})
+                   OR id NOT IN ({eligible})
+            ''', (first, last))
+            conn.execute("DELETE FROM live.bill_items WHERE bill_id IN (SELECT id FROM temp.archive_ids)")
+            moved = conn.execute("DELETE FROM live.bills WHERE id IN (SELECT id FROM temp.archive_ids)").rowcount
+            conn.execute('''
+                INSERT OR REPLACE INTO live.bill_archives
+                    (fiscal_year, filename, first_date, last_date, bill_count, max_bill_seq, archived_at)
+                SELECT ?, ?, MIN(d), MAX(d),
+                       (SELECT COUNT(*) FROM main.bills WHERE id NOT IN (SELECT id FROM live.bills)),
+                       (SELECT MAX(bill_seq) FROM main.bills), ?
+                FROM (SELECT created_date AS d FROM main.bills
+                      UNION ALL SELECT effective_date FROM main.bills
+                      UNION ALL SELECT NULLIF(scheduled_date, '') FROM main.bills)
+            ''', (year, filename, get_ist_timestamp()))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        # 3. Drop archived copies of bills that are (still) in temple.db, then
+        #    rebuild the archive's own summaries and search index
+        conn.execute("BEGIN")
+        try:
+            conn.execute("DELETE FROM main.bill_items WHERE bill_id IN (SELECT id FROM live.bills)")
+            conn.execute("DELETE FROM main.bills WHERE id IN (SELECT id FROM live.bills)")
+            rollups.rebuild(conn)
+            bill_search.rebuild(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.close()
+
+    logging.info(f"Archived {moved} bills of {year}-{(year + 1) % 100:02d} to {path} in {time.perf_counter() - t0:.1f}s")
+    return moved
+
+
+def archive_closed_years(db_path=None, today=None):
+    """Archives every closed financial year with eligible bills. Returns {year: bills moved}."""
+    from config import Config
+
+    conn = sqlite3.connect(db_path or Config.DB_PATH, timeout=30)
+    try:
+        years = closed_years(conn, today)
+    finally:
+        conn.close()
+    return {year: archive_year(year, db_path, today) for year in years}
+
+
+def list_archives(db):
+    """bill_archives rows with the size of each file (None when it is missing)."""
+    archives = []
+    for row in db.execute("SELECT * FROM bill_archives ORDER BY fiscal_year DESC").fetchall():
+        entry = dict(row)
+        path = os.path.join(archive_dir(), row['filename'])
+        entry['size'] = os.path.getsize(path) if os.path.exists(path) else None
+        archives.append(entry)
+    return archives
+
+
+def attach_for_range(db, start_date=None, end_date=None):
+    """
+    Attaches to db the archives holding bills dated within start_date..end_date
+    (either end open when None) and returns the schemas to read, temple.db
+    ('main') first. Only the hot database is read when no archive is involved.
+    """
+    rows = db.execute('''
+        SELECT fiscal_year, filename FROM bill_archives
+        WHERE (? IS NULL OR first_date <= ?) AND (? IS NULL OR last_date >= ?)
+        ORDER BY fiscal_year DESC
+    ''', (end_date, end_date, start_date, start_date)).fetchall()
+    if not rows:
+        return list(HOT)
+
+    attached = {row[1] for row in db.execute("PRAGMA database_list")}
+    limit = db.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED) if hasattr(db, 'getlimit') else 10
+    schemas = list(HOT)
+    for year, filename in rows:
+        schema = f"archive_{int(year)}"
+        if schema not in attached:
+            path = os.path.join(archive_dir(), filename)
+            if not os.path.exists(path):
+                logging.warning(f"Archive {path} is missing; bills of {year} are left out")
+                continue
+            if len(attached - {'main', 'temp'}) >= limit:
+                logging.warning(f"Cannot attach more than {limit} archives; bills of {year} are left out")
+                continue
+            db.execute(f"ATTACH DATABASE ? AS {schema}", (path,))
+            attached.add(schema)
+        schemas.append(schema)
+    return schemas
+
+
+def attach_for_bill(db, bill_id):
+    """
+    Schemas to read one bill from: temple.db alone when it holds the bill, else
+    temple.db and the archive the bill was moved to (left attached).
+    """
+    if db.execute("SELECT 1 FROM main.bills WHERE id = ?", (bill_id,)).fetchone():
+        return list(HOT)
+    found = None
+    for schema in attach_for_range(db)[1:]:
+        if found is None and db.execute(f"SELECT 1 FROM {schema}.bills WHERE id = ?", (bill_id,)).fetchone():
+            found = schema
+        else:
+            db.execute(f"DETACH DATABASE {schema}")
+    return [*HOT, found] if found else list(HOT)
+
+
+def source(db, table, schemas):
+    """
+    FROM-clause source for table over schemas: the table itself for the hot
+    database alone, else a UNION ALL of the table in every schema (columns an
+    older archive lacks read as NULL) with the schema of each row in src, so
+    callers can tell archived rows, which are read-only, from live ones.
+    """
+    if len(schemas) == 1:
+        return table
+    columns = [name for name, _ in _columns(db, 'main', table)]
+    parts = []
+    for schema in schemas:
+        present = {name for name, _ in _columns(db, schema, table)}
+        select = ', '.join(name if name in present else f"NULL AS {name}" for name in columns)
+        parts.append(f"SELECT {select}, '{schema}' AS src FROM {schema}.{table}")
+    return '(' + ' UNION ALL '.join(parts) + ')'
+
+
+def table_for(row, table):
+    """
+    table in the schema a row read through source() came from (its src), so the
+    rows related to it are looked up in the same database file.
+    """
+    if 'src' in row.keys() and row['src']:
+        return f"{row['src']}.{table}"
+    return table
@@ -0,0 +1,70 @@
+# Full-text index over bills (bill_search, an FTS5 table in temple.db) for the
+# cashier history and admin report searches. One row per bill, rowid = bills.id,
+# kept in sync by triggers on bills, bill_items and puja_master (see the schema
+# migrations in database.py) and rebuilt with the summary tables.
+#
+# The unicode61 tokenizer treats Malayalam vowel signs and the virama as
+# separators, which would cut every Malayalam word into single letters; the
+# whole Malayalam block (and ZWJ/ZWNJ, used in chillu sequences) is therefore
+# declared as token characters, and diacritics are kept.
+
+TOKENCHARS = ''.join(chr(c) for c in range(0x0D00, 0x0D80)) + '\u200c\u200d'
+TOKENIZE = f"unicode61 remove_diacritics 0 tokenchars '{TOKENCHARS}'"
+
+
+def star_names_sql(column):
+    """SQL for the star in English and Malayalam, so either spelling finds the bill."""
+    from modules.panchang import NAKSHATRAS_ENG, NAKSHATRAS_MAL
+
+    cases = ' '.join(f"WHEN '{eng}' THEN '{eng} {mal}'" for eng, mal in zip(NAKSHATRAS_ENG, NAKSHATRAS_MAL))
+    return f"CASE {column} {cases} ELSE {column} END"
+
+
+def row_sql(where):
+    """SELECT producing the bill_search row(s) of the bills matching where (bills aliased as b)."""
+    return f'''
+        SELECT b.id, b.bill_no, b.devotee_name, b.phone, {star_names_sql('b.star')},
+               (SELECT group_concat(pm.name, ' ') FROM bill_items bi
+                JOIN puja_master pm ON pm.id = bi.puja_id WHERE bi.bill_id = b.id)
+        FROM bills b
+        WHERE {where}
+    '''
+
+
+def rebuild(conn):
+    """Re-indexes every bill inside the caller's transaction."""
+    conn.execute("DELETE FROM bill_search")
+    conn.execute(f"INSERT INTO bill_search (rowid, bill_no, devotee_name, phone, star, items) {row_sql('1')}")
+
+
+def match_query(text):
+    """
+    FTS5 query for what a user typed: every whitespace-separated word must match
+    the start of a word in the bill (so 'B-2025-1' finds B-2025-12, and 'ram'
+    finds Raman). Returns None when there is nothing searchable in text.
+    """
+    terms = [t for t in (text or '').split() if any(ch.isalnum() for ch in t)]
+    if not terms:
+        return None
+    return ' '.join('"' + t.replace('"', '""') + '"*' for t in terms)
+
+
+def condition(text, alias='b', schemas=None):
+    """
+    (SQL condition, params) restricting alias to bills matching text, looked up
+    in the bill_search index of each schema (temple.db and any attached yearly
+    archives, see modules/archive.py; temple.db alone when None). Over several
+    schemas alias must be read through archive.source(), and each row is matched
+    against the index of its own schema (alias.src), since a bill id is only
+    unique within one database file.
+    """
+    query = match_query(text)
+    if query is None:
+        return '0', []
+    if not schemas or len(schemas) == 1:
+        return f"{alias}.id IN (SELECT rowid FROM bill_search WHERE bill_search MATCH ?)", [query]
+    lookups = ' OR '.join(
+        f"({alias}.src = '{schema}' AND {alias}.id IN (SELECT rowid FROM {schema}.bill_search WHERE bill_search MATCH ?))"
+        for schema in schemas
+    )
+    return f"({lookups})", [query] * len(schemas)
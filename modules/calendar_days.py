@@ -0,0 +1,194 @@
+import time
+import logging
+import sqlite3
+import datetime
+import threading
+
+# Materialized date dimension in temple.db: one row per day with the Malayalam
+# date, star of the day (at sunrise for the temple's location) and sankranti /
+# festival flags. Reports JOIN bills to it instead of calling panchang per row,
+# and the dashboard reads today's row. Rebuilt in the background whenever the
+# temple location (or the panchang algorithm version) changes.
+
+# Span kept around today, in whole calendar years
+YEARS_BEFORE = 5
+YEARS_AFTER = 5
+
+# Festivals fixed by Malayalam month and star, day or tithi at sunrise.
+# Tithi indices: 0-14 Shukla Prathama..Pournami, 15-29 Krishna Prathama..Amavasi.
+FESTIVALS = [
+    {'name': 'Thiruvonam (Onam)', 'mal_month': 'Chingam', 'star': 'Thiruvonam'},
+    {'name': 'Mandala Kalam begins', 'mal_month': 'Vrischikam', 'day': 1},
+    {'name': 'Thiruvathira', 'mal_month': 'Dhanu', 'star': 'Thiruvathira'},
+    {'name': 'Thaipooyam', 'mal_month': 'Makaram', 'star': 'Pooyam'},
+    {'name': 'Shivaratri', 'mal_month': 'Kumbham', 'tithi': 28},
+    {'name': 'Vishu', 'mal_month': 'Medam', 'day': 1},
+    {'name': 'Karkidaka Vavu', 'mal_month': 'Karkidakam', 'tithi': 29},
+]
+
+_lock = threading.Lock()
+_thread = None
+_pending = None
+
+
+def _span(today=None):
+    today = today or datetime.date.today()
+    return datetime.date(today.year - YEARS_BEFORE, 1, 1), datetime.date(today.year + YEARS_AFTER, 12, 31)
+
+
+def _festival(mal_date, star, tithi):
+    for fest in FESTIVALS:
+        if fest['mal_month'] != mal_date['mal_month']:
+            continue
+        if ('star' in fest and fest['star'] == star) or ('day' in fest and fest['day'] == mal_date['day']) \
+                or ('tithi' in fest and fest['tithi'] == tithi):
+            return fest['name']
+    return None
+
+
+def build_rows(start_date, end_date, lat, lon):
+    """Rows for calendar_days, computed with one range call per quantity."""
+    from modules import panchang
+
+    days = (end_date - start_date).days + 1
+    stars = panchang.get_nakshatra_indices(start_date, days, lat, lon)
+    mal_dates = panchang.get_malayalam_dates(start_date, days)
+    tithis = panchang.get_panchanga_indices(start_date, days, lat, lon)['tithi']
+    sankrantis = panchang.get_sankrantis(start_date, days)
+
+    rows = []
+    for i, mal in enumerate(mal_dates):
+        day = start_date + datetime.timedelta(days=i)
+        star = panchang.NAKSHATRAS_ENG[int(stars[i])]
+        rows.append((
+            day.isoformat(),
+            mal['day'],
+            panchang.MAL_MONTHS_ENG.index(mal['mal_month']),
+            mal['mal_month'],
+            mal['mal_year'],
+            int(stars[i]),
+            star,
+            1 if day in sankrantis else 0,
+            1 if mal['day'] == 1 else 0,
+            _festival(mal, star, int(tithis[i]))
+        ))
+    return rows
+
+
+def _location_key(lat, lon):
+    return f"{float(lat):.2f},{float(lon):.2f}"
+
+
+def is_stale(conn, lat, lon, today=None):
+    """True when the table was built for another location or version, or no longer covers the span."""
+    from modules import panchang
+
+    row = conn.execute(
+        "SELECT location, version, start_date, end_date FROM calendar_days_meta WHERE id = 1"
+    ).fetchone()
+    if row is None:
+        return True
+    start, end = _span(today)
+    return (row[0] != _location_key(lat, lon) or row[1] != panchang._cache_version()
+            or row[2] > start.isoformat() or row[3] < end.isoformat())
+
+
+def refresh(lat, lon, db_path=None):
+    """Rebuilds calendar_days for the span around today, replacing it in one transaction."""
+    from config import Config
+    from modules import panchang
+
+    t0 = time.perf_counter()
+    start, end = _span()
+    rows = build_rows(start, end, lat, lon)
+
+    conn = sqlite3.connect(db_path or Config.DB_PATH, timeout=30)
+    try:
+        with conn:
+            conn.execute("DELETE FROM calendar_days")
+            conn.executemany('''
+                INSERT INTO calendar_days (day, mal_day, mal_month_index, mal_month, mal_year,
+                                           star_index, star, is_sankranti, is_month_start, festival)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+            conn.execute('''
+                INSERT OR REPLACE INTO calendar_days_meta (id, location, version, start_date, end_date, refreshed_at)
+                VALUES (1, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ''', (_location_key(lat, lon), panchang._cache_version(), start.isoformat(), end.isoformat()))
+    finally:
+        conn.close()
+
+    logging.info(f"calendar_days refreshed: {len(rows)} days for ({lat}, {lon}) in {time.perf_counter() - t0:.1f}s")
+    return len(rows)
+
+
+def refresh_if_stale(lat, lon, db_path=None):
+    """Synchronous check-and-refresh (used before forking workers). Returns True if rebuilt."""
+    from config import Config
+
+    conn = sqlite3.connect(db_path or Config.DB_PATH, timeout=30)
+    try:
+        stale = is_stale(conn, lat, lon)
+    finally:
+        conn.close()
+    if stale:
+        refresh(lat, lon, db_path)
+    return stale
+
+
+def configured_location(db_path=None):
+    """Temple latitude/longitude from temple_settings, read with a short-lived connection."""
+    from config import Config
+    from modules import panchang
+
+    try:
+        conn = sqlite3.connect(db_path or Config.DB_PATH, timeout=30)
+        try:
+            row = conn.execute('SELECT latitude, longitude FROM temple_settings WHERE id=1').fetchone()
+        finally:
+            conn.close()
+        if row and row[0] is not None and row[1] is not None:
+            return row[0], row[1]
+    except sqlite3.Error:
+        pass
+    return panchang.DEFAULT_LAT, panchang.DEFAULT_LON
+
+
+def _refresh_worker():
+    global _thread, _pending
+    while True:
+        with _lock:
+            if _pending is None:
+                _thread = None
+                return
+            lat, lon, only_if_stale = _pending
+            _pending = None
+        try:
+            if lat is None or lon is None:
+                lat, lon = configured_location()
+            if only_if_stale:
+                refresh_if_stale(lat, lon)
+            else:
+                refresh(lat, lon)
+        except Exception as e:
+            logging.error(f"calendar_days refresh failed: {e}", exc_info=True)
+
+
+def start_refresh(lat=None, lon=None, only_if_stale=False):
+    """
+    Refreshes on a daemon thread (for the configured location when lat/lon are
+    omitted). A request arriving while a refresh runs is queued (latest wins),
+    so the table always ends at the newest location.
+    """
+    global _thread, _pending
+    with _lock:
+        _pending = (lat, lon, only_if_stale)
+        if _thread is None:
+            _thread = threading.Thread(target=_refresh_worker, daemon=True)
+            _thread.start()
+    return _thread
+
+
+def get_day(db, date_obj):
+    """The calendar_days row for a date, or None when it is outside the table."""
+    return db.execute("SELECT * FROM calendar_days WHERE day = ?", (date_obj.isoformat(),)).fetchone()
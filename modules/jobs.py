@@ -0,0 +1,223 @@
+import os
+import json
+import time
+import uuid
+import logging
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Background jobs for slow, read-only computations (e.g. long star searches).
+# Work runs on a small thread pool per process; job state and results live in a
+# SQLite table next to the panchang cache, so a poll answered by any gunicorn
+# worker sees the job, and a finished result doubles as a cache entry for its key.
+
+MAX_WORKERS = 2
+# Jobs waiting in this process beyond which new submissions are refused
+MAX_QUEUED = 20
+# Finished results are reused for this long, then purged
+RESULT_TTL_SECONDS = 24 * 3600
+# A queued/running job not updated for this long is treated as lost (worker restarted)
+STALE_SECONDS = 300
+# How often a process refreshes updated_at on the jobs it holds, well inside STALE_SECONDS
+HEARTBEAT_SECONDS = 60
+
+_lock = threading.Lock()
+_executor = None
+_executor_pid = None
+_queued = 0
+# Ids of the jobs queued or running in this process, kept alive by the heartbeat
+_owned = set()
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+def _connect():
+    from config import Config
+    conn = sqlite3.connect(Config.PANCHANG_CACHE_PATH, timeout=5)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA busy_timeout=5000;")
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            key TEXT NOT NULL,
+            status TEXT NOT NULL,
+            progress INTEGER NOT NULL DEFAULT 0,
+            result TEXT,
+            error TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_key ON jobs(key, status)")
+    return conn
+
+
+def _get_executor():
+    # Pools do not survive fork; each process builds its own on first use
+    global _executor, _executor_pid
+    if _executor is None or _executor_pid != os.getpid():
+        _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='job')
+        _executor_pid = os.getpid()
+        _owned.clear()
+        threading.Thread(target=_heartbeat, name='job-heartbeat', daemon=True).start()
+    return _executor
+
+
+def _heartbeat():
+    # A job can wait in the pool or run without progress for longer than
+    # STALE_SECONDS; touching it here keeps other workers from sweeping it as lost.
+    while True:
+        time.sleep(HEARTBEAT_SECONDS)
+        with _lock:
+            ids = list(_owned)
+        if not ids:
+            continue
+        try:
+            conn = _connect()
+            try:
+                conn.execute(
+                    f"UPDATE jobs SET updated_at=? WHERE status IN ('queued', 'running') AND id IN ({','.join('?' * len(ids))})",
+                    (time.time(), *ids)
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logging.warning(f"Job heartbeat failed: {e}")
+
+
+def _update(job_id, from_status=None, **fields):
+    """Sets fields on a job, only while it is in from_status if given; True if a row changed."""
+    fields['updated_at'] = time.time()
+    columns = ', '.join(f"{name}=?" for name in fields)
+    where, params = "id=?", [job_id]
+    if from_status is not None:
+        where += " AND status=?"
+        params.append(from_status)
+    conn = _connect()
+    try:
+        changed = conn.execute(f"UPDATE jobs SET {columns} WHERE {where}", (*fields.values(), *params)).rowcount
+        conn.commit()
+    finally:
+        conn.close()
+    return changed > 0
+
+
+def _run(job_id, fn, args):
+    global _queued
+    with _lock:
+        _queued -= 1
+    try:
+        if not _update(job_id, 'queued', status='running'):
+            # Swept as lost (or gone) while waiting; a newer job may already hold its key
+            logging.warning(f"Job {job_id} is no longer queued, not starting it")
+            return
+
+        last = {'progress': 0}
+        def progress(pct):
+            pct = int(pct)
+            # Throttle writes: only record whole steps of 5%
+            if pct >= last['progress'] + 5:
+                last['progress'] = pct
+                _update(job_id, progress=pct)
+
+        result = fn(progress, *args)
+        _update(job_id, status='done', progress=100, result=json.dumps(result))
+    except Exception as e:
+        logging.error(f"Job {job_id} failed: {e}", exc_info=True)
+        _update(job_id, status='failed', error=str(e))
+    finally:
+        with _lock:
+            _owned.discard(job_id)
+
+
+def cached_result(key):
+    """Result of a finished job for `key` within RESULT_TTL_SECONDS, or None."""
+    conn = _connect()
+    try:
+        row = conn.execute(
+            "SELECT result FROM jobs WHERE key=? AND status='done' AND updated_at > ? ORDER BY updated_at DESC LIMIT 1",
+            (key, time.time() - RESULT_TTL_SECONDS)
+        ).fetchone()
+    finally:
+        conn.close()
+    return json.loads(row['result']) if row else None
+
+
+def submit(key, fn, *args):
+    """
+    Runs fn(progress, *args) in the background and returns the job id.
+    A job already queued or running for the same key is reused.
+    Raises JobQueueFull when this process has too many jobs waiting.
+    """
+    global _queued
+    now = time.time()
+    conn = _connect()
+    try:
+        # Housekeeping: drop expired results and lost jobs
+        conn.execute("DELETE FROM jobs WHERE updated_at < ?", (now - RESULT_TTL_SECONDS,))
+        conn.execute(
+            "UPDATE jobs SET status='failed', error='Interrupted' WHERE status IN ('queued', 'running') AND updated_at < ?",
+            (now - STALE_SECONDS,)
+        )
+        # Committed on its own so it also happens when the queue is full
+        conn.commit()
+
+        row = conn.execute(
+            "SELECT id FROM jobs WHERE key=? AND status IN ('queued', 'running') LIMIT 1", (key,)
+        ).fetchone()
+        if row:
+            return row['id']
+
+        with _lock:
+            if _queued >= MAX_QUEUED:
+                raise JobQueueFull("Too many background jobs, try again shortly")
+            _queued += 1
+
+        job_id = uuid.uuid4().hex
+        try:
+            conn.execute(
+                "INSERT INTO jobs (id, key, status, progress, created_at, updated_at) VALUES (?, ?, 'queued', 0, ?, ?)",
+                (job_id, key, now, now)
+            )
+            conn.commit()
+        except Exception:
+            with _lock:
+                _queued -= 1
+            raise
+    finally:
+        conn.close()
+
+    try:
+        executor = _get_executor()
+        with _lock:
+            _owned.add(job_id)
+        executor.submit(_run, job_id, fn, args)
+    except Exception as e:
+        with _lock:
+            _queued -= 1
+            _owned.discard(job_id)
+        _update(job_id, status='failed', error=str(e))
+        raise
+    return job_id
+
+
+def get(job_id):
+    """Job state as a dict (status, progress, result/error), or None if unknown."""
+    conn = _connect()
+    try:
+        row = conn.execute("SELECT * FROM jobs WHERE id=?", (job_id,)).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        return None
+
+    job = {'id': row['id'], 'status': row['status'], 'progress': row['progress']}
+    if row['status'] == 'done':
+        job['result'] = json.loads(row['result'])
+    elif row['status'] == 'failed':
+        job['error'] = row['error']
+    return job
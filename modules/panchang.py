@@ -1,9 +1,14 @@
 import os
 import sys
+import time
 import datetime
+import threading
+import numpy as np
 from skyfield.api import load, Loader, Topos, wgs84
 from skyfield.framelib import ecliptic_frame
-from functools import lru_cache
+from functools import lru_cache, wraps
+from modules import panchang_cache
+from modules import panchang_analytic
 
 # Constants for Malayalam Nakshatras
 NAKSHATRAS_ENG = [
@@ -35,35 +40,155 @@ if not os.path.exists(DATA_DIR):
 # Global variables for skyfield
 _ts = None
 _eph = None
+# TDB Julian day span every target of _eph covers, and full de421 for instants outside it
+_eph_span = None
+_eph_full = None
+
+# Ephemeris files. The trimmed file is an excerpt of de421 holding only the
+# segments the app reads (SSB->Sun, SSB->Earth-Moon barycentre, EMB->Earth,
+# EMB->Moon) for a shorter span; it is preferred when present, and the full
+# file is loaded on demand for instants outside that span (see _ephemeris_for).
+# Build it with scripts/trim_ephemeris.py (or trim_ephemeris below).
+EPHEMERIS_FILE = 'de421.bsp'
+TRIMMED_EPHEMERIS_FILE = 'de421_sun_moon.bsp'
+TRIMMED_EPHEMERIS_TARGETS = (3, 10, 301, 399)
+TRIM_START_YEAR = 1990
+TRIM_END_YEAR = 2060
+_load_lock = threading.Lock()
+
+# Ephemeris load / warm-up state, reported by the admin metrics endpoint and /health.
+# state: idle (nothing requested yet), pending/loading, ready, failed
+LOAD_METRICS = {
+    'state': 'idle',
+    'ephemeris_seconds': None,
+    'tables_seconds': None,
+    'precompute_seconds': None,
+    'loaded_at': None,
+    'ephemeris_file': None,
+    'error': None
+}
 
 def _get_skyfield_data():
     global _ts, _eph
     if _ts is None or _eph is None:
-        # Determine path to data
-        if getattr(sys, 'frozen', False):
-            # Bundled path
-            data_dir = os.path.join(sys._MEIPASS, 'data')
-            loader = Loader(data_dir)
-        else:
-            loader = Loader(DATA_DIR)
-
-        _ts = loader.timescale()
-        
-        # Use a reasonably small ephemeris (de421 covers 1900-2050)
-        # It will be downloaded to DATA_DIR if missing
-        # In frozen mode, it should be in sys._MEIPASS/data and found instantly
-        _eph = loader('de421.bsp')
+        # Only one thread loads; the others wait here and reuse its result
+        with _load_lock:
+            if _ts is None or _eph is None:
+                _load_skyfield_data()
     return _ts, _eph
 
+def _skyfield_data_dir():
+    if getattr(sys, 'frozen', False):
+        # Bundled path
+        return os.path.join(sys._MEIPASS, 'data')
+    return DATA_DIR
+
+def _ephemeris_for(t):
+    """
+    The loaded ephemeris if it covers every instant of the Skyfield Time `t`,
+    otherwise the full de421 (1900-2050), loaded (or downloaded) on first use.
+    """
+    global _eph_full
+    _, eph = _get_skyfield_data()
+    tdb = np.atleast_1d(t.tdb)
+    if tdb.size == 0 or (_eph_span[0] <= tdb.min() and tdb.max() <= _eph_span[1]):
+        return eph
+    if _eph_full is None:
+        with _load_lock:
+            if _eph_full is None:
+                _eph_full = Loader(_skyfield_data_dir())(EPHEMERIS_FILE)
+    return _eph_full
+
+def _load_skyfield_data():
+    global _ts, _eph, _eph_span
+    LOAD_METRICS['state'] = 'loading'
+    start = time.perf_counter()
+    try:
+        data_dir = _skyfield_data_dir()
+        loader = Loader(data_dir)
+
+        ts = loader.timescale()
+
+        # Prefer the trimmed Sun/Moon/Earth excerpt (smaller to load and map).
+        # Otherwise use de421 (covers 1900-2050), downloaded to DATA_DIR if missing.
+        # In frozen mode, it should be in sys._MEIPASS/data and found instantly
+        filename = EPHEMERIS_FILE
+        if os.path.exists(os.path.join(data_dir, TRIMMED_EPHEMERIS_FILE)):
+            filename = TRIMMED_EPHEMERIS_FILE
+        eph = loader(filename)
+        # A target may be split over consecutive segments; take each target's
+        # overall span, then the part all of them cover
+        spans = {}
+        for segment in eph.segments:
+            if segment.target in TRIMMED_EPHEMERIS_TARGETS:
+                start_jd, end_jd = spans.get(segment.target, (np.inf, -np.inf))
+                spans[segment.target] = (min(start_jd, segment.spk_segment.start_jd),
+                                         max(end_jd, segment.spk_segment.end_jd))
+        span = (max(s for s, _ in spans.values()), min(e for _, e in spans.values()))
+    except Exception as e:
+        LOAD_METRICS['state'] = 'failed'
+        LOAD_METRICS['error'] = str(e)
+        raise
+
+    # Publish both together so readers never see a half-initialised pair
+    _ts, _eph, _eph_span = ts, eph, span
+    LOAD_METRICS['ephemeris_seconds'] = round(time.perf_counter() - start, 3)
+    LOAD_METRICS['ephemeris_file'] = filename
+    LOAD_METRICS['loaded_at'] = datetime.datetime.now(IST).isoformat(timespec='seconds')
+    LOAD_METRICS['state'] = 'ready'
+    LOAD_METRICS['error'] = None
+
+def trim_ephemeris(start_year=TRIM_START_YEAR, end_year=TRIM_END_YEAR, source=None, output=None):
+    """
+    Writes an excerpt of the full ephemeris with only TRIMMED_EPHEMERIS_TARGETS
+    between 1 Jan `start_year` and 1 Jan `end_year` (clipped to what the source
+    covers). Written to a temporary file and renamed, so a partial file is never
+    picked up by the loader. Returns (path, start_jd, end_jd).
+    """
+    from jplephem.daf import DAF
+    from jplephem.spk import SPK
+    from jplephem.excerpter import write_excerpt
+
+    source = source or os.path.join(DATA_DIR, EPHEMERIS_FILE)
+    output = output or os.path.join(DATA_DIR, TRIMMED_EPHEMERIS_FILE)
+
+    def julian_day(year):
+        return UNIX_EPOCH_JD + (datetime.date(year, 1, 1) - datetime.date(1970, 1, 1)).days
+
+    tmp = output + '.tmp'
+    with open(source, 'rb') as f:
+        spk = SPK(DAF(f))
+        pairs = [(summary, segment) for summary, segment in zip(spk.daf.summaries(), spk.segments)
+                 if segment.target in TRIMMED_EPHEMERIS_TARGETS]
+        missing = set(TRIMMED_EPHEMERIS_TARGETS) - {segment.target for _, segment in pairs}
+        if missing:
+            raise ValueError(f"{source} has no segments for targets {sorted(missing)}")
+
+        # The excerpt claims the requested span, so never ask for more than the source
+        # has. Every excerpted segment is labelled with the same span, which is only
+        # correct when each target has a single segment (true of de421).
+        if len(pairs) != len(TRIMMED_EPHEMERIS_TARGETS):
+            raise ValueError(f"{source} splits a target over several segments; expected one each")
+        start_jd = max(julian_day(start_year), max(segment.start_jd for _, segment in pairs))
+        end_jd = min(julian_day(end_year), min(segment.end_jd for _, segment in pairs))
+        if start_jd >= end_jd:
+            raise ValueError(f"{source} does not cover {start_year}-{end_year}")
+
+        with open(tmp, 'w+b') as out:
+            write_excerpt(spk, out, start_jd, end_jd, [summary for summary, _ in pairs])
+    os.replace(tmp, output)
+    return output, start_jd, end_jd
+
 def get_moon_longitude(date_time):
     """
     Calculates the ecliptic longitude of the moon for a given datetime.
     """
-    ts, eph = _get_skyfield_data()
+    ts, _ = _get_skyfield_data()
     
     # Convert datetime to skyfield time
     # skyfield expects UTC
     t = ts.from_datetime(date_time.astimezone(datetime.timezone.utc))
+    eph = _ephemeris_for(t)
     
     moon = eph['moon']
     earth = eph['earth']
@@ -79,92 +204,543 @@ def get_moon_longitude(date_time):
 DEFAULT_LAT = 10.85
 DEFAULT_LON = 76.27
 
+IST = datetime.timezone(datetime.timedelta(hours=5, minutes=30))
+UNIX_EPOCH_JD = 2440587.5
+J2000_JD = 2451545.0
+
+# Lahiri Ayanamsa (linear approximation): value at J2000 and annual precession.
+AYANAMSA_J2000 = 23.85
+AYANAMSA_RATE_ARCSEC = 50.3
+# Precomputed tables are keyed by this, so they are rebuilt if the formula changes.
+AYANAMSA_MODEL = f"lahiri-{AYANAMSA_J2000}-{AYANAMSA_RATE_ARCSEC}"
+
+# Span covered by the precomputed tables (de421 covers 1900-2050)
+TABLE_START = datetime.date(1900, 1, 1)
+TABLE_END = datetime.date(2050, 12, 31)
+
+# Key for the shared on-disk result cache. Bump the suffix whenever a change
+# alters computed results so stale entries are ignored.
+CACHE_VERSION = f"{AYANAMSA_MODEL}-3"
+
+# Position engines: 'skyfield' (JPL de421 ephemeris) or 'analytic' (truncated Meeus
+# series in pure NumPy; no ephemeris load). Selected by Config.PANCHANG_ENGINE.
+ENGINES = ('skyfield', 'analytic')
+_engine = None
+
+def get_engine():
+    global _engine
+    if _engine is None:
+        from config import Config
+        _engine = Config.PANCHANG_ENGINE if Config.PANCHANG_ENGINE in ENGINES else 'skyfield'
+    return _engine
+
+def set_engine(name):
+    """Switches the position engine for this process and drops in-process results."""
+    global _engine
+    if name not in ENGINES:
+        raise ValueError(f"Unknown panchang engine: {name}")
+    _engine = name
+    _day_tables.clear()
+    for fn in (get_nakshatra_index, get_nakshatra, get_malayalam_date, get_month_calendar):
+        fn.cache_clear()
+
+def _cache_version():
+    return f"{CACHE_VERSION}-{get_engine()}"
+
+def get_moon_longitudes(times):
+    """
+    Vectorized form of get_moon_longitude.
+    Takes a Skyfield Time array and returns a NumPy array of ecliptic longitudes,
+    evaluating the whole array in a single ephemeris pass.
+    """
+    eph = _ephemeris_for(times)
+    astrometric = eph['earth'].at(times).observe(eph['moon'])
+    _, lon, _ = astrometric.frame_latlon(ecliptic_frame)
+    return lon.degrees
+
+def _moon_longitudes(unix_seconds):
+    """Moon ecliptic longitudes for Unix timestamps from the selected engine."""
+    if get_engine() == 'analytic':
+        return panchang_analytic.moon_longitude(unix_seconds)
+    return get_moon_longitudes(_to_skyfield_times(unix_seconds))
+
+def _sun_longitudes(unix_seconds):
+    """Sun ecliptic longitudes for Unix timestamps from the selected engine."""
+    if get_engine() == 'analytic':
+        return panchang_analytic.sun_longitude(unix_seconds)
+    return get_sun_longitudes(_to_skyfield_times(unix_seconds))
+
+def _to_skyfield_times(unix_seconds):
+    """
+    Converts an array of Unix timestamps (UTC seconds) to a Skyfield Time array.
+    UT1 is used in place of UTC; the difference is below one second.
+    """
+    ts, _ = _get_skyfield_data()
+    return ts.ut1_jd(np.asarray(unix_seconds, dtype=float) / 86400.0 + UNIX_EPOCH_JD)
+
+def _lahiri_ayanamsa(year_diff):
+    """
+    Lahiri Ayanamsa approximation. `year_diff` is years since J2000 (scalar or array).
+    """
+    return AYANAMSA_J2000 + (year_diff * AYANAMSA_RATE_ARCSEC / 3600.0)
+
+def _ayanamsa_at(unix_seconds):
+    """Ayanamsa for an array of Unix timestamps."""
+    jd = np.asarray(unix_seconds, dtype=float) / 86400.0 + UNIX_EPOCH_JD
+    return _lahiri_ayanamsa((jd - J2000_JD) / 365.25)
+
+def _nakshatra_positions(unix_seconds):
+    """
+    Moon's Nirayana longitude in "Nakshatra Units" (0.0 to 27.0) for an array of
+    Unix timestamps, using one ephemeris evaluation for the whole array.
+    """
+    lon_vals = _moon_longitudes(unix_seconds)
+    lon_nirayana = (lon_vals - _ayanamsa_at(unix_seconds)) % 360
+    return lon_nirayana * 27.0 / 360.0
+
+def _approx_sunrise_unix(start_date, days, lon=DEFAULT_LON):
+    """
+    Returns Unix timestamps of the approximate sunrise for `days` consecutive dates.
+    Used where no sunrise table can be built (e.g. outside the ephemeris span).
+
+    The "Star of the Day" is the star present at local sunrise. We approximate sunrise
+    as 6:00 AM IST corrected by 4 minutes per degree of longitude from the Indian
+    Standard Meridian (82.5 E), clamped to +/- 60 minutes.
+    e.g. Lon 76.27 -> (82.5 - 76.27) * 4 = ~25 mins -> Sunrise ~6:25 AM IST.
+    """
+    offset_minutes = (82.5 - float(lon)) * 4
+    offset_minutes = max(-60, min(60, offset_minutes))
+
+    dt = datetime.datetime.combine(start_date, datetime.time(6, 0)).replace(tzinfo=IST)
+    first = dt.timestamp() + offset_minutes * 60
+    return first + np.arange(days) * 86400.0
+
+# --- Precomputed Nakshatra Transition Table ---
+# Every nakshatra start instant across TABLE_START..TABLE_END, stored as a sorted
+# structured array (t: Unix seconds float64, index: int8) in a .npy file that is
+# memory-mapped at runtime. Star lookups then become binary searches and do not
+# need the ephemeris loaded.
+
+TRANSITION_DTYPE = np.dtype([('t', '<f8'), ('index', 'i1')])
+
+_tables = {}
+
+def _table_dirs():
+    """Directories searched for tables: bundled data first, then the writable data dir."""
+    if getattr(sys, 'frozen', False):
+        return [os.path.join(sys._MEIPASS, 'data'), os.path.join(os.path.dirname(sys.executable), 'data')]
+    return [DATA_DIR]
+
+def _table_filename(kind):
+    return f"{kind}_{AYANAMSA_MODEL}.npy"
+
+def _find_table(kind):
+    for d in _table_dirs():
+        path = os.path.join(d, _table_filename(kind))
+        if os.path.exists(path):
+            return path
+    return None
+
+def _save_table(kind, table):
+    """Writes a table atomically to the writable data dir and returns its path."""
+    target_dir = _table_dirs()[-1]
+    os.makedirs(target_dir, exist_ok=True)
+    path = os.path.join(target_dir, _table_filename(kind))
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.save(f, table)
+    os.replace(tmp_path, path)
+    return path
+
+def _date_to_unix(date_obj):
+    return datetime.datetime.combine(date_obj, datetime.time(0, 0)).replace(tzinfo=IST).timestamp()
+
+def find_transits(start_unix, end_unix, position_fn, step_seconds=3600.0, precision_seconds=1.0, chunk_size=20000):
+    """
+    Reusable transit finder for any longitude-based event.
+
+    `position_fn` maps an array of Unix timestamps to a continuous position whose
+    integer part identifies the current segment (e.g. nakshatra units 0-27 or
+    rasi units 0-12). Finds every instant in [start_unix, end_unix] where that
+    integer part changes.
+
+    Bracket-and-refine: the window is sampled at `step_seconds` in one batched call,
+    then all brackets containing a change are bisected together, one batched call
+    per round, until they are narrower than `precision_seconds`.
+    `step_seconds` must be shorter than the shortest segment being tracked.
+
+    Returns (times, values_before, values_after) as NumPy arrays.
+    """
+    grid = np.arange(float(start_unix), float(end_unix), step_seconds)
+    grid = np.append(grid, float(end_unix))
+
+    values = np.concatenate([
+        np.floor(position_fn(grid[i:i + chunk_size])).astype(int)
+        for i in range(0, len(grid), chunk_size)
+    ])
+
+    changes = np.flatnonzero(values[1:] != values[:-1])
+    iterations = max(1, int(np.ceil(np.log2(step_seconds / precision_seconds))))
+
+    times = []
+    for i in range(0, len(changes), chunk_size):
+        c = changes[i:i + chunk_size]
+        lo = grid[c]
+        hi = grid[c + 1]
+        lo_values = values[c]
+        for _ in range(iterations):
+            mid = (lo + hi) / 2.0
+            same = np.floor(position_fn(mid)).astype(int) == lo_values
+            lo = np.where(same, mid, lo)
+            hi = np.where(same, hi, mid)
+        times.append(hi)
+
+    times = np.concatenate(times) if times else np.zeros(0)
+    return times, values[changes], values[changes + 1]
+
+def build_nakshatra_table(start=TABLE_START, end=TABLE_END, step_hours=6):
+    """
+    Computes every nakshatra transition between `start` and `end` and saves the table.
+    The Moon moves ~3.3 degrees in 6 hours, far less than one nakshatra (13.33 deg),
+    so each coarse step holds at most one transition.
+    """
+    times, _, after = find_transits(
+        _date_to_unix(start), _date_to_unix(end) + 86400.0,
+        _nakshatra_positions, step_seconds=step_hours * 3600.0, precision_seconds=0.5
+    )
+
+    table = np.empty(len(times), dtype=TRANSITION_DTYPE)
+    table['t'] = times
+    table['index'] = after % 27
+
+    return _store_table('nakshatra_transitions', table)
+
+def _store_table(kind, table):
+    path = _save_table(kind, table)
+    _tables[kind] = np.load(path, mmap_mode='r')
+    return path
+
+def _get_table(kind):
+    """Returns the memory-mapped table of the given kind, or None if it has not been built."""
+    table = _tables.get(kind)
+    if table is None:
+        path = _find_table(kind)
+        if path is None:
+            return None
+        table = _tables[kind] = np.load(path, mmap_mode='r')
+    return table
+
+def _get_nakshatra_table():
+    return _get_table('nakshatra_transitions')
+
+def ensure_tables():
+    """Builds any missing precomputed tables (needs the ephemeris). Safe to call at startup."""
+    try:
+        panchang_cache.purge_stale(_cache_version())
+        if get_engine() == 'analytic':
+            # Tables are built from the ephemeris; existing ones are still used for lookups
+            return
+        if _get_nakshatra_table() is None:
+            build_nakshatra_table()
+        if _get_table('sankranti') is None:
+            build_sankranti_table()
+    except Exception as e:
+        import logging
+        logging.error(f"Could not build panchang tables: {e}")
+
+# --- Sunrise Tables ---
+# True sunrise/sunset for one year at one location (Unix seconds, indexed by day of
+# the year in IST). Built on first use with Skyfield's almanac and memory-mapped
+# like the other tables, so every "star at sunrise" lookup is an array read.
+
+SUNRISE_DTYPE = np.dtype([('sunrise', '<f8'), ('sunset', '<f8')])
+# Years whose table could not be built (no ephemeris, out of span), to avoid retrying.
+_sunrise_unavailable = set()
+
+def _round_location(lat, lon):
+    """Sunrise tables are shared within 0.01 degree (~1 km, a few seconds of sunrise)."""
+    return round(float(lat), 2), round(float(lon), 2)
+
+def _sunrise_table_kind(year, lat, lon):
+    lat, lon = _round_location(lat, lon)
+    return f"sunrise_{year}_{lat:.2f}_{lon:.2f}"
+
+def build_sunrise_table(year, lat=DEFAULT_LAT, lon=DEFAULT_LON):
+    """
+    Computes sunrise and sunset for every day of `year` with one vectorized almanac
+    search per event and saves the table. Days without a rising or setting hold NaN.
+    """
+    from skyfield import almanac
+    lat, lon = _round_location(lat, lon)
+
+    start_unix = _date_to_unix(datetime.date(year, 1, 1))
+    days = (datetime.date(year + 1, 1, 1) - datetime.date(year, 1, 1)).days
+    span = _to_skyfield_times([start_unix, start_unix + days * 86400.0])
+    t0, t1 = span
+    eph = _ephemeris_for(span)
+
+    observer = eph['earth'] + wgs84.latlon(lat, lon)
+    table = np.full(days, np.nan, dtype=SUNRISE_DTYPE)
+    for field, finder in (('sunrise', almanac.find_risings), ('sunset', almanac.find_settings)):
+        t, crossed = finder(observer, eph['sun'], t0, t1)
+        unix = (t.ut1 - UNIX_EPOCH_JD) * 86400.0
+        day_idx = np.floor((unix - start_unix) / 86400.0).astype(int)
+        keep = crossed & (day_idx >= 0) & (day_idx < days)
+        table[field][day_idx[keep]] = unix[keep]
+
+    return _store_table(_sunrise_table_kind(year, lat, lon), table)
+
+def _get_sunrise_table(year, lat, lon):
+    """Returns the year's sunrise table for a location, building it on first use."""
+    kind = _sunrise_table_kind(year, lat, lon)
+    table = _get_table(kind)
+    if table is not None or kind in _sunrise_unavailable:
+        return table
+    if not (TABLE_START.year <= year <= TABLE_END.year):
+        _sunrise_unavailable.add(kind)
+        return None
+    try:
+        build_sunrise_table(year, lat, lon)
+    except Exception as e:
+        import logging
+        logging.error(f"Could not build sunrise table for {kind}: {e}")
+        _sunrise_unavailable.add(kind)
+        return None
+    return _get_table(kind)
+
+def get_sun_times(start_date, days, lat=DEFAULT_LAT, lon=DEFAULT_LON):
+    """
+    Range API: (sunrise, sunset) Unix timestamps for `days` consecutive dates.
+    Entries are NaN where no table is available.
+    """
+    sunrise = np.full(days, np.nan)
+    sunset = np.full(days, np.nan)
+    if days <= 0:
+        return sunrise, sunset
+
+    if get_engine() == 'analytic':
+        midnights = _date_to_unix(start_date) + 86400.0 * np.arange(days)
+        return panchang_analytic.sun_times(midnights, float(lat), float(lon))
+
+    end_date = start_date + datetime.timedelta(days=days - 1)
+    for year in range(start_date.year, end_date.year + 1):
+        table = _get_sunrise_table(year, lat, lon)
+        if table is None:
+            continue
+        # Overlap of the requested window with this year, as offsets into both arrays
+        first = max(start_date, datetime.date(year, 1, 1))
+        last = min(end_date, datetime.date(year, 12, 31))
+        src = (first - datetime.date(year, 1, 1)).days
+        dst = (first - start_date).days
+        n = (last - first).days + 1
+        sunrise[dst:dst + n] = table['sunrise'][src:src + n]
+        sunset[dst:dst + n] = table['sunset'][src:src + n]
+    return sunrise, sunset
+
+def _sunrise_unix(start_date, days, lat=DEFAULT_LAT, lon=DEFAULT_LON):
+    """
+    Sunrise Unix timestamps for `days` consecutive dates: true sunrise from the
+    location's yearly tables, falling back to the longitude approximation.
+    """
+    sunrise, _ = get_sun_times(start_date, days, lat, lon)
+    missing = np.isnan(sunrise)
+    if missing.any():
+        sunrise[missing] = _approx_sunrise_unix(start_date, days, lon)[missing]
+    return sunrise
+
+_warm_up_thread = None
+
+def warm_up():
+    """
+    Loads the ephemeris and builds any missing tables ahead of the first request.
+    With the analytic engine nothing needs loading.
+    """
+    if get_engine() == 'analytic':
+        LOAD_METRICS['state'] = 'ready'
+        ensure_tables()
+        return
+
+    try:
+        _get_skyfield_data()
+    except Exception as e:
+        import logging
+        logging.error(f"Ephemeris warm-up failed: {e}")
+        return
+
+    start = time.perf_counter()
+    ensure_tables()
+    LOAD_METRICS['tables_seconds'] = round(time.perf_counter() - start, 3)
+
+def warm_up_before_fork(lat=DEFAULT_LAT, lon=DEFAULT_LON):
+    """
+    Pre-fork warm-up for a preloading server (gunicorn master). Runs synchronously
+    so no thread or lock is live at fork time:
+      - loads the ephemeris and evaluates it once, so jplephem memory-maps the
+        Sun/Moon/Earth segments and workers share those pages
+      - maps the precomputed tables and this year's and next year's sunrise tables
+      - fills the day table (star, Malayalam date) for this year and next
+      - closes the shared-cache connection, which must not cross the fork
+    """
+    warm_up()
+    if get_engine() == 'skyfield' and LOAD_METRICS['state'] == 'ready':
+        ts, _ = _get_skyfield_data()
+        get_moon_longitudes(ts.now())
+        get_sun_longitudes(ts.now())
+
+    this_year = datetime.date.today().year
+    first = datetime.date(this_year, 1, 1)
+    days = (datetime.date(this_year + 2, 1, 1) - first).days
+    start = time.perf_counter()
+    try:
+        precompute_days(first, days, lat, lon)
+    except Exception as e:
+        import logging
+        logging.error(f"Could not precompute panchang days: {e}")
+    LOAD_METRICS['precompute_seconds'] = round(time.perf_counter() - start, 3)
+
+    panchang_cache.close()
+
+def start_warm_up():
+    """Starts warm_up() on a daemon thread (once per process). Returns the thread."""
+    global _warm_up_thread
+    with _load_lock:
+        if _warm_up_thread is None:
+            if LOAD_METRICS['state'] == 'idle':
+                LOAD_METRICS['state'] = 'pending'
+            _warm_up_thread = threading.Thread(target=warm_up, daemon=True)
+            _warm_up_thread.start()
+    return _warm_up_thread
+
+def is_ready():
+    """
+    False only while a load is pending or in progress. A failed load still counts
+    as ready: billing works without the ephemeris and the error shows in the metrics.
+    """
+    return LOAD_METRICS['state'] not in ('pending', 'loading')
+
+def get_load_metrics():
+    metrics = dict(LOAD_METRICS)
+    metrics['engine'] = get_engine()
+    metrics['ready'] = is_ready()
+    metrics['tables'] = {
+        kind: (len(table) if table is not None else None)
+        for kind, table in (('nakshatra_transitions', _get_table('nakshatra_transitions')),
+                            ('sankranti', _get_table('sankranti')))
+    }
+    metrics['cache'] = panchang_cache.stats()
+    return metrics
+
+def _lookup_nakshatra_indices(unix_seconds):
+    """
+    Binary search of the transition table. Returns None if the table is missing
+    or any instant falls outside its span (callers then use the ephemeris).
+    """
+    table = _get_nakshatra_table()
+    if table is None or len(table) < 2:
+        return None
+
+    unix_seconds = np.asarray(unix_seconds, dtype=float)
+    pos = np.searchsorted(table['t'], unix_seconds, side='right') - 1
+    if pos.min() < 0 or pos.max() >= len(table) - 1:
+        return None
+
+    return table['index'][pos].astype(int)
+
+def _table_transitions(start_dt, end_dt):
+    """
+    Transitions between two datetimes from the table, in the same shape as
+    _find_nakshatra_times. Returns None if the window is not covered.
+    """
+    table = _get_nakshatra_table()
+    if table is None or len(table) < 2:
+        return None
+
+    t = table['t']
+    lo = np.searchsorted(t, start_dt.timestamp(), side='right')
+    hi = np.searchsorted(t, end_dt.timestamp(), side='right')
+    if lo == 0 or hi >= len(table):
+        return None
+
+    return _transition_records(t[lo:hi], table['index'][lo - 1:hi - 1], table['index'][lo:hi])
+
+def _transition_records(times, before, after):
+    """Formats transitions as dicts: the star ending, its end time (IST) and the next star."""
+    results = []
+    for t, prev_idx, next_idx in zip(times, before, after):
+        prev_idx = int(prev_idx) % 27
+        next_idx = int(next_idx) % 27
+        results.append({
+            'nakshatra': NAKSHATRAS_ENG[prev_idx],
+            'nakshatra_mal': NAKSHATRAS_MAL[prev_idx],
+            'end_time': datetime.datetime.fromtimestamp(round(float(t)), IST),
+            'next_nakshatra': NAKSHATRAS_ENG[next_idx]
+        })
+    return results
+
+# --- Precomputed Day Tables ---
+# Star and Malayalam date for every day of a span (normally this year and next) at
+# one location, held in memory. Filled once in the gunicorn master before fork so
+# all workers share the pages; consulted before the disk cache.
+_day_tables = {}
+
+def precompute_days(start_date, days, lat=DEFAULT_LAT, lon=DEFAULT_LON):
+    """Fills the in-memory day table for a span with one vectorized pass."""
+    _day_tables[_round_location(lat, lon)] = (
+        start_date,
+        get_nakshatra_indices(start_date, days, lat, lon).astype(np.int8),
+        get_malayalam_dates(start_date, days)
+    )
+
+def _precomputed_day(date_obj, lat, lon):
+    entry = _day_tables.get(_round_location(lat, lon))
+    if entry is None:
+        return None
+    start_date, indices, mal_dates = entry
+    i = (date_obj - start_date).days
+    if not 0 <= i < len(indices):
+        return None
+    return {'index': int(indices[i]), 'mal_date': mal_dates[i]}
+
+def _use_precomputed(field):
+    """Decorator: answer from the precomputed day table when the date is covered."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(date_obj, lat=DEFAULT_LAT, lon=DEFAULT_LON):
+            day = _precomputed_day(date_obj, lat, lon)
+            if day is not None:
+                return day[field]
+            return fn(date_obj, lat, lon)
+        return wrapper
+    return decorator
+
+def get_nakshatra_indices(start_date, days, lat=DEFAULT_LAT, lon=DEFAULT_LON):
+    """
+    Range API: nakshatra index (0-26) at sunrise for `days` consecutive dates
+    starting at `start_date`.
+    Uses the precomputed transition table when available; otherwise builds one
+    Skyfield Time array for every sunrise in the window, so moon longitude,
+    ayanamsa and index are computed in one NumPy pass instead of one call per date.
+    """
+    if days <= 0:
+        return np.zeros(0, dtype=int)
+
+    sunrises = _sunrise_unix(start_date, days, lat, lon)
+
+    indices = _lookup_nakshatra_indices(sunrises)
+    if indices is not None:
+        return indices
+
+    return _nakshatra_positions(sunrises).astype(int) % 27
+
 @lru_cache(maxsize=365)
+@_use_precomputed('index')
+@panchang_cache.disk_cached('nakshatra_index', _cache_version)
 def get_nakshatra_index(date_obj, lat=DEFAULT_LAT, lon=DEFAULT_LON):
     """
     Calculates the nakshatra index (0-26) for a given date.
     Following the Sunrise Rule: The star present at Sunrise is the Star of the Day.
     """
-    ts, eph = _get_skyfield_data()
-    
-    # Precise Sunrise Calculation
-    # We use Skyfield to find sunrise
-    # But for performance and "standard" calendar feel, we often use 6 AM Approx 
-    # BUT user requested "Precise based on location".
-    
-    # 1. Construct Observer
-    observer = wgs84.latlon(float(lat), float(lon))
-    
-    # 2. Find Sunrise? Expensive to iterate.
-    # Simplified approach: Use 6:00 AM Local Mean Time for that Longitude?
-    # Or just 6:00 AM IST (UTC+5:30) as "Standard Day Start".
-    # Most printed calendars use a standard location (e.g. Kozhikode) or specific.
-    # If user wants "Precise", we should try to approximate sunrise time or use standard 6 AM.
-    # The major difference comes from Longitude shifting the Moon's position relative to Sunrise.
-    
-    # Let's stick to 6:00 AM IST but allow overriding the "Observer" logic if we go full astronomical.
-    # Currently `get_nakshatra_index` uses 6 AM IST.
-    # Modifying to use precise astronomical sunrise is complex (iterative search).
-    # Compromise: Use 6:00 AM at the Temple's Local Time? 
-    # IST is fixed +5:30.
-    # Let's keep 6:00 AM IST as the "Civil Day Start" for simplicity unless specifically asked for "Astronomical Sunrise".
-    # The user said "star change based on IST timing" vs "temple's location".
-    # The Star Change happens at a specific time.
-    # The "Star of the Day" is decided by which star is present at Sunrise.
-    # Sunrise time varies by Latitude/Longitude.
-    # So we MUST calculate Sunrise for THIS lat/lon.
-    
-    # Fast Sunrise Approx:
-    # Sunrise ~ 6 AM - (Lon - 82.5) * 4 mins / 60? 
-    # Let's use 6:00 AM IST as baseline.
-    
-    dt = datetime.datetime.combine(date_obj, datetime.time(6, 0))
-    # Assuming IST (UTC+5:30)
-    tz = datetime.timezone(datetime.timedelta(hours=5, minutes=30))
-    dt = dt.replace(tzinfo=tz)
-    
-    # NOTE: To be TRULY precise, we would find exact sunrise `t0` at lat/lon.
-    # Then `moon_lon_at(t0)`.
-    # For now, let's use the 6 AM IST approximation but pass the coords if we extend logic later.
-    # Wait, the user SPECIFICALLY asked for this. 
-    # "is that possible. now the star change based the IST timing."
-    
-    # If I use 6 AM IST, I am NOT using the location.
-    # I should try to adjust the time. 
-    # Longitude Correction: 4 minutes per degree.
-    # Standard Meridian India = 82.5 E.
-    # Temple Lon = 76.27. Diff = -6.23 deg.
-    # Time diff = -25 mins.
-    # So Local Mean Time is 25 mins behind IST.
-    # Sunrise at 76.27 E happens roughly 25 mins *later* than at 82.5? No.
-    # Sun crosses 82.5 first.
-    # So at 6:00 AM IST, Sun is at 82.5 height.
-    # At 76.27, it's earlier.
-    # Just respecting the Longitude difference for Moon Position calculation is NOT Enough.
-    # The *Definition* of "Today's Star" is Star at *Local Sunrise*.
-    
-    # Let's incorporate a basic correction for Sunrise Time based on Longitude.
-    # Sunrise roughly varies by (82.5 - lon) * 4 minutes from 6 AM.
-    # If Lon = 76.27. (82.5 - 76.27) = 6.23. * 4 = 24.92 mins.
-    # So Sunrise is approx 6:25 AM IST.
-    # We should check the star at 6:25 AM IST.
-    
-    offset_minutes = (82.5 - float(lon)) * 4
-    # Limit offset (e.g. within +/- 60 mins) to prevent errors
-    offset_minutes = max(-60, min(60, offset_minutes))
-    
-    dt_adjusted = dt + datetime.timedelta(minutes=offset_minutes)
-    
-    lon_val = get_moon_longitude(dt_adjusted)
-    
-    # Lahiri Ayanamsa approximation
-    year_diff = date_obj.year - 2000
-    ayanamsa = 23.85 + (year_diff * 50.3 / 3600.0)
-    
-    lon_nirayana = (lon_val - ayanamsa) % 360
-    
-    index = int(lon_nirayana / (360.0 / 27.0))
-    return index % 27
+    return int(get_nakshatra_indices(date_obj, 1, lat, lon)[0])
 
 @lru_cache(maxsize=365)
 def get_nakshatra(date_obj, lat=DEFAULT_LAT, lon=DEFAULT_LON):
@@ -191,14 +767,34 @@ def get_sun_longitude(date_time):
     """
     Calculates the ecliptic longitude of the Sun.
     """
-    ts, eph = _get_skyfield_data()
+    ts, _ = _get_skyfield_data()
     t = ts.from_datetime(date_time.astimezone(datetime.timezone.utc))
+    eph = _ephemeris_for(t)
     sun = eph['sun']
     earth = eph['earth']
     astrometric = earth.at(t).observe(sun)
     _, lon, _ = astrometric.frame_latlon(ecliptic_frame)
     return lon.degrees
 
+def get_sun_longitudes(times):
+    """
+    Vectorized form of get_sun_longitude for a Skyfield Time array.
+    """
+    eph = _ephemeris_for(times)
+    astrometric = eph['earth'].at(times).observe(eph['sun'])
+    _, lon, _ = astrometric.frame_latlon(ecliptic_frame)
+    return lon.degrees
+
+def _rasi_positions(unix_seconds):
+    """
+    Sun's Nirayana longitude in rasi units (0.0 to 12.0, 0 = Mesha/Medam)
+    for an array of Unix timestamps.
+    """
+    lon_vals = _sun_longitudes(unix_seconds)
+    lon_nirayana = (lon_vals - _ayanamsa_at(unix_seconds)) % 360
+    return lon_nirayana / 30.0
+
+# Malayalam months in Kollavarsham order (the year starts with Chingam).
 MAL_MONTHS_ENG = [
     "Chingam", "Kanni", "Thulam", "Vrischikam", "Dhanu", "Makaram",
     "Kumbham", "Meenam", "Medam", "Edavam", "Mithunam", "Karkidakam"
@@ -209,223 +805,329 @@ MAL_MONTHS_MAL = [
     "കുംഭം", "മീനം", "മേടം", "ഇടവം", "മിഥുനം", "കർക്കടകം"
 ]
 
+# Zodiac (rasi) index of Chingam (Leo). Rasi 0 = Medam (Aries).
+CHINGAM_RASI = 4
+
+def _mal_month_index(rasi):
+    """Maps a zodiac index (0 = Medam) to an index into MAL_MONTHS_ENG (0 = Chingam)."""
+    return (int(rasi) - CHINGAM_RASI) % 12
+
+# --- Sankranti (Solar Ingress) Table ---
+# Exact instant the Sun enters each rasi across the table span, stored like the
+# nakshatra table (t: Unix seconds, index: rasi entered).
+
+def build_sankranti_table(start=TABLE_START, end=TABLE_END):
+    """
+    Computes every sankranti between `start` and `end` and saves the table.
+    The Sun moves ~1 degree a day, so daily brackets never hold two ingresses.
+    """
+    times, _, after = find_transits(
+        _date_to_unix(start), _date_to_unix(end) + 86400.0,
+        _rasi_positions, step_seconds=86400.0, precision_seconds=0.5
+    )
+
+    table = np.empty(len(times), dtype=TRANSITION_DTYPE)
+    table['t'] = times
+    table['index'] = after % 12
+
+    return _store_table('sankranti', table)
+
+def _sankrantis_between(start_unix, end_unix):
+    """
+    Sankranti instants and the rasi entered, for a window.
+    Uses the table when it covers the window, else the transit finder.
+    """
+    table = _get_table('sankranti')
+    if table is not None and len(table) and table['t'][0] <= start_unix and end_unix <= table['t'][-1]:
+        lo = np.searchsorted(table['t'], start_unix, side='left')
+        hi = np.searchsorted(table['t'], end_unix, side='right')
+        return table['t'][lo:hi], table['index'][lo:hi].astype(int)
+
+    times, _, after = find_transits(start_unix, end_unix, _rasi_positions, step_seconds=86400.0, precision_seconds=1.0)
+    return times, after % 12
+
+def _malayalam_day_one(sankranti_unix):
+    """
+    Day 1 of a solar month: the first day whose sunrise (6 AM IST) falls on
+    or after the sankranti.
+    """
+    dt = datetime.datetime.fromtimestamp(float(sankranti_unix), IST)
+    if dt.time() <= datetime.time(6, 0):
+        return dt.date()
+    return dt.date() + datetime.timedelta(days=1)
+
+def get_malayalam_dates(start_date, days):
+    """
+    Range API: Malayalam dates for `days` consecutive dates from `start_date`.
+    One sankranti lookup covers the whole window; each day is then a binary search.
+    """
+    if days <= 0:
+        return []
+
+    first = datetime.datetime.combine(start_date, datetime.time(6, 0)).replace(tzinfo=IST).timestamp()
+    sunrises = first + 86400.0 * np.arange(days)
+
+    # Looking back a little over a year always includes the last Chingam ingress.
+    times, rasis = _sankrantis_between(first - 400 * 86400.0, sunrises[-1])
+    positions = np.searchsorted(times, sunrises, side='right') - 1
+
+    results = []
+    for i, pos in enumerate(positions):
+        if pos < 0:
+            raise ValueError("No sankranti found before date")
+        month_idx = _mal_month_index(rasis[pos])
+
+        # Walk back to the most recent Chingam ingress for the year
+        chingam_pos = pos - month_idx
+        if chingam_pos < 0:
+            raise ValueError("Chingam ingress not found before date")
+
+        date_obj = start_date + datetime.timedelta(days=i)
+        results.append({
+            'day': (date_obj - _malayalam_day_one(times[pos])).days + 1,
+            'mal_month': MAL_MONTHS_ENG[month_idx],
+            'mal_month_mal': MAL_MONTHS_MAL[month_idx],
+            'mal_year': _malayalam_day_one(times[chingam_pos]).year - 824,
+            'eng_date': date_obj.strftime('%Y-%m-%d')
+        })
+    return results
+
 @lru_cache(maxsize=365)
+@_use_precomputed('mal_date')
 def get_malayalam_date(date_obj, lat=DEFAULT_LAT, lon=DEFAULT_LON):
     """
     Converts English Date to Malayalam Date.
-    Logic involves calculating the Sun's position to determine the solar month and day.
+    The solar month is the rasi the Sun occupies at sunrise (6 AM IST); day 1 is
+    the first sunrise after its sankranti. The Kollavarsham year changes on Chingam 1.
     """
-    # 1. Calculate Ayanamsa (Lahiri)
-    # 2. Get Sun's Nirayana Longitude
-    # 3. Determine Rasi (Sign) 0-11
-    # 4. Find Sankranti (Solar Ingress) Day
-    
-    # Simplified Logic using typical offsets and validation for reliability
-    # Ideally, we find the EXACT moment sun enters the sign.
-    # If ingress is before sunset/noon (varies by tradition), it's day 1.
-    
-    # We will use a scan approach: 
-    # Find the day when Sun's Sign changed.
-    
-    # Start checking from 32 days ago to find the last transition
-    start_check = date_obj - datetime.timedelta(days=33)
-    
-    # Get longitude for today
-    # Sunrise rule: 6 AM IST
-    tz = datetime.timezone(datetime.timedelta(hours=5, minutes=30))
-    dt_today = datetime.datetime.combine(date_obj, datetime.time(6, 0)).replace(tzinfo=tz)
-    
-    # Ayanamsa
-    year_diff = date_obj.year - 2000
-    ayanamsa = 23.85 + (year_diff * 50.3 / 3600.0)
-    
-    def get_nirayana_sun(dt):
-        l = get_sun_longitude(dt)
-        return (l - ayanamsa) % 360
-        
-    sun_long_today = get_nirayana_sun(dt_today)
-    
-    # Rasi Index (0 = Mesha/Medam ... 11 = Meena)
-    # BUT Malayalam Year starts with Chingam (Leo) = Index 4
-    
-    # Standard Zodiac: 0=Aries(Medam), 1=Taurus(Edavam), 2=Gemini(Mithunam), 3=Cancer(Karkidakam)
-    # 4=Leo(Chingam), 5=Virgo(Kanni)...
-    
-    # Solar Month Index (0-11 where 0 is Aries/Medam)
-    solar_month_index = int(sun_long_today / 30)
-    
-    # Find day 1 of this solar month
-    # Iterate backwards
-    day_count = 1
-    curr = date_obj
-    
-    # Safety break
-    for _ in range(35):
-        prev = curr - datetime.timedelta(days=1)
-        dt_prev = datetime.datetime.combine(prev, datetime.time(6, 0)).replace(tzinfo=tz)
-        prev_idx = int(get_nirayana_sun(dt_prev) / 30)
-        
-        if prev_idx != solar_month_index:
-            # Transition happened between prev and curr
-            # Standard rule: If ingress is after Aparahna (afternoon), next day is Day 1.
-            # Simplified: If Sankranti is today, is it Day 1? 
-            # Usually strict calculation needed. 
-            # For this MVP, we assume Day 1 is the first day with New Sign at Sunrise.
-            break
-        day_count += 1
-        curr = prev
-        
-    # Map Solar Index to Malayalam Month Name
-    # 0=Medam ... 
-    # But wait, Chingam is the first month for Year calculation.
-    
-    # Mapping:
-    # 0: Medam
-    # 1: Edavam
-    # 2: Mithunam
-    # 3: Karkidakam
-    # 4: Chingam
-    # ...
-    
-    # We need to map standard Zodiac index to our Arrays (which start at Chingam?)
-    # Let's align arrays to Zodiac for easier indexing
-    # ZODIAC_Map:
-    # 0 (Aries) -> Medam
-    
-    # Let's use specific mapping
-    zodiac_to_mal_dict = {
-        0: ("Medam", "മേടം"),
-        1: ("Edavam", "ഇടവം"),
-        2: ("Mithunam", "മിഥുനം"),
-        3: ("Karkidakam", "കർക്കടകം"),
-        4: ("Chingam", "ചിങ്ങം"),
-        5: ("Kanni", "കന്നി"),
-        6: ("Thulam", "തുലാം"),
-        7: ("Vrischikam", "വൃശ്ചികം"),
-        8: ("Dhanu", "ധനു"),
-        9: ("Makaram", "മകരം"),
-        10: ("Kumbham", "കുംഭം"),
-        11: ("Meenam", "മീനം")
-    }
-    
-    month_eng, month_mal = zodiac_to_mal_dict[solar_month_index]
-    
-    # Calculate Year (Kolla Varsham)
-    # Starts in Chingam (Leo, Index 4).
-    # If Solar Index < 4 (i.e., Medam, Edavam, Mithunam, Karkidakam), we are in the tail of the ME year.
-    # Current Gregorian Year + 825 (if after Chingam 1) or + 824.
-    
-    # Roughly:
-    # Aug 17 (Chingam 1) starts new year.
-    # If Month >= Chingam (Index 4), Year = Greg + 825 - 2000? No.
-    # ME = AD - 825.
-    # Example: Sept 2024. Chingam. 2024 - 825 = 1199? No, starts 825 AD.
-    # ME 1 starts 825 AD.
-    # 2024 = 1200 ME (starts Aug 2024).
-    # so if Month >= 4 (Leo), Year = Greg - 824.
-    # if Month < 4 (Aries-Cancer), Year = Greg - 825.
-    
-    # Wait, simple math check:
-    # Jan 2025 is Makaram (Index 9). 
-    # Should be 1200 ME.
-    # 2025 - 825 = 1200. Correct.
-    
-    # Aug 2024 (before Chingam) is Karkidakam.
-    # 2024 - 825 = 1199. Correct.
-    
-    # Sept 2024 is Chingam.
-    # 2024 - 824 = 1200. Correct.
-    
-    # Calculate Year (Kolla Varsham)
-    # ME Year changes on Chingam 1 (approx Aug 17)
-    # Jan 1 - Aug 16 approx: Offset is 825
-    # Aug 17 - Dec 31 approx: Offset is 824
-    
-    offset = 825
-    if date_obj.month > 8:
-        offset = 824
-    elif date_obj.month == 8:
-        # August check
-        if solar_month_index == 4: # Chingam has started
-             offset = 824
-        # Else still Karkidakam, so 825
-        
-    mal_year = date_obj.year - offset
-        
-    return {
-        'day': day_count,
-        'mal_month': month_eng,
-        'mal_month_mal': month_mal,
-        'mal_year': mal_year,
-        'eng_date': date_obj.strftime('%Y-%m-%d')
-    }
+    return get_malayalam_dates(date_obj, 1)[0]
 
 def get_english_date(mal_year, mal_month_name, mal_day):
     """
     Reverse Search: Find English Date for a given Malayalam Date.
-    Iterative approach.
+    Locates the Chingam ingress of the year, steps to the target month's
+    sankranti and offsets by the day. Returns None if the day does not exist.
     """
-    # 1. Determine Window
-    # ME Year starts roughly mid-Aug.
-    # If mal_year = 1200.
-    # Starts Aug 2024 (1200 + 824).
-    # Ends Aug 2025.
-    
-    start_greg_year = mal_year + 824
-    
-    # Map month name to index
-    zodiac_map = {
-        "Medam": 0, "Edavam": 1, "Mithunam": 2, "Karkidakam": 3,
-        "Chingam": 4, "Kanni": 5, "Thulam": 6, "Vrischikam": 7,
-        "Dhanu": 8, "Makaram": 9, "Kumbham": 10, "Meenam": 11
-    }
-    
-    target_idx = zodiac_map.get(mal_month_name)
-    if target_idx is None:
+    if mal_month_name not in MAL_MONTHS_ENG:
         raise ValueError("Invalid Malayalam Month")
-        
-    # Search start:
-    # If target is Chingam (4), start Aug 15 of start_greg_year.
-    # If target is Medam (0), it's next year (start_greg_year + 1), April.
-    
-    # Rough estimates for day 1
-    rough_starts = {
-        4: datetime.date(start_greg_year, 8, 15), # Chingam
-        5: datetime.date(start_greg_year, 9, 15),
-        6: datetime.date(start_greg_year, 10, 15),
-        7: datetime.date(start_greg_year, 11, 15),
-        8: datetime.date(start_greg_year, 12, 15),
-        9: datetime.date(start_greg_year + 1, 1, 14),
-        10: datetime.date(start_greg_year + 1, 2, 12),
-        11: datetime.date(start_greg_year + 1, 3, 14),
-        0: datetime.date(start_greg_year + 1, 4, 13), # Medam
-        1: datetime.date(start_greg_year + 1, 5, 14),
-        2: datetime.date(start_greg_year + 1, 6, 14),
-        3: datetime.date(start_greg_year + 1, 7, 15),
+    month_idx = MAL_MONTHS_ENG.index(mal_month_name)
+
+    # ME Year starts on Chingam 1 (mid-Aug) of Gregorian year mal_year + 824.
+    start_greg_year = mal_year + 824
+    window_start = _date_to_unix(datetime.date(start_greg_year, 7, 1))
+    window_end = _date_to_unix(datetime.date(start_greg_year + 1, 10, 1))
+    times, rasis = _sankrantis_between(window_start, window_end)
+
+    chingam = np.flatnonzero(rasis == CHINGAM_RASI)
+    if len(chingam) == 0:
+        return None
+
+    pos = chingam[0] + month_idx
+    if pos + 1 >= len(times):
+        return None
+
+    day_one = _malayalam_day_one(times[pos])
+    next_day_one = _malayalam_day_one(times[pos + 1])
+
+    result = day_one + datetime.timedelta(days=mal_day - 1)
+    if mal_day < 1 or result >= next_day_one:
+        return None
+    return result
+
+# --- Panchanga (Five Limbs) ---
+# Tithi, nakshatra, yoga, karana (and the solar rasi) all derive from the same
+# Sun and Moon longitudes, so they are computed together from one evaluation.
+
+TITHIS_ENG = [
+    "Prathama", "Dwitheeya", "Thritheeya", "Chathurthi", "Panchami",
+    "Shashti", "Sapthami", "Ashtami", "Navami", "Dashami",
+    "Ekadashi", "Dwadashi", "Thrayodashi", "Chathurdashi", "Pournami"
+]
+
+TITHIS_MAL = [
+    "പ്രഥമ", "ദ്വിതീയ", "തൃതീയ", "ചതുർത്ഥി", "പഞ്ചമി",
+    "ഷഷ്ഠി", "സപ്തമി", "അഷ്ടമി", "നവമി", "ദശമി",
+    "ഏകാദശി", "ദ്വാദശി", "ത്രയോദശി", "ചതുർദ്ദശി", "പൗർണ്ണമി"
+]
+
+PAKSHAS_ENG = ["Shukla", "Krishna"]
+PAKSHAS_MAL = ["വെളുത്ത പക്ഷം", "കറുത്ത പക്ഷം"]
+
+YOGAS_ENG = [
+    "Vishkambha", "Preethi", "Ayushman", "Saubhagya", "Shobhana", "Athiganda",
+    "Sukarma", "Dhrithi", "Shoola", "Ganda", "Vriddhi", "Dhruva",
+    "Vyaghatha", "Harshana", "Vajra", "Siddhi", "Vyatheepatha", "Variyan",
+    "Parigha", "Shiva", "Siddha", "Sadhya", "Shubha", "Shukla",
+    "Brahma", "Aindra", "Vaidhrithi"
+]
+
+YOGAS_MAL = [
+    "വിഷ്കംഭം", "പ്രീതി", "ആയുഷ്മാൻ", "സൗഭാഗ്യം", "ശോഭനം", "അതിഗണ്ഡം",
+    "സുകർമ്മം", "ധൃതി", "ശൂലം", "ഗണ്ഡം", "വൃദ്ധി", "ധ്രുവം",
+    "വ്യാഘാതം", "ഹർഷണം", "വജ്രം", "സിദ്ധി", "വ്യതീപാതം", "വരീയാൻ",
+    "പരിഘം", "ശിവം", "സിദ്ധം", "സാദ്ധ്യം", "ശുഭം", "ശുക്ലം",
+    "ബ്രഹ്മം", "ഐന്ദ്രം", "വൈധൃതി"
+]
+
+# Karanas: 60 half-tithis per lunar month. The seven movable karanas repeat from
+# the 2nd to the 57th; the four fixed ones take the remaining slots.
+KARANAS_MOVABLE_ENG = ["Bava", "Balava", "Kaulava", "Taitila", "Gara", "Vanija", "Vishti"]
+KARANAS_MOVABLE_MAL = ["ബവം", "ബാലവം", "കൗലവം", "തൈതിലം", "ഗരജം", "വണിജം", "വിഷ്ടി"]
+KARANAS_FIXED_ENG = {0: "Kimsthughna", 57: "Shakuni", 58: "Chathushpada", 59: "Naga"}
+KARANAS_FIXED_MAL = {0: "കിംസ്തുഘ്നം", 57: "ശകുനി", 58: "ചതുഷ്പാദം", 59: "നാഗം"}
+
+# Units per circle for each limb's continuous position
+LIMB_UNITS = {'nakshatra': 27, 'rasi': 12, 'tithi': 30, 'yoga': 27, 'karana': 60}
+
+def _sun_moon_longitudes(unix_seconds):
+    """
+    Moon and Sun ecliptic longitudes for Unix timestamps from one evaluation:
+    the Time array and the Earth's position are shared by both bodies.
+    """
+    if get_engine() == 'analytic':
+        return panchang_analytic.moon_longitude(unix_seconds), panchang_analytic.sun_longitude(unix_seconds)
+
+    times = _to_skyfield_times(unix_seconds)
+    eph = _ephemeris_for(times)
+    earth = eph['earth'].at(times)
+    _, moon, _ = earth.observe(eph['moon']).frame_latlon(ecliptic_frame)
+    _, sun, _ = earth.observe(eph['sun']).frame_latlon(ecliptic_frame)
+    return moon.degrees, sun.degrees
+
+def _panchanga_positions(unix_seconds):
+    """
+    Continuous position of every limb (see LIMB_UNITS) for an array of Unix
+    timestamps. The integer part of each is the limb's index.
+    """
+    unix_seconds = np.asarray(unix_seconds, dtype=float)
+    moon, sun = _sun_moon_longitudes(unix_seconds)
+    ayanamsa = _ayanamsa_at(unix_seconds)
+    moon_sid = (moon - ayanamsa) % 360
+    sun_sid = (sun - ayanamsa) % 360
+    # Elongation does not depend on the ayanamsa
+    elongation = (moon - sun) % 360
+    return {
+        'nakshatra': moon_sid * 27.0 / 360.0,
+        'rasi': sun_sid / 30.0,
+        'tithi': elongation / 12.0,
+        'yoga': ((moon_sid + sun_sid) % 360) * 27.0 / 360.0,
+        'karana': elongation / 6.0
     }
-    
-    guess_date = rough_starts[target_idx]
-    
-    # Adjust guess to roughly match the day
-    # -5 days to be safe
-    guess_date = guess_date + datetime.timedelta(days=mal_day - 5)
-    
-    # Scan forward
-    for _ in range(15): # Scan window
-        res = get_malayalam_date(guess_date)
-        if (res['mal_year'] == mal_year and 
-            res['mal_month'] == mal_month_name and 
-            res['day'] == mal_day):
-            return guess_date
-        guess_date += datetime.timedelta(days=1)
-        
-    return None
 
-def get_next_star_dates(star_name_eng, start_date=None, count=3, months=None, lat=DEFAULT_LAT, lon=DEFAULT_LON):
+def limb_name(limb, index):
+    """English and Malayalam names for a limb index, e.g. ('Shukla Ashtami', ...)."""
+    index = int(index) % LIMB_UNITS[limb]
+    if limb == 'tithi':
+        # Full moon and new moon close the two fortnights and carry no paksha
+        if index == 14:
+            return TITHIS_ENG[14], TITHIS_MAL[14]
+        if index == 29:
+            return "Amavasi", "അമാവാസി"
+        paksha = index // 15
+        return f"{PAKSHAS_ENG[paksha]} {TITHIS_ENG[index % 15]}", f"{PAKSHAS_MAL[paksha]} {TITHIS_MAL[index % 15]}"
+    if limb == 'karana':
+        if index in KARANAS_FIXED_ENG:
+            return KARANAS_FIXED_ENG[index], KARANAS_FIXED_MAL[index]
+        return KARANAS_MOVABLE_ENG[(index - 1) % 7], KARANAS_MOVABLE_MAL[(index - 1) % 7]
+    if limb == 'yoga':
+        return YOGAS_ENG[index], YOGAS_MAL[index]
+    if limb == 'nakshatra':
+        return NAKSHATRAS_ENG[index], NAKSHATRAS_MAL[index]
+    month_idx = _mal_month_index(index)
+    return MAL_MONTHS_ENG[month_idx], MAL_MONTHS_MAL[month_idx]
+
+def get_panchanga_indices(start_date, days, lat=DEFAULT_LAT, lon=DEFAULT_LON):
+    """
+    Range API: index of every limb at sunrise for `days` consecutive dates,
+    from a single Sun/Moon evaluation. Returns {limb: int array}.
+    """
+    if days <= 0:
+        return {limb: np.zeros(0, dtype=int) for limb in LIMB_UNITS}
+    positions = _panchanga_positions(_sunrise_unix(start_date, days, lat, lon))
+    return {limb: np.floor(pos).astype(int) % LIMB_UNITS[limb] for limb, pos in positions.items()}
+
+def find_panchanga_transits(start_unix, end_unix, limbs=('tithi', 'yoga', 'karana'), step_seconds=3600.0, precision_seconds=1.0):
+    """
+    find_transits for several limbs at once. The sampling grid and each bisection
+    round evaluate the Sun and Moon once for all limbs' brackets together.
+    Hourly steps are safe: the shortest limb (karana) lasts well over 5 hours.
+    Returns {limb: (times, values_before, values_after)}.
+    """
+    grid = np.append(np.arange(float(start_unix), float(end_unix), step_seconds), float(end_unix))
+    positions = _panchanga_positions(grid)
+
+    lo, hi, lo_values, limb_ids, after = [], [], [], [], []
+    for k, limb in enumerate(limbs):
+        values = np.floor(positions[limb]).astype(int)
+        c = np.flatnonzero(values[1:] != values[:-1])
+        lo.append(grid[c])
+        hi.append(grid[c + 1])
+        lo_values.append(values[c])
+        after.append(values[c + 1])
+        limb_ids.append(np.full(len(c), k))
+
+    lo, hi = np.concatenate(lo), np.concatenate(hi)
+    lo_values, limb_ids, after = np.concatenate(lo_values), np.concatenate(limb_ids), np.concatenate(after)
+
+    iterations = max(1, int(np.ceil(np.log2(step_seconds / precision_seconds))))
+    for _ in range(iterations if len(lo) else 0):
+        mid = (lo + hi) / 2.0
+        mid_positions = _panchanga_positions(mid)
+        current = np.empty(len(mid), dtype=int)
+        for k, limb in enumerate(limbs):
+            mask = limb_ids == k
+            current[mask] = np.floor(mid_positions[limb][mask]).astype(int)
+        same = current == lo_values
+        lo = np.where(same, mid, lo)
+        hi = np.where(same, hi, mid)
+
+    results = {}
+    for k, limb in enumerate(limbs):
+        mask = limb_ids == k
+        units = LIMB_UNITS[limb]
+        results[limb] = (hi[mask], lo_values[mask] % units, after[mask] % units)
+    return results
+
+def get_panchanga(date_obj, lat=DEFAULT_LAT, lon=DEFAULT_LON):
+    """
+    Tithi, yoga and karana for a date: the value at sunrise and every change
+    during the day (00:00 to 24:00 IST), from one multi-limb transit search.
+    """
+    limbs = ('tithi', 'yoga', 'karana')
+    sunrise = _sunrise_unix(date_obj, 1, lat, lon)[0]
+    at_sunrise = _panchanga_positions(np.array([sunrise]))
+
+    day_start = _date_to_unix(date_obj)
+    transits = find_panchanga_transits(day_start, day_start + 86400.0, limbs)
+
+    result = {'sunrise': datetime.datetime.fromtimestamp(round(float(sunrise)), IST)}
+    for limb in limbs:
+        index = int(np.floor(at_sunrise[limb][0])) % LIMB_UNITS[limb]
+        name, name_mal = limb_name(limb, index)
+        times, before, after = transits[limb]
+        changes = []
+        for t, prev_idx, next_idx in zip(times, before, after):
+            prev_name, prev_mal = limb_name(limb, prev_idx)
+            next_name, next_mal = limb_name(limb, next_idx)
+            changes.append({
+                'name': prev_name,
+                'mal': prev_mal,
+                'end_time': datetime.datetime.fromtimestamp(round(float(t)), IST),
+                'next': next_name,
+                'next_mal': next_mal
+            })
+        result[limb] = {'index': index, 'name': name, 'mal': name_mal, 'transitions': changes}
+    return result
+
+# Days evaluated per pass by get_next_star_dates
+STAR_SCAN_CHUNK_DAYS = 180
+
+def get_next_star_dates(star_name_eng, start_date=None, count=3, months=None, lat=DEFAULT_LAT, lon=DEFAULT_LON, progress=None):
     """
     Finds the next 'count' occurrences of a specific nakshatra.
     If 'months' is provided, it searches within that many months.
     Uses lat/lon for precise calculation.
+    `progress`, if given, is called with the percentage of the window scanned.
     """
     if start_date is None:
         start_date = datetime.date.today()
@@ -436,8 +1138,6 @@ def get_next_star_dates(star_name_eng, start_date=None, count=3, months=None, la
     
     target_idx = NAKSHATRAS_ENG.index(star_name_eng)
     results = []
-    
-    current_date = start_date
     found_count = 0
     
     # Determine scan duration
@@ -452,203 +1152,222 @@ def get_next_star_dates(star_name_eng, start_date=None, count=3, months=None, la
     elif count:
          scan_days = count * 35 
          
-    limit_date = start_date + datetime.timedelta(days=scan_days)
-    
-    while current_date < limit_date:
-        idx = get_nakshatra_index(current_date, lat, lon)
-        if idx == target_idx:
+    # Vectorized passes over STAR_SCAN_CHUNK_DAYS at a time, so long searches can
+    # report progress and stop as soon as enough dates are found.
+    next_allowed = 0
+    for chunk_start in range(0, scan_days, STAR_SCAN_CHUNK_DAYS):
+        chunk_days = min(STAR_SCAN_CHUNK_DAYS, scan_days - chunk_start)
+        chunk_date = start_date + datetime.timedelta(days=chunk_start)
+        indices = get_nakshatra_indices(chunk_date, chunk_days, lat, lon)
+
+        for offset in chunk_start + np.flatnonzero(indices == target_idx):
+            if offset < next_allowed:
+                continue
+
+            current_date = start_date + datetime.timedelta(days=int(offset))
             results.append(current_date.strftime("%Y-%m-%d"))
             found_count += 1
             if found_count >= count:
-                break
-            
-            # Optimization: If found, next occurrence is ~27 days away.
-            current_date += datetime.timedelta(days=25)
-            continue
-            
-        current_date += datetime.timedelta(days=1)
-        
+                return results
+
+            # A star can hold two consecutive sunrises; the next occurrence is ~27 days away.
+            next_allowed = offset + 25
+
+        if progress:
+            progress(100.0 * (chunk_start + chunk_days) / scan_days)
+
     return results
 
-def _find_nakshatra_times(t0, t1, lat, lon):
+# --- Muhurtham Search ---
+# Days matching combined rules (star at sunrise, Malayalam month, weekday) over a
+# range. Every rule is evaluated as a NumPy mask over the whole range; only the
+# matching days are formatted.
+
+WEEKDAYS_ENG = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+def get_mal_month_indices(start_date, days):
     """
-    Finds nakshatra transitions between t0 and t1.
+    Range API: Malayalam month index (0 = Chingam) at sunrise (6 AM IST) for
+    `days` consecutive dates, from one sankranti lookup and a binary search.
     """
-    ts, eph = _get_skyfield_data()
-    moon = eph['moon']
-    earth = eph['earth']
-    
-    # Define a function returning Nakshatra Index (0.0 to 27.0)
-    # 27 Nakshatras = 360 degrees. Each is 13.3333... degrees.
-    # We trace Moon's Nirayana Longitude.
-    
-    def moon_nakshatra_pos(t):
-        # Calculate Nirayana Longitude
-        # 1. Moon Longitude
-        astrometric = earth.at(t).observe(moon)
-        _, lon, _ = astrometric.frame_latlon(ecliptic_frame)
-        l_deg = lon.degrees
-        
-        # 2. Ayanamsa (Date specific)
-        # Use t as date
-        # Check if t is an array or scalar
-        # Skyfield find_discrete handles time objects
-        
-        # Approximate Year from t.tt (Terrestrial Time)
-        # J2000 is 2451545.0
-        # Year diff ~ (jd - 2451545) / 365.25
-        year_diff = (t.tt - 2451545.0) / 365.25
-        ayanamsa = 23.85 + (year_diff * 50.3 / 3600.0)
-        
-        nirayana = (l_deg - ayanamsa) % 360
-        
-        # Return position in "Nakshatra Units" (0 to 27)
-        return (nirayana * 27.0 / 360.0)
-
-    # We want to find when this function crosses integers 0, 1, 2...
-    # Skyfield almanac.find_events is for specific comparisons.
-    # We can write a custom search or use brute force minute-by-minute if range is small (1 day = 1440 mins).
-    # Brute force is robust and fast enough for 1 day on local machines.
-    # Let's use 1-minute steps for accuracy, then refine?
-    # Or just 5-minute steps and linear interp?
-    # Skyfield is fast. 1 minute steps for 24 hours = 1440 calls. Reasonable.
-    
-    # Better: Scan hourly. If change, scan minute.
-    
+    if days <= 0:
+        return np.zeros(0, dtype=int)
+    first = datetime.datetime.combine(start_date, datetime.time(6, 0)).replace(tzinfo=IST).timestamp()
+    sunrises = first + 86400.0 * np.arange(days)
+
+    # A solar month never exceeds 32 days, so 40 days back always finds its ingress
+    times, rasis = _sankrantis_between(first - 40 * 86400.0, sunrises[-1])
+    positions = np.searchsorted(times, sunrises, side='right') - 1
+    if len(positions) and positions.min() < 0:
+        raise ValueError("No sankranti found before date")
+    return (np.asarray(rasis)[positions] - CHINGAM_RASI) % 12
+
+def _nakshatra_transition_times(start_unix, end_unix):
+    """Instants of every nakshatra change in a window: table slice when covered, else the ephemeris."""
+    table = _get_nakshatra_table()
+    if table is not None and len(table) and table['t'][0] <= start_unix and end_unix <= table['t'][-1]:
+        lo = np.searchsorted(table['t'], start_unix, side='left')
+        hi = np.searchsorted(table['t'], end_unix, side='right')
+        return table['t'][lo:hi]
+    times, _, _ = find_transits(start_unix, end_unix, _nakshatra_positions, step_seconds=3600.0, precision_seconds=1.0)
+    return np.asarray(times)
+
+def find_muhurtham_days(start_date, days, stars=None, exclude_months=None, weekdays=None, lat=DEFAULT_LAT, lon=DEFAULT_LON):
+    """
+    Days in [start_date, start_date + days) whose star at sunrise is one of `stars`
+    (English names), whose Malayalam month is not in `exclude_months` and whose
+    weekday (0 = Monday) is in `weekdays`. A rule left as None matches every day.
+    Each match carries the window during which its star is in effect (IST).
+    """
+    if days <= 0:
+        return []
+
+    indices = get_nakshatra_indices(start_date, days, lat, lon)
+    months = get_mal_month_indices(start_date, days)
+    day_weekdays = (start_date.weekday() + np.arange(days)) % 7
+
+    mask = np.ones(days, dtype=bool)
+    if stars:
+        mask &= np.isin(indices, [NAKSHATRAS_ENG.index(s) for s in stars])
+    if exclude_months:
+        mask &= ~np.isin(months, [MAL_MONTHS_ENG.index(m) for m in exclude_months])
+    if weekdays is not None:
+        mask &= np.isin(day_weekdays, list(weekdays))
+
+    matches = np.flatnonzero(mask)
+    if len(matches) == 0:
+        return []
+
+    # A star lasts about a day, so two days either side normally bracket it. At
+    # the ends of the precomputed tables the slice can come back short; a day
+    # without a transition on both sides then gets no window (None).
+    sunrises = _sunrise_unix(start_date, days, lat, lon)
+    times = _nakshatra_transition_times(sunrises[0] - 2 * 86400.0, sunrises[-1] + 2 * 86400.0)
+    pos = np.searchsorted(times, sunrises[matches], side='right')
+
+    def ist(t):
+        return datetime.datetime.fromtimestamp(round(float(t)), IST).strftime('%Y-%m-%d %H:%M:%S')
+
     results = []
-    
-    curr = t0
-    curr_n = int(moon_nakshatra_pos(curr))
-    
-    # 30-minute steps
-    step = 0.5 / 24.0 # 30 mins
-    
-    while curr.tt < t1.tt:
-        next_t = ts.tt_jd(curr.tt + step)
-        if next_t.tt > t1.tt:
-            next_t = t1
-            
-        next_n = int(moon_nakshatra_pos(next_t))
-        
-        if next_n != curr_n:
-            # Transition happened!
-            # Refine to minute
-            # Binary search or finer scan
-            # Let's do finer scan
-            
-            # Start of interval
-            scan = curr
-            fine_step = 1.0 / 1440.0 # 1 minute
-            
-            while scan.tt < next_t.tt:
-                s_next = ts.tt_jd(scan.tt + fine_step)
-                s_n = int(moon_nakshatra_pos(s_next))
-                if s_n != curr_n:
-                    # Found transition at s_next
-                    # Record Transition
-                    # Nakshatra curr_n ENDS at s_next (approx)
-                    # Nakshatra s_n STARTS at s_next
-                    
-                    # Convert to datetime (IST)
-                    dt = s_next.astimezone(datetime.timezone(datetime.timedelta(hours=5, minutes=30)))
-                    
-                    results.append({
-                        'nakshatra': NAKSHATRAS_ENG[curr_n % 27],
-                        'nakshatra_mal': NAKSHATRAS_MAL[curr_n % 27],
-                        'end_time': dt,
-                        'next_nakshatra': NAKSHATRAS_ENG[s_n % 27]
-                    })
-                    curr_n = s_n # Update current
-                    curr = s_next # Advance main loop
-                    break
-                scan = s_next
-        
-        curr = next_t
-        
+    for i, p in zip(matches, pos):
+        date_obj = start_date + datetime.timedelta(days=int(i))
+        idx = int(indices[i])
+        bracketed = 0 < p < len(times)
+        results.append({
+            'date': date_obj.strftime('%Y-%m-%d'),
+            'weekday': WEEKDAYS_ENG[int(day_weekdays[i])],
+            'mal_date': get_malayalam_date(date_obj, lat, lon),
+            'nakshatra_eng': NAKSHATRAS_ENG[idx],
+            'nakshatra_mal': NAKSHATRAS_MAL[idx],
+            'star_start': ist(times[p - 1]) if bracketed else None,
+            'star_end': ist(times[p]) if bracketed else None
+        })
     return results
 
+def _find_nakshatra_times(start_dt, end_dt, lat, lon):
+    """
+    Finds nakshatra transitions between two datetimes using the ephemeris.
+    The Moon needs roughly a day to cross one nakshatra, so hourly brackets
+    are safe; bisection then refines them to about a second.
+    """
+    times, before, after = find_transits(
+        start_dt.timestamp(), end_dt.timestamp(), _nakshatra_positions,
+        step_seconds=3600.0, precision_seconds=1.0
+    )
+    return _transition_records(times, before, after)
+
+def _nakshatra_transitions(start_dt, end_dt, lat=DEFAULT_LAT, lon=DEFAULT_LON):
+    """Transitions in a window: table lookup when covered, else the ephemeris."""
+    transitions = _table_transitions(start_dt, end_dt)
+    if transitions is None:
+        transitions = _find_nakshatra_times(start_dt, end_dt, lat, lon)
+    return transitions
+
+def _format_ist_time(unix):
+    """HH:MM:SS in IST, or None for a missing (NaN) instant."""
+    if np.isnan(unix):
+        return None
+    return datetime.datetime.fromtimestamp(round(float(unix)), IST).strftime('%H:%M:%S')
+
+@lru_cache(maxsize=24)
+@panchang_cache.disk_cached('month_calendar', _cache_version)
+def get_month_calendar(date_obj, lat=DEFAULT_LAT, lon=DEFAULT_LON):
+    """
+    Every day of the month containing `date_obj`: Gregorian date, Malayalam date,
+    star at sunrise and the nakshatra transitions falling on that day (IST).
+    Stars, Malayalam dates and transitions each come from a single range call.
+    """
+    first = date_obj.replace(day=1)
+    next_month = (first + datetime.timedelta(days=32)).replace(day=1)
+    days = (next_month - first).days
+
+    indices = get_nakshatra_indices(first, days, lat, lon)
+    mal_dates = get_malayalam_dates(first, days)
+    sunrises, sunsets = get_sun_times(first, days, lat, lon)
+    limbs = get_panchanga_indices(first, days, lat, lon)
+
+    start_dt = datetime.datetime.combine(first, datetime.time(0, 0)).replace(tzinfo=IST)
+    end_dt = datetime.datetime.combine(next_month, datetime.time(0, 0)).replace(tzinfo=IST)
+    by_day = {}
+    for tr in _nakshatra_transitions(start_dt, end_dt, lat, lon):
+        by_day.setdefault(tr['end_time'].date(), []).append({
+            'nakshatra': tr['nakshatra'],
+            'nakshatra_mal': tr['nakshatra_mal'],
+            'end_time': tr['end_time'].strftime('%Y-%m-%d %H:%M:%S'),
+            'next_nakshatra': tr['next_nakshatra']
+        })
+
+    result_days = []
+    for i in range(days):
+        day = first + datetime.timedelta(days=i)
+        idx = int(indices[i])
+        result_days.append({
+            'date': day.strftime('%Y-%m-%d'),
+            'weekday': day.strftime('%A'),
+            'mal_date': mal_dates[i],
+            'nakshatra_index': idx,
+            'nakshatra_eng': NAKSHATRAS_ENG[idx],
+            'nakshatra_mal': NAKSHATRAS_MAL[idx],
+            'sunrise': _format_ist_time(sunrises[i]),
+            'sunset': _format_ist_time(sunsets[i]),
+            'tithi': limb_name('tithi', limbs['tithi'][i])[0],
+            'tithi_mal': limb_name('tithi', limbs['tithi'][i])[1],
+            'yoga': limb_name('yoga', limbs['yoga'][i])[0],
+            'yoga_mal': limb_name('yoga', limbs['yoga'][i])[1],
+            'karana': limb_name('karana', limbs['karana'][i])[0],
+            'karana_mal': limb_name('karana', limbs['karana'][i])[1],
+            'transitions': by_day.get(day, [])
+        })
+
+    return {
+        'year': first.year,
+        'month': first.month,
+        'days': result_days
+    }
+
 def get_nakshatra_timings(date_obj, lat=DEFAULT_LAT, lon=DEFAULT_LON):
     """
     Returns a timeline of nakshatras for the given date (00:00 to 23:59).
     Includes precise start/end timings.
     """
     try:
-        ts, _ = _get_skyfield_data()
-        
         # Define Day Range (IST)
-        tz = datetime.timezone(datetime.timedelta(hours=5, minutes=30))
-        
-        start_dt = datetime.datetime.combine(date_obj, datetime.time(0, 0, 0)).replace(tzinfo=tz)
-        end_dt = datetime.datetime.combine(date_obj, datetime.time(23, 59, 59)).replace(tzinfo=tz)
-        
-        t0 = ts.from_datetime(start_dt)
-        t1 = ts.from_datetime(end_dt)
-        
-        # 1. Identify Star at start of day (midnight)
-        # Use our helper logic (custom calculation, not Sunrise rule)
-        # Reuse internal logic of _find_nakshatra_times or duplicate safely
-        
-        # Get helper
-        # We need to expose the internal calculation logic or wrap it
-        # Let's run the finder.
+        start_dt = datetime.datetime.combine(date_obj, datetime.time(0, 0, 0)).replace(tzinfo=IST)
+        end_dt = datetime.datetime.combine(date_obj, datetime.time(23, 59, 59)).replace(tzinfo=IST)
         
         # We also need the PREVIOUS transition to know when the current star started (if it started yesterday)
         # And NEXT transition (if it ends tomorrow).
-        
-        # Search window: Yesterday 12 PM to Tomorrow 12 PM (48 hours) just to be safe?
-        # Let's stick to Today's view, but showing "started at..." or "ends at..."
-        
         # Expanded Window: 
         # Start: Today - 1 Day
         # End: Today + 1 Day
         w_start = start_dt - datetime.timedelta(days=1)
         w_end = end_dt + datetime.timedelta(days=1)
         
-        wt0 = ts.from_datetime(w_start)
-        wt1 = ts.from_datetime(w_end)
-        
-        transitions = _find_nakshatra_times(wt0, wt1, lat, lon)
+        # Transitions are sorted by time
+        day_transitions = _nakshatra_transitions(w_start, w_end, lat, lon)
         
         # Now construct the timeline for "Today"
-        # Filter relevant transitions
-        
-        timeline = []
-        
-        # Star active at Start of Day (00:00)
-        # Find the last transition BEFORE 00:00
-        current_star = None
-        start_time = None
         
-        # Finding initial state by evaluating at w_start
-        # Actually, let's just evaluate at 00:00 strictly to know who is reigning.
-        
-        # Re-evaluate pos at t0
-        # Duplicate logic? 
-        # No, just trust the transitions list?
-        # If transitions list is empty (rare, star lasts 48h?), evaluate at t0.
-        
-        # Robust way: 
-        # 1. Evaluate Star at 00:00
-        # 2. Look for next transition in transitions list > 00:00
-        # 3. Look for prev transition < 00:00 to find start time
-        
-        # Let's define "Index at 00:00"
-        # We need access to moon_nakshatra_pos from inside _find...
-        # Let's refactor slightly to be cleaner eventually, but for now inline logic
-        
-        # Quick eval at t0
-        index_at_start = get_nakshatra_index(date_obj - datetime.timedelta(days=1)) # Sunrise yesterday? No.
-        # Use logic from find_times
-        # We'll just assume the first transition in our window tells us the flow.
-        
-        # Let's look at transitions sorted by time.
-        
-        # Filter relevant ones
-        day_transitions = []
-        for tr in transitions:
-            t_time = tr['end_time']
-            day_transitions.append(tr)
-            
         # Build structure:
         # Segment 1: Star Name, Start Time (if today or prev), End Time (if today or next)
         
@@ -786,3 +1505,82 @@ def get_nakshatra_timings(date_obj, lat=DEFAULT_LAT, lon=DEFAULT_LON):
         traceback.print_exc()
         # Return a generic error message to avoid exposing internal details
         return {'status': 'error', 'message': 'Internal Error'}
+
+# --- Annual Almanac ---
+
+def get_sankrantis(start_date, days):
+    """
+    Range API: sankrantis falling in `days` consecutive dates from `start_date`,
+    as {date: {'time': 'HH:MM:SS' (IST), 'mal_month', 'mal_month_mal'}}, where the
+    month is the one the Sun enters.
+    """
+    start_unix = datetime.datetime.combine(start_date, datetime.time(0, 0)).replace(tzinfo=IST).timestamp()
+    times, rasis = _sankrantis_between(start_unix, start_unix + days * 86400.0)
+
+    sankrantis = {}
+    for t, rasi in zip(times, rasis):
+        moment = datetime.datetime.fromtimestamp(round(float(t)), IST)
+        month_idx = _mal_month_index(rasi)
+        sankrantis[moment.date()] = {
+            'time': moment.strftime('%H:%M:%S'),
+            'mal_month': MAL_MONTHS_ENG[month_idx],
+            'mal_month_mal': MAL_MONTHS_MAL[month_idx]
+        }
+    return sankrantis
+
+def get_malayalam_year_span(mal_year):
+    """First and last Gregorian dates of a Kollavarsham year (Chingam 1 to the eve of the next)."""
+    first = get_english_date(mal_year, 'Chingam', 1)
+    next_first = get_english_date(mal_year + 1, 'Chingam', 1)
+    if first is None or next_first is None:
+        raise ValueError(f"Malayalam year {mal_year} is outside the supported range")
+    return first, next_first - datetime.timedelta(days=1)
+
+def iter_almanac(mal_year, lat=DEFAULT_LAT, lon=DEFAULT_LON):
+    """
+    Yields one dict per day of a Malayalam year: Malayalam date, star at sunrise,
+    the star changes on that day (IST), sunrise and any sankranti.
+    Stars, Malayalam dates, sunrises, transitions and sankrantis are each computed
+    once for the whole year (the same range calls as get_nakshatra_timings and
+    get_malayalam_date rely on); rows are then built one at a time as they are consumed.
+    """
+    first, last = get_malayalam_year_span(mal_year)
+    days = (last - first).days + 1
+
+    indices = get_nakshatra_indices(first, days, lat, lon)
+    mal_dates = get_malayalam_dates(first, days)
+    sunrises, _ = get_sun_times(first, days, lat, lon)
+
+    start_dt = datetime.datetime.combine(first, datetime.time(0, 0)).replace(tzinfo=IST)
+    end_dt = start_dt + datetime.timedelta(days=days)
+    transitions = _nakshatra_transitions(start_dt, end_dt, lat, lon)
+
+    sankrantis = get_sankrantis(first, days)
+
+    pos = 0
+    for i in range(days):
+        day = first + datetime.timedelta(days=i)
+        idx = int(indices[i])
+
+        changes = []
+        while pos < len(transitions) and transitions[pos]['end_time'].date() == day:
+            tr = transitions[pos]
+            changes.append({
+                'nakshatra': tr['nakshatra'],
+                'nakshatra_mal': tr['nakshatra_mal'],
+                'end_time': tr['end_time'].strftime('%H:%M:%S'),
+                'next_nakshatra': tr['next_nakshatra']
+            })
+            pos += 1
+
+        yield {
+            'date': day,
+            'weekday': day.strftime('%A'),
+            'mal_date': mal_dates[i],
+            'month_start': mal_dates[i]['day'] == 1,
+            'nakshatra_eng': NAKSHATRAS_ENG[idx],
+            'nakshatra_mal': NAKSHATRAS_MAL[idx],
+            'sunrise': _format_ist_time(sunrises[i]),
+            'transitions': changes,
+            'sankranti': sankrantis.get(day)
+        }
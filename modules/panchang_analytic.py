@@ -0,0 +1,160 @@
+import numpy as np
+
+# Analytic Sun/Moon positions (truncated Meeus, "Astronomical Algorithms" ch. 22, 25, 47)
+# in pure NumPy. No ephemeris file is needed. Accuracy is roughly 10" for the Moon
+# and 30" for the Sun, which moves a sunrise star or a sankranti by well under a
+# minute. Inputs are Unix timestamps (UTC seconds, scalar or array). Longitudes are
+# geocentric, referred to the true ecliptic and equinox of date like Skyfield's
+# ecliptic_frame.
+
+UNIX_EPOCH_JD = 2440587.5
+J2000_JD = 2451545.0
+
+# Meeus Table 47.A: multiples of D, M, M', F and the sine coefficient of the
+# Moon's longitude in 1e-6 degrees.
+_MOON_LON_TERMS = np.array([
+    (0, 0, 1, 0, 6288774), (2, 0, -1, 0, 1274027), (2, 0, 0, 0, 658314),
+    (0, 0, 2, 0, 213618), (0, 1, 0, 0, -185116), (0, 0, 0, 2, -114332),
+    (2, 0, -2, 0, 58793), (2, -1, -1, 0, 57066), (2, 0, 1, 0, 53322),
+    (2, -1, 0, 0, 45758), (0, 1, -1, 0, -40923), (1, 0, 0, 0, -34720),
+    (0, 1, 1, 0, -30383), (2, 0, 0, -2, 15327), (0, 0, 1, 2, -12528),
+    (0, 0, 1, -2, 10980), (4, 0, -1, 0, 10675), (0, 0, 3, 0, 10034),
+    (4, 0, -2, 0, 8548), (2, 1, -1, 0, -7888), (2, 1, 0, 0, -6766),
+    (1, 0, -1, 0, -5163), (1, 1, 0, 0, 4987), (2, -1, 1, 0, 4036),
+    (2, 0, 2, 0, 3994), (4, 0, 0, 0, 3861), (2, 0, -3, 0, 3665),
+    (0, 1, -2, 0, -2689), (2, 0, -1, 2, -2602), (2, -1, -2, 0, 2390),
+    (1, 0, 1, 0, -2348), (2, -2, 0, 0, 2236), (0, 1, 2, 0, -2120),
+    (0, 2, 0, 0, -2069), (2, -2, -1, 0, 2048), (2, 0, 1, -2, -1773),
+    (2, 0, 0, 2, -1595), (4, -1, -1, 0, 1215), (0, 0, 2, 2, -1110),
+    (3, 0, -1, 0, -892), (2, 1, 1, 0, -810), (4, -1, -2, 0, 759),
+    (0, 2, -1, 0, -713), (2, 2, -1, 0, -700), (2, 1, -2, 0, 691),
+    (2, -1, 0, -2, 596), (4, 0, 1, 0, 549), (0, 0, 4, 0, 537),
+    (4, -1, 0, 0, 520), (1, 0, -2, 0, -487), (2, 1, 0, -2, -399),
+    (0, 0, 2, -2, -381), (1, 1, 1, 0, 351), (3, 0, -2, 0, -340),
+    (4, 0, -3, 0, 330), (2, -1, 2, 0, 327), (0, 2, 1, 0, -323),
+    (1, 1, -1, 0, 299), (2, 0, 3, 0, 294),
+], dtype=float)
+
+# Standard altitude of the Sun's upper limb at rising/setting (refraction + semi-diameter)
+SUNRISE_ALTITUDE = -0.8333
+
+
+def delta_t(unix_seconds):
+    """
+    TT - UT in seconds (Espenak & Meeus polynomials). Adequate for 1860-2150,
+    which covers every date this application deals with.
+    """
+    y = 1970.0 + np.asarray(unix_seconds, dtype=float) / (365.2425 * 86400.0)
+    conditions = [y < 1900, y < 1920, y < 1941, y < 1961, y < 1986, y < 2005, y < 2050]
+    t = [y - 1860, y - 1900, y - 1920, y - 1950, y - 1975, y - 2000, y - 2000]
+    choices = [
+        7.62 + 0.5737 * t[0] - 0.251754 * t[0]**2 + 0.01680668 * t[0]**3
+            - 0.0004473624 * t[0]**4 + t[0]**5 / 233174,
+        -2.79 + 1.494119 * t[1] - 0.0598939 * t[1]**2 + 0.0061966 * t[1]**3 - 0.000197 * t[1]**4,
+        21.20 + 0.84493 * t[2] - 0.076100 * t[2]**2 + 0.0020936 * t[2]**3,
+        29.07 + 0.407 * t[3] - t[3]**2 / 233 + t[3]**3 / 2547,
+        45.45 + 1.067 * t[4] - t[4]**2 / 260 - t[4]**3 / 718,
+        63.86 + 0.3345 * t[5] - 0.060374 * t[5]**2 + 0.0017275 * t[5]**3
+            + 0.000651814 * t[5]**4 + 0.00002373599 * t[5]**5,
+        62.92 + 0.32217 * t[6] + 0.005589 * t[6]**2,
+    ]
+    u = (y - 1820) / 100
+    return np.select(conditions, choices, default=-20 + 32 * u**2 - 0.5628 * (2150 - y))
+
+
+def _centuries_tt(unix_seconds):
+    unix_seconds = np.asarray(unix_seconds, dtype=float)
+    jd_tt = (unix_seconds + delta_t(unix_seconds)) / 86400.0 + UNIX_EPOCH_JD
+    return (jd_tt - J2000_JD) / 36525.0
+
+
+def _nutation_longitude(T):
+    """Nutation in longitude (degrees), Meeus ch. 22 low-precision form (0.5")."""
+    omega = np.radians(125.04452 - 1934.136261 * T)
+    L_sun = np.radians(280.4665 + 36000.7698 * T)
+    L_moon = np.radians(218.3165 + 481267.8813 * T)
+    return (-17.20 * np.sin(omega) - 1.32 * np.sin(2 * L_sun)
+            - 0.23 * np.sin(2 * L_moon) + 0.21 * np.sin(2 * omega)) / 3600.0
+
+
+def _sun_true_longitude(T):
+    L0 = 280.46646 + 36000.76983 * T + 0.0003032 * T**2
+    M = np.radians(357.52911 + 35999.05029 * T - 0.0001537 * T**2)
+    C = ((1.914602 - 0.004817 * T - 0.000014 * T**2) * np.sin(M)
+         + (0.019993 - 0.000101 * T) * np.sin(2 * M)
+         + 0.000289 * np.sin(3 * M))
+    return L0 + C
+
+
+# Offset between this series and Skyfield's astrometric Sun, measured on the DE430
+# and DE441 excerpts bundled with Skyfield's tests rather than on the app's de421,
+# which agrees with those far below an arcsecond for the Sun (whole-range checks
+# against de421: scripts/validate_analytic_engine.py). It matches the constant of
+# aberration, 20.5".
+SUN_OFFSET = -0.00569
+
+
+def sun_longitude(unix_seconds):
+    """Geocentric ecliptic longitude of the Sun (degrees, of date)."""
+    T = _centuries_tt(unix_seconds)
+    return (_sun_true_longitude(T) + SUN_OFFSET + _nutation_longitude(T)) % 360
+
+
+def moon_longitude(unix_seconds):
+    """Geocentric ecliptic longitude of the Moon (degrees, of date)."""
+    T = _centuries_tt(unix_seconds)
+
+    Lp = 218.3164477 + 481267.88123421 * T - 0.0015786 * T**2 + T**3 / 538841 - T**4 / 65194000
+    D = 297.8501921 + 445267.1114034 * T - 0.0018819 * T**2 + T**3 / 545868 - T**4 / 113065000
+    M = 357.5291092 + 35999.0502909 * T - 0.0001536 * T**2 + T**3 / 24490000
+    Mp = 134.9633964 + 477198.8675055 * T + 0.0087414 * T**2 + T**3 / 69699 - T**4 / 14712000
+    F = 93.2720950 + 483202.0175233 * T - 0.0036539 * T**2 - T**3 / 3526000 + T**4 / 863310000
+    A1 = 119.75 + 131.849 * T
+    A2 = 53.09 + 479264.290 * T
+    E = 1 - 0.002516 * T - 0.0000074 * T**2
+
+    terms = _MOON_LON_TERMS
+    # Arguments for every (time, term) pair: shape (..., n_terms)
+    args = np.radians(
+        np.multiply.outer(D, terms[:, 0]) + np.multiply.outer(M, terms[:, 1])
+        + np.multiply.outer(Mp, terms[:, 2]) + np.multiply.outer(F, terms[:, 3])
+    )
+    # Terms containing M are scaled by the Earth's orbital eccentricity
+    ecc = np.power.outer(E, np.abs(terms[:, 1]))
+    sigma_l = np.sum(terms[:, 4] * ecc * np.sin(args), axis=-1)
+    sigma_l += (3958 * np.sin(np.radians(A1)) + 1962 * np.sin(np.radians(Lp - F))
+                + 318 * np.sin(np.radians(A2)))
+
+    return (Lp + sigma_l / 1e6 + _nutation_longitude(T)) % 360
+
+
+def sun_times(midnight_unix, lat, lon):
+    """
+    Sunrise and sunset (Unix seconds) for the days starting at `midnight_unix`
+    (array of local midnights). NaN where the Sun does not rise or set.
+    Each event is found by a few fixed-point iterations on the hour angle.
+    """
+    midnight_unix = np.asarray(midnight_unix, dtype=float)
+    phi = np.radians(lat)
+    results = []
+    for sign in (-1, 1):
+        # Start from 06:00 / 18:00 local clock time; the iteration converges from there
+        t = midnight_unix + (12 + sign * 6) * 3600.0
+        for _ in range(4):
+            T = _centuries_tt(t)
+            lam = np.radians(_sun_true_longitude(T) + SUN_OFFSET)
+            eps = np.radians(23.439291 - 0.0130042 * T)
+            ra = np.degrees(np.arctan2(np.cos(eps) * np.sin(lam), np.cos(lam)))
+            dec = np.arcsin(np.sin(eps) * np.sin(lam))
+
+            jd_ut = t / 86400.0 + UNIX_EPOCH_JD
+            gmst = 280.46061837 + 360.98564736629 * (jd_ut - J2000_JD)
+            hour_angle = (gmst + lon - ra + 180) % 360 - 180
+
+            cos_h0 = ((np.sin(np.radians(SUNRISE_ALTITUDE)) - np.sin(phi) * np.sin(dec))
+                      / (np.cos(phi) * np.cos(dec)))
+            h0 = np.degrees(np.arccos(np.clip(cos_h0, -1, 1)))
+            t = t + (sign * h0 - hour_angle) / 360.98564736629 * 86400.0
+        results.append(np.where(np.abs(cos_h0) > 1, np.nan, t))
+
+    return results[0], results[1]
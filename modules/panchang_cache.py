@@ -0,0 +1,202 @@
+import os
+import json
+import logging
+import sqlite3
+import threading
+import functools
+import inspect
+
+# Disk-backed cache for per-day panchang results, shared by every worker process
+# and kept across restarts. Lives in its own SQLite file next to temple.db so it
+# never contends with billing writes and can be deleted at any time.
+
+MAX_ENTRIES = 200000
+# Eviction runs every EVICT_EVERY inserts and trims the oldest rows.
+EVICT_EVERY = 500
+# 0.01 degree is ~1 km, which moves sunrise by a few seconds at most.
+COORD_SCALE = 100
+
+_lock = threading.Lock()
+_conn = None
+_conn_pid = None
+_disabled = False
+_inserts = 0
+_stats = {'hits': 0, 'misses': 0, 'errors': 0}
+# Connections inherited across fork, kept referenced so they are never closed here
+_inherited = []
+
+
+def _cache_path():
+    from config import Config
+    return Config.PANCHANG_CACHE_PATH
+
+
+def _get_conn():
+    """Opens (once per process) the cache connection. Returns None if the cache is unavailable."""
+    global _conn, _conn_pid, _disabled
+    if _disabled:
+        return None
+    # A connection inherited across fork must not be reused by the child.
+    if _conn is not None and _conn_pid == os.getpid():
+        return _conn
+    try:
+        conn = sqlite3.connect(_cache_path(), timeout=5, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("PRAGMA synchronous=NORMAL;")
+        conn.execute("PRAGMA busy_timeout=5000;")
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS panchang_cache (
+                kind TEXT NOT NULL,
+                day TEXT NOT NULL,
+                lat_q INTEGER NOT NULL,
+                lon_q INTEGER NOT NULL,
+                version TEXT NOT NULL,
+                value TEXT NOT NULL,
+                PRIMARY KEY (kind, day, lat_q, lon_q, version)
+            )
+        ''')
+        conn.commit()
+    except Exception as e:
+        logging.error(f"Panchang cache unavailable, continuing without it: {e}")
+        _disabled = True
+        return None
+    _conn = conn
+    _conn_pid = os.getpid()
+    return _conn
+
+
+def close():
+    """Closes this process's connection (call before forking workers)."""
+    global _conn, _conn_pid
+    with _lock:
+        if _conn is not None and _conn_pid == os.getpid():
+            _conn.close()
+        _conn = None
+        _conn_pid = None
+
+
+def reset_after_fork():
+    """
+    Forgets a connection inherited from the parent without closing it (closing
+    it in the child could disturb the parent's locks). The next call reopens.
+    """
+    global _conn, _conn_pid, _lock
+    if _conn is not None:
+        _inherited.append(_conn)
+    _conn = None
+    _conn_pid = None
+    _lock = threading.Lock()
+
+
+def _quantize(value):
+    return int(round(float(value) * COORD_SCALE))
+
+
+def get(kind, day, lat, lon, version):
+    """Returns the cached value or None."""
+    with _lock:
+        conn = _get_conn()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute(
+                "SELECT value FROM panchang_cache WHERE kind=? AND day=? AND lat_q=? AND lon_q=? AND version=?",
+                (kind, day.isoformat(), _quantize(lat), _quantize(lon), version)
+            ).fetchone()
+        except sqlite3.Error as e:
+            _stats['errors'] += 1
+            logging.error(f"Panchang cache read failed: {e}")
+            return None
+        if row is None:
+            _stats['misses'] += 1
+            return None
+        _stats['hits'] += 1
+        return json.loads(row[0])
+
+
+def put(kind, day, lat, lon, version, value):
+    """Stores a JSON-serialisable value, evicting the oldest rows when over MAX_ENTRIES."""
+    global _inserts
+    with _lock:
+        conn = _get_conn()
+        if conn is None:
+            return
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO panchang_cache (kind, day, lat_q, lon_q, version, value) VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, day.isoformat(), _quantize(lat), _quantize(lon), version, json.dumps(value))
+            )
+            _inserts += 1
+            if _inserts % EVICT_EVERY == 0:
+                _evict(conn)
+            conn.commit()
+        except sqlite3.Error as e:
+            _stats['errors'] += 1
+            logging.error(f"Panchang cache write failed: {e}")
+
+
+def _evict(conn):
+    count = conn.execute("SELECT COUNT(*) FROM panchang_cache").fetchone()[0]
+    excess = count - MAX_ENTRIES
+    if excess > 0:
+        # rowid follows insertion order, so this drops the oldest entries first
+        conn.execute(
+            "DELETE FROM panchang_cache WHERE rowid IN (SELECT rowid FROM panchang_cache ORDER BY rowid LIMIT ?)",
+            (excess,)
+        )
+
+
+def purge_stale(version):
+    """Deletes rows written by other algorithm versions."""
+    with _lock:
+        conn = _get_conn()
+        if conn is None:
+            return 0
+        cur = conn.execute("DELETE FROM panchang_cache WHERE version != ?", (version,))
+        conn.commit()
+        return cur.rowcount
+
+
+def clear():
+    with _lock:
+        conn = _get_conn()
+        if conn is None:
+            return
+        conn.execute("DELETE FROM panchang_cache")
+        conn.commit()
+
+
+def stats():
+    """Hit/miss counters for this process plus the shared entry count."""
+    with _lock:
+        result = dict(_stats)
+        conn = _get_conn()
+        result['enabled'] = conn is not None
+        result['entries'] = conn.execute("SELECT COUNT(*) FROM panchang_cache").fetchone()[0] if conn else 0
+        result['max_entries'] = MAX_ENTRIES
+        return result
+
+
+def disk_cached(kind, version):
+    """
+    Decorator for functions of (date_obj, lat, lon) returning JSON-serialisable
+    values. Results are looked up on disk by (kind, date, quantized lat/lon, version)
+    before computing. `version` may be a string or a callable returning one.
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            date_obj, lat, lon = bound.arguments['date_obj'], bound.arguments['lat'], bound.arguments['lon']
+
+            key_version = version() if callable(version) else version
+            value = get(kind, date_obj, lat, lon, key_version)
+            if value is None:
+                value = fn(*args, **kwargs)
+                put(kind, date_obj, lat, lon, key_version, value)
+            return value
+        return wrapper
+    return decorator
@@ -0,0 +1,72 @@
+import time
+import logging
+import sqlite3
+
+# Summary tables in temple.db kept exact by triggers on bills and bill_items (see the schema
+# migrations in database.py), so the dashboard and report totals read a few
+# hundred rows instead of aggregating every bill:
+#
+#   bill_daily_summary   bills and amount per (effective_date, cashier_id,
+#                        payment_status, status); effective_date is the cash
+#                        basis date (payment date when paid, else creation)
+#   bill_hourly_summary  bills per creation date and hour of day
+#   item_daily_summary   items sold and amount per (bill date, scheduled date,
+#                        puja) over bills that are not cancelled or draft; it
+#                        also follows status and date changes of the bill
+#
+# NULL key values are stored as '' / 0 so every bill has exactly one row.
+# rebuild() recomputes the tables from bills, e.g. after bulk edits made with
+# triggers disabled; rebuild_all() (scripts/rebuild_summaries.py) also
+# re-indexes the bill search table (modules/bill_search.py).
+
+REBUILD_SQL = {
+    'bill_daily_summary': '''
+        INSERT INTO bill_daily_summary (effective_date, cashier_id, payment_status, status, bill_count, total_amount)
+        SELECT IFNULL(effective_date, ''), IFNULL(cashier_id, 0), IFNULL(payment_status, ''), IFNULL(status, ''),
+               COUNT(*), IFNULL(SUM(total_amount), 0)
+        FROM bills
+        GROUP BY 1, 2, 3, 4
+    ''',
+    'bill_hourly_summary': '''
+        INSERT INTO bill_hourly_summary (created_date, hour, bill_count)
+        SELECT IFNULL(created_date, ''), IFNULL(CAST(strftime('%H', created_at) AS INTEGER), -1), COUNT(*)
+        FROM bills
+        GROUP BY 1, 2
+    ''',
+    'item_daily_summary': '''
+        INSERT INTO item_daily_summary (bill_date, scheduled_date, puja_id, item_count, total_amount)
+        SELECT IFNULL(b.created_date, ''), IFNULL(b.scheduled_date, ''), bi.puja_id,
+               SUM(IFNULL(bi.count, 0)), SUM(IFNULL(bi.total, 0))
+        FROM bill_items bi
+        JOIN bills b ON b.id = bi.bill_id
+        WHERE IFNULL(b.status, '') NOT IN ('cancelled', 'draft')
+        GROUP BY 1, 2, 3
+    ''',
+}
+
+
+def rebuild(conn, tables=None):
+    """Recomputes the summary tables (all when tables is None) inside the caller's transaction."""
+    for table in tables or REBUILD_SQL:
+        conn.execute(f"DELETE FROM {table}")
+        conn.execute(REBUILD_SQL[table])
+
+
+def rebuild_all(db_path=None):
+    """Rebuilds every summary table and the bill search index in one transaction. Returns the row count per table."""
+    from config import Config
+    from modules import bill_search
+
+    t0 = time.perf_counter()
+    conn = sqlite3.connect(db_path or Config.DB_PATH, timeout=30)
+    try:
+        with conn:
+            rebuild(conn)
+            bill_search.rebuild(conn)
+        counts = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                  for table in list(REBUILD_SQL) + ['bill_search']}
+    finally:
+        conn.close()
+
+    logging.info(f"Summary tables rebuilt in {time.perf_counter() - t0:.1f}s: {counts}")
+    return counts
@@ -22,12 +22,15 @@ def require_super_user():
 def index():
     db = get_db()
     
+    # Totals come from bill_daily_summary / bill_hourly_summary (trigger-maintained
+    # rollups of bills, see modules/rollups.py)
+
     # 1. Today's Total (Cash Basis: Paid Today)
     today = datetime.date.today().isoformat()
     today_total = db.execute('''
         SELECT SUM(total_amount) 
-        FROM bills 
-        WHERE date(COALESCE(payment_date, created_at)) = ? 
+        FROM bill_daily_summary 
+        WHERE effective_date = ? 
           AND status != 'cancelled' 
           AND status != 'draft'
           AND payment_status = 'paid'
@@ -38,24 +41,28 @@ def index():
     month_start = today_date.replace(day=1).isoformat()
     month_total = db.execute('''
         SELECT SUM(total_amount) 
-        FROM bills 
-        WHERE date(COALESCE(payment_date, created_at)) >= ? 
+        FROM bill_daily_summary 
+        WHERE effective_date >= ? 
           AND status != 'cancelled' 
           AND status != 'draft'
           AND payment_status = 'paid'
     ''', (month_start,)).fetchone()[0] or 0
 
     # 2.5 Pending Payments Total (Outstanding)
-    pending_total = db.execute("SELECT SUM(total_amount) FROM bills WHERE payment_status = 'pending' AND status != 'cancelled' AND status != 'draft'").fetchone()[0] or 0
+    pending_total = db.execute("SELECT SUM(total_amount) FROM bill_daily_summary WHERE payment_status = 'pending' AND status != 'cancelled' AND status != 'draft'").fetchone()[0] or 0
 
     # 3. Revenue Trend (Last 30 Days)
     thirty_days_ago_date = today_date - datetime.timedelta(days=29)
     thirty_days_ago = thirty_days_ago_date.isoformat()
+
+    # Early in a financial year the window can reach into the archived year
+    from modules import archive
+    schemas = archive.attach_for_range(db, thirty_days_ago, None)
     
-    trend_data = db.execute('''
-        SELECT date(COALESCE(payment_date, created_at)) as day, SUM(total_amount) as total
-        FROM bills 
-        WHERE date(COALESCE(payment_date, created_at)) >= ? 
+    trend_data = db.execute(f'''
+        SELECT effective_date as day, SUM(total_amount) as total
+        FROM {archive.source(db, 'bill_daily_summary', schemas)} 
+        WHERE effective_date >= ? 
           AND status != 'cancelled' 
           AND status != 'draft'
           AND payment_status = 'paid'
@@ -76,12 +83,11 @@ def index():
         curr += datetime.timedelta(days=1)
 
     # 4. Popular Vazhipadus (Top 5 Last 30 Days)
-    top_items_data = db.execute('''
-        SELECT pm.name, SUM(bi.count) as count
-        FROM bill_items bi
-        JOIN puja_master pm ON bi.puja_id = pm.id
-        JOIN bills b ON bi.bill_id = b.id
-        WHERE date(b.created_at) >= ?
+    top_items_data = db.execute(f'''
+        SELECT pm.name, SUM(s.item_count) as count
+        FROM {archive.source(db, 'item_daily_summary', schemas)} s
+        JOIN puja_master pm ON s.puja_id = pm.id
+        WHERE s.bill_date >= ?
         GROUP BY pm.name
         ORDER BY count DESC
         LIMIT 5
@@ -91,16 +97,15 @@ def index():
     top_item_counts = [row['count'] for row in top_items_data]
 
     # 5. Peak Hours (Last 30 Days)
-    # Using substr for sqlite compatibility if strftime behaves oddly, but strftime('%H', ...) is standard sqlite
-    peak_hours_data = db.execute('''
-        SELECT strftime('%H', created_at) as hour, COUNT(*) as count
-        FROM bills
-        WHERE date(created_at) >= ?
+    peak_hours_data = db.execute(f'''
+        SELECT hour, SUM(bill_count) as count
+        FROM {archive.source(db, 'bill_hourly_summary', schemas)}
+        WHERE created_date >= ?
         GROUP BY hour
         ORDER BY hour
     ''', (thirty_days_ago,)).fetchall()
     
-    hours_map = {int(row['hour']): row['count'] for row in peak_hours_data if row['hour'] is not None}
+    hours_map = {row['hour']: row['count'] for row in peak_hours_data}
     
     # Hours of operation typically 5 AM to 9 PM (05 to 21)
     hours_labels = []
@@ -112,11 +117,20 @@ def index():
     today_star = None
     today_mal_date_str = ""
     try:
-        from modules.panchang import get_nakshatra, get_malayalam_date
-        today_date_obj = datetime.date.today()
-        today_star = get_nakshatra(today_date_obj)
-        mal_date = get_malayalam_date(today_date_obj)
-        today_mal_date_str = f"{mal_date['day']} {mal_date['mal_month']} {mal_date['mal_year']}"
+        from modules import calendar_days
+        day = calendar_days.get_day(db, today_date)
+        if day is not None:
+            from modules.panchang import NAKSHATRAS_MAL
+            today_star = {'eng': day['star'], 'mal': NAKSHATRAS_MAL[day['star_index']]}
+            today_mal_date_str = f"{day['mal_day']} {day['mal_month']} {day['mal_year']}"
+        else:
+            # Table not built yet (first start) - compute directly
+            from modules.panchang import get_nakshatra, get_malayalam_date
+            star = get_nakshatra(today_date)
+            if star['status'] == 'success':
+                today_star = {'eng': star['nakshatra_eng'], 'mal': star['nakshatra_mal']}
+            mal_date = get_malayalam_date(today_date)
+            today_mal_date_str = f"{mal_date['day']} {mal_date['mal_month']} {mal_date['mal_year']}"
     except:
         pass
 
@@ -205,6 +219,10 @@ def settings():
         # Invalidate Cache
         from database import clear_settings_cache
         clear_settings_cache()
+
+        # Rebuild the calendar_days table in the background if the location changed
+        from modules import calendar_days
+        calendar_days.start_refresh(only_if_stale=True)
         
         flash('Settings updated successfully', 'success')
         return redirect(url_for('admin.settings'))
@@ -492,6 +510,15 @@ def reports():
     if not start_date: start_date = today
     if not end_date: end_date = today
 
+    # Closed financial years live in yearly archive files (modules/archive.py);
+    # attach the ones the date range reaches. Pending bills are never archived.
+    from modules import archive
+    if payment_status_filter == 'pending':
+        schemas = archive.HOT
+    else:
+        schemas = archive.attach_for_range(db, start_date, end_date)
+    bills_from = archive.source(db, 'bills', schemas)
+
     # Base Conditions
     conditions = ["b.status != 'draft'"]
     params = []
@@ -499,7 +526,7 @@ def reports():
     # If status is pending, we ignore date filter as per requirement "view all pending"
     # Otherwise, we apply date filter based on Effective Date (Payment Date if Paid, else Created Date)
     if payment_status_filter != 'pending':
-         conditions.append('date(COALESCE(b.payment_date, b.created_at)) BETWEEN ? AND ?')
+         conditions.append('b.effective_date BETWEEN ? AND ?')
          params.extend([start_date, end_date])
     
     # Payment Status Filter
@@ -512,27 +539,28 @@ def reports():
     # Search Logic
 
     if search_query:
-        # Search Bill No, Devotee, OR Item Name (Subquery)
-        conditions.append('''
-            (b.bill_no LIKE ? OR b.devotee_name LIKE ? OR EXISTS (
-                SELECT 1 FROM bill_items bi 
-                JOIN puja_master pm ON bi.puja_id = pm.id 
-                WHERE bi.bill_id = b.id AND pm.name LIKE ?
-            ))
-        ''')
-        wildcard = f'%{search_query}%'
-        params.extend([wildcard, wildcard, wildcard])
+        # Search Bill No, Devotee, Phone, Star or Item Name (full-text index)
+        from modules import bill_search
+        search_condition, search_params = bill_search.condition(search_query, schemas=schemas)
+        conditions.append(search_condition)
+        params.extend(search_params)
         
     where_clause = ' AND '.join(conditions)
     
     # 1. Calculate Global Totals (Revenue & Count) for the filtered set
-    # Exclude CANCELLED bills from Revenue and Pending Amount
+    # Exclude CANCELLED bills from Revenue and Pending Amount.
+    # Without a search every condition is on a bill_daily_summary key column, so
+    # the totals are summed from that rollup (aliased as b) instead of bills.
+    if search_query:
+        totals_from, count_expr = f'{bills_from} b', 'COUNT(*)'
+    else:
+        totals_from, count_expr = f"{archive.source(db, 'bill_daily_summary', schemas)} b", 'SUM(b.bill_count)'
     grand_total_sql = f'''
         SELECT 
-            COUNT(*), 
+            {count_expr}, 
             SUM(CASE WHEN b.status != 'cancelled' THEN b.total_amount ELSE 0 END),
             SUM(CASE WHEN b.payment_status = 'pending' AND b.status != 'cancelled' THEN b.total_amount ELSE 0 END)
-        FROM bills b
+        FROM {totals_from}
         WHERE {where_clause}
     '''
     stats = db.execute(grand_total_sql, params).fetchone()
@@ -540,6 +568,25 @@ def reports():
     total_revenue = stats[1] or 0.0
     pending_amount = stats[2] or 0.0
 
+    # 1b. Revenue by Malayalam month and by star of the day, via the calendar_days date dimension
+    calendar_join = f'''
+        FROM {totals_from}
+        JOIN calendar_days cd ON cd.day = b.effective_date
+        WHERE {where_clause} AND b.status != 'cancelled'
+    '''
+    by_mal_month = db.execute(f'''
+        SELECT cd.mal_year, cd.mal_month, {count_expr} as bill_count, SUM(b.total_amount) as total
+        {calendar_join}
+        GROUP BY cd.mal_year, cd.mal_month_index
+        ORDER BY cd.mal_year, cd.mal_month_index
+    ''', params).fetchall()
+    by_star = db.execute(f'''
+        SELECT cd.star, {count_expr} as bill_count, SUM(b.total_amount) as total
+        {calendar_join}
+        GROUP BY cd.star_index
+        ORDER BY total DESC
+    ''', params).fetchall()
+
     # 2. Pagination
     page = request.args.get('page', 1, type=int)
     per_page = 10
@@ -552,7 +599,7 @@ def reports():
             b.*,
             u.username as cashier_name,
             u2.username as receiver_name
-        FROM bills b
+        FROM {bills_from} b
         JOIN users u ON b.cashier_id = u.id
         LEFT JOIN users u2 ON b.payment_received_by = u2.id
         WHERE {where_clause}
@@ -569,9 +616,9 @@ def reports():
     bill_list = []
     for bill in bills:
         b_dict = dict(bill)
-        b_dict['line_items'] = db.execute('''
+        b_dict['line_items'] = db.execute(f'''
             SELECT bi.*, pm.name 
-            FROM bill_items bi 
+            FROM {archive.table_for(bill, 'bill_items')} bi 
             JOIN puja_master pm ON bi.puja_id = pm.id 
             WHERE bi.bill_id = ?
         ''', (bill['id'],)).fetchall()
@@ -582,6 +629,8 @@ def reports():
                            total_amount=total_revenue, 
                            pending_amount=pending_amount,
                            count=total_records, 
+                           by_mal_month=by_mal_month,
+                           by_star=by_star,
                            start_date=start_date,
                            end_date=end_date,
                            search_query=search_query,
@@ -605,8 +654,10 @@ def export_reports():
     if not start_date: start_date = today
     if not end_date: end_date = today
     
-    # Export full dump for the date range with Items
-    cursor = db.execute('''
+    # Export full dump for the date range with Items, from the yearly archives too
+    from modules import archive
+    schemas = archive.attach_for_range(db, start_date, end_date)
+    cursor = db.execute(f'''
         SELECT 
             b.bill_no, 
             b.created_at, 
@@ -617,12 +668,12 @@ def export_reports():
             b.total_amount,
             b.payment_status,
             u2.username as received_by
-        FROM bills b
+        FROM {archive.source(db, 'bills', schemas)} b
         JOIN users u ON b.cashier_id = u.id
         LEFT JOIN users u2 ON b.payment_received_by = u2.id
-        LEFT JOIN bill_items bi ON b.id = bi.bill_id
+        LEFT JOIN {archive.source(db, 'bill_items', schemas)} bi ON b.id = bi.bill_id
         LEFT JOIN puja_master pm ON bi.puja_id = pm.id
-        WHERE date(b.created_at) BETWEEN ? AND ?
+        WHERE b.created_date BETWEEN ? AND ?
         GROUP BY b.id
         ORDER BY b.created_at DESC
     ''', (start_date, end_date))
@@ -659,6 +710,85 @@ def export_reports():
         headers={"Content-disposition": f"attachment; filename={filename}"}
     )
 
+@admin_bp.route('/reports/items')
+def item_report():
+    """
+    Item-wise sales (count and amount per vazhipadu) by day or month, read from
+    the item_daily_summary rollup (and its copy in the yearly archives the range
+    reaches). basis=scheduled dates items by the day the
+    puja is scheduled for (bill date when none was given); format=csv downloads it.
+    """
+    import csv
+    import io
+    from flask import Response
+    import datetime
+
+    db = get_db()
+    today = datetime.date.today().isoformat()
+    start_date = request.args.get('start_date') or today
+    end_date = request.args.get('end_date') or today
+    group = request.args.get('group', 'day')
+    basis = request.args.get('basis', 'billed')
+    if group not in ('day', 'month'):
+        group = 'day'
+    if basis not in ('billed', 'scheduled'):
+        basis = 'billed'
+
+    if basis == 'scheduled':
+        date_expr = "CASE WHEN s.scheduled_date = '' THEN s.bill_date ELSE s.scheduled_date END"
+    else:
+        date_expr = "s.bill_date"
+    period_expr = date_expr if group == 'day' else f"substr({date_expr}, 1, 7)"
+
+    from modules import archive
+    schemas = archive.attach_for_range(db, start_date, end_date)
+    rows = db.execute(f'''
+        SELECT {period_expr} as period, pm.name, pm.type,
+               SUM(s.item_count) as item_count, SUM(s.total_amount) as amount
+        FROM {archive.source(db, 'item_daily_summary', schemas)} s
+        JOIN puja_master pm ON s.puja_id = pm.id
+        WHERE {date_expr} BETWEEN ? AND ?
+        GROUP BY period, s.puja_id
+        ORDER BY period, pm.name
+    ''', (start_date, end_date)).fetchall()
+
+    if request.args.get('format') == 'csv':
+        output = io.StringIO()
+        output.write('\ufeff')
+        writer = csv.writer(output)
+        writer.writerow(['Date' if group == 'day' else 'Month', 'Vazhipadu', 'Type', 'Count', 'Amount'])
+        for row in rows:
+            writer.writerow([row['period'], row['name'], row['type'], row['item_count'], f"{row['amount']:.2f}"])
+        filename = f"item_sales_{start_date}.csv" if start_date == end_date else f"item_sales_{start_date}_to_{end_date}.csv"
+        return Response(
+            output.getvalue(),
+            mimetype="text/csv",
+            headers={"Content-disposition": f"attachment; filename={filename}"}
+        )
+
+    # Rows grouped by period with subtotals, plus totals per item over the range
+    periods = []
+    item_totals = {}
+    for row in rows:
+        if not periods or periods[-1]['period'] != row['period']:
+            periods.append({'period': row['period'], 'rows': [], 'item_count': 0, 'amount': 0.0})
+        periods[-1]['rows'].append(row)
+        periods[-1]['item_count'] += row['item_count']
+        periods[-1]['amount'] += row['amount']
+        total = item_totals.setdefault(row['name'], {'name': row['name'], 'item_count': 0, 'amount': 0.0})
+        total['item_count'] += row['item_count']
+        total['amount'] += row['amount']
+
+    return render_template('admin/item_report.html',
+                           periods=periods,
+                           item_totals=sorted(item_totals.values(), key=lambda t: t['item_count'], reverse=True),
+                           grand_count=sum(t['item_count'] for t in item_totals.values()),
+                           grand_amount=sum(t['amount'] for t in item_totals.values()),
+                           start_date=start_date,
+                           end_date=end_date,
+                           group=group,
+                           basis=basis)
+
 @admin_bp.route('/backups')
 def backups():
     import os
@@ -687,8 +817,31 @@ def backups():
     
     # Sort by created_at desc
     backup_files.sort(key=lambda x: x['created_at'], reverse=True)
+
+    from modules import archive
+    db = get_db()
     
-    return render_template('admin/backups.html', backups=backup_files)
+    return render_template('admin/backups.html', backups=backup_files,
+                           archives=archive.list_archives(db),
+                           closed_years=archive.closed_years(db))
+
+@admin_bp.route('/backups/archive', methods=['POST'])
+def archive_bills():
+    from modules import archive
+
+    try:
+        moved = archive.archive_closed_years()
+        if moved:
+            summary = ', '.join(f"{year}-{(year + 1) % 100:02d}: {count}" for year, count in moved.items())
+            flash(f'Bills moved to the yearly archives ({summary}).', 'success')
+        else:
+            flash('No closed financial year has bills left to archive.', 'info')
+    except Exception as e:
+        import logging
+        logging.error(f"Archiving failed: {e}", exc_info=True)
+        flash('Archiving failed. Check logs for details.', 'error')
+
+    return redirect(url_for('admin.backups'))
 
 @admin_bp.route('/backups/trigger', methods=['POST'])
 def trigger_backup():
@@ -791,6 +944,12 @@ def restore_backup(filename):
             
         dst.close()
         src.close()
+
+        # Bring an older backup up to the current schema, and make every
+        # worker drop its cached settings
+        from database import init_db, invalidate_reference
+        init_db()
+        invalidate_reference()
         
         flash(f'Database restored successfully from {safe_filename}.', 'success')
         
@@ -995,6 +1154,80 @@ def install_update():
     flash('Update process started. System will restart automatically.', 'info')
     return redirect(url_for('admin.updates'))
 
+@admin_bp.route('/almanac')
+def almanac():
+    from modules import panchang
+    today = datetime.date.today()
+    min_year, max_year = _almanac_year_range()
+    return render_template('admin/almanac.html',
+                           mal_year=panchang.get_malayalam_date(today)['mal_year'],
+                           min_year=min_year,
+                           max_year=max_year)
+
+def _almanac_year_range():
+    # Malayalam years lying wholly inside the panchang table span
+    from modules import panchang
+    return panchang.TABLE_START.year - 824, panchang.TABLE_END.year - 825
+
+@admin_bp.route('/almanac/export')
+def export_almanac():
+    from flask import Response, stream_with_context, stream_template
+    from modules import panchang, almanac as almanac_format
+    from database import get_cached_settings
+
+    mal_year = request.args.get('year', type=int)
+    fmt = request.args.get('format', 'html')
+    if mal_year is None or fmt not in ('html', 'csv', 'ics'):
+        flash('Select a Malayalam year and an export format.', 'error')
+        return redirect(url_for('admin.almanac'))
+
+    min_year, max_year = _almanac_year_range()
+    if not min_year <= mal_year <= max_year:
+        flash(f'Malayalam year must be between {min_year} and {max_year}.', 'error')
+        return redirect(url_for('admin.almanac'))
+
+    settings, _ = get_cached_settings()
+    lat = settings.get('latitude', 10.85) if settings else 10.85
+    lon = settings.get('longitude', 76.27) if settings else 76.27
+    temple_name = (settings.get('name_eng') or settings.get('name_mal')) if settings else 'Temple'
+
+    try:
+        first, last = panchang.get_malayalam_year_span(mal_year)
+    except ValueError as e:
+        flash(str(e), 'error')
+        return redirect(url_for('admin.almanac'))
+
+    rows = panchang.iter_almanac(mal_year, lat, lon)
+
+    if fmt == 'html':
+        return Response(stream_template(
+            'admin/almanac_print.html', rows=rows, mal_year=mal_year,
+            first=first, last=last, temple_name=temple_name
+        ), mimetype='text/html')
+
+    if fmt == 'csv':
+        return Response(
+            stream_with_context(almanac_format.iter_csv(rows)),
+            mimetype="text/csv",
+            headers={"Content-disposition": f"attachment; filename=almanac_{mal_year}.csv"}
+        )
+
+    return Response(
+        stream_with_context(almanac_format.iter_ics(rows, f"{temple_name} {mal_year} ME")),
+        mimetype="text/calendar",
+        headers={"Content-disposition": f"attachment; filename=almanac_{mal_year}.ics"}
+    )
+
+@admin_bp.route('/panchang/metrics')
+def panchang_metrics():
+    from modules import panchang
+    return panchang.get_load_metrics()
+
+@admin_bp.route('/db/metrics')
+def db_metrics():
+    from database import pool_stats
+    return pool_stats()
+
 @admin_bp.route('/updates/status')
 def update_status():
     from modules import updater
@@ -114,11 +114,25 @@ def history():
     # But if they use the History page with "Pending" filter, they might expect global too.
     # Let's adjust: IF payment_status == 'pending', remove cashier_id constraint?
     
+    # Bills of closed financial years live in yearly archive files (modules/archive.py):
+    # a search looks through all of them, a day view only through the one holding
+    # that day, and pending bills are never archived
+    from modules import archive
     if request.args.get('payment_status') == 'pending':
-        sql = "SELECT b.*, u.username as receiver_name FROM bills b LEFT JOIN users u ON b.payment_received_by = u.id WHERE b.status != 'draft'"
+        schemas = archive.HOT
+    elif query:
+        schemas = archive.attach_for_range(db)
+    else:
+        import datetime
+        day = request.args.get('date') or datetime.date.today().isoformat()
+        schemas = archive.attach_for_range(db, day, day)
+    bills_from = archive.source(db, 'bills', schemas)
+
+    if request.args.get('payment_status') == 'pending':
+        sql = f"SELECT b.*, u.username as receiver_name FROM {bills_from} b LEFT JOIN users u ON b.payment_received_by = u.id WHERE b.status != 'draft'"
         params = []
     else:
-        sql = "SELECT b.*, u.username as receiver_name FROM bills b LEFT JOIN users u ON b.payment_received_by = u.id WHERE b.cashier_id = ? AND b.status != 'draft'"
+        sql = f"SELECT b.*, u.username as receiver_name FROM {bills_from} b LEFT JOIN users u ON b.payment_received_by = u.id WHERE b.cashier_id = ? AND b.status != 'draft'"
         params = [g.user['id']]
     
     # Date Filter Logic (Same as Admin Reports)
@@ -130,10 +144,11 @@ def history():
          params.append(payment_status_filter)
     
     if query:
-        # Search by Bill No or Devotee Name (Global Search)
-        sql += ' AND (b.bill_no LIKE ? OR b.devotee_name LIKE ?)'
-        wildcard = f'%{query}%'
-        params.extend([wildcard, wildcard])
+        # Search by Bill No, Devotee Name, Phone, Star or Item (Global Search, full-text index)
+        from modules import bill_search
+        search_condition, search_params = bill_search.condition(query, schemas=schemas)
+        sql += f' AND {search_condition}'
+        params.extend(search_params)
         
         # Explicitly clear date filter so UI shows we searched everywhere
         date_filter = ''
@@ -142,13 +157,13 @@ def history():
             # Skip date filter entirely to show all pending
             date_filter = ''
         elif date_filter:
-            sql += ' AND date(b.created_at) = ?'
+            sql += ' AND b.created_date = ?'
             params.append(date_filter)
         else:
             # Default to today
             import datetime
             today = datetime.date.today().isoformat()
-            sql += ' AND date(b.created_at) = ?'
+            sql += ' AND b.created_date = ?'
             params.append(today)
             date_filter = today
 
@@ -175,9 +190,9 @@ def history():
     for bill in bills:
         # Convert row to dict to add items
         b_dict = dict(bill)
-        b_dict['line_items'] = db.execute('''
+        b_dict['line_items'] = db.execute(f'''
             SELECT bi.*, pm.name 
-            FROM bill_items bi 
+            FROM {archive.table_for(bill, 'bill_items')} bi 
             JOIN puja_master pm ON bi.puja_id = pm.id 
             WHERE bi.bill_id = ?
         ''', (bill['id'],)).fetchall()
@@ -590,7 +605,13 @@ def checkout():
                     # 1. Get Latest Sequence (Inside loop to be fresh)
                     # We start a fresh transaction for this check implicitly if previous committed, 
                     # but strictly, 'execute' sees current DB state.
-                    last_seq_row = db.execute('SELECT MAX(bill_seq) FROM bills').fetchone()
+                    # Archived years keep their highest sequence in bill_archives
+                    last_seq_row = db.execute('''
+                        SELECT MAX(seq) FROM (
+                            SELECT MAX(bill_seq) AS seq FROM bills
+                            UNION ALL SELECT MAX(max_bill_seq) FROM bill_archives
+                        )
+                    ''').fetchone()
                     current_seq = last_seq_row[0] if last_seq_row and last_seq_row[0] is not None else 0
                     new_seq = current_seq + 1
                     
@@ -991,8 +1012,10 @@ def reprint_bill(bill_id):
         # Always use browser print for history reprint
         printer_name = 'WEB_BROWSER_PRINT'
         
-        # 2. Fetch Bill
-        bill_row = db.execute('SELECT * FROM bills WHERE id = ?', (bill_id,)).fetchone()
+        # 2. Fetch Bill (from its yearly archive when it has been moved there)
+        from modules import archive
+        schemas = archive.attach_for_bill(db, bill_id)
+        bill_row = db.execute(f"SELECT * FROM {archive.source(db, 'bills', schemas)} b WHERE b.id = ?", (bill_id,)).fetchone()
         if not bill_row:
             return {'status': 'error', 'message': 'Bill not found'}
         bill = dict(bill_row)
@@ -1001,9 +1024,9 @@ def reprint_bill(bill_id):
             return {'status': 'error', 'message': 'Cannot reprint a Cancelled Bill.'}
             
         # 3. Fetch Items
-        items = db.execute('''
+        items = db.execute(f'''
             SELECT bi.*, pm.name 
-            FROM bill_items bi 
+            FROM {archive.source(db, 'bill_items', schemas)} bi 
             JOIN puja_master pm ON bi.puja_id = pm.id 
             WHERE bi.bill_id = ?
         ''', (bill['id'],)).fetchall()
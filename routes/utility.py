@@ -5,10 +5,23 @@ utility_bp = Blueprint('utility', __name__, url_prefix='/utility')
 
 @utility_bp.route('/calendar')
 def calendar_view():
-    return render_template('utility/calendar.html', mal_months=MAL_MONTHS_ENG)
+    from modules.panchang import NAKSHATRAS_ENG, WEEKDAYS_ENG
+    return render_template('utility/calendar.html', mal_months=MAL_MONTHS_ENG,
+                           stars=NAKSHATRAS_ENG, weekdays=WEEKDAYS_ENG)
 
 from database import get_cached_settings
 
+def _range_error(*dates):
+    """
+    400 response for dates outside TABLE_START..TABLE_END, or None. That is the span
+    of de421 and of the precomputed tables; the trimmed de421_sun_moon.bsp is
+    shorter (1990-2050), but dates before it are served from the full de421.
+    """
+    from modules.panchang import TABLE_START, TABLE_END
+    if all(TABLE_START <= d <= TABLE_END for d in dates):
+        return None
+    return jsonify({'status': 'error', 'message': f'Dates must be between {TABLE_START} and {TABLE_END}'}), 400
+
 @utility_bp.route('/get-star')
 def get_star():
     date_str = request.args.get('date') # YYYY-MM-DD
@@ -22,6 +35,9 @@ def get_star():
         lon = settings.get('longitude', 76.27) if settings else 76.27
         
         date_obj = datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
+        error = _range_error(date_obj)
+        if error:
+            return error
         star = get_nakshatra(date_obj, lat, lon)
         mal_date = get_malayalam_date(date_obj, lat, lon)
         
@@ -40,15 +56,49 @@ def get_star():
         traceback.print_exc()
         return jsonify({'status': 'error', 'message': 'Internal Error'}), 500
 
+# Star searches up to INLINE_STAR_MONTHS run in the request; longer ones run as
+# background jobs, and anything beyond MAX_STAR_MONTHS is refused.
+INLINE_STAR_MONTHS = 6
+MAX_STAR_MONTHS = 36
+
+def _star_dates_payload(progress, star_name, s_date, count, months, lat, lon):
+    from modules.panchang import get_next_star_dates as gnsd
+    dates_list = gnsd(star_name, s_date, count=count, months=months, lat=lat, lon=lon, progress=progress)
+
+    detailed_dates = []
+    for d_str in dates_list:
+        d_obj = datetime.datetime.strptime(d_str, "%Y-%m-%d").date()
+        mal = get_malayalam_date(d_obj, lat, lon)
+        mal_str = f"{mal['day']} {mal['mal_month']} {mal['mal_year']}"
+        detailed_dates.append({
+            'date': d_str,
+            'mal_date': mal_str,
+            'star': {'eng': star_name}
+        })
+
+    return {
+        'status': 'success',
+        'star_name': star_name,
+        'dates': detailed_dates
+    }
+
 @utility_bp.route('/get-next-star-dates')
 def get_next_star_dates_route():
-    from modules.panchang import get_next_star_dates as gnsd
     star_name = request.args.get('star_name')
     start_date = request.args.get('start_date')
     
     if not star_name:
         return jsonify({'status': 'error', 'message': 'star_name is required'}), 400
-        
+
+    months = request.args.get('months')
+    if months:
+        try:
+            months = int(months)
+        except ValueError:
+            return jsonify({'status': 'error', 'message': 'months must be a number'}), 400
+        if not 1 <= months <= MAX_STAR_MONTHS:
+            return jsonify({'status': 'error', 'message': f'months must be between 1 and {MAX_STAR_MONTHS}'}), 400
+
     try:
         settings, _ = get_cached_settings()
         lat = settings.get('latitude', 10.85) if settings else 10.85
@@ -59,36 +109,53 @@ def get_next_star_dates_route():
              s_date = datetime.datetime.strptime(start_date, "%Y-%m-%d").date()
         else:
              s_date = datetime.date.today()
-             
-        months = request.args.get('months')
-        
+        error = _range_error(s_date)
+        if error:
+            return error
+
         count = 5 
         if months:
             count = 100 
-            
-        dates_list = gnsd(star_name, s_date, count=count, months=months, lat=lat, lon=lon)
-        
-        detailed_dates = []
-        for d_str in dates_list:
-            d_obj = datetime.datetime.strptime(d_str, "%Y-%m-%d").date()
-            mal = get_malayalam_date(d_obj, lat, lon)
-            mal_str = f"{mal['day']} {mal['mal_month']} {mal['mal_year']}"
-            detailed_dates.append({
-                'date': d_str,
-                'mal_date': mal_str,
-                'star': {'eng': star_name} 
-            })
 
-        return jsonify({
-            'status': 'success',
-            'star_name': star_name,
-            'dates': detailed_dates
-        })
+        if not months or months <= INLINE_STAR_MONTHS:
+            return jsonify(_star_dates_payload(None, star_name, s_date, count, months, lat, lon))
+
+        from modules import jobs
+        from modules.panchang import CACHE_VERSION, get_engine
+        key = f"star-dates:{star_name}:{s_date}:{months}:{float(lat):.2f}:{float(lon):.2f}:{CACHE_VERSION}-{get_engine()}"
+        cached = jobs.cached_result(key)
+        if cached:
+            return jsonify(cached)
+
+        try:
+            job_id = jobs.submit(key, _star_dates_payload, star_name, s_date, count, months, lat, lon)
+        except jobs.JobQueueFull as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 503
+        return jsonify({'status': 'pending', 'job_id': job_id, 'progress': 0}), 202
     except Exception as e:
         import traceback
         traceback.print_exc()
         return jsonify({'status': 'error', 'message': 'Internal Error'}), 500
 
+@utility_bp.route('/star-search/<job_id>')
+def star_search_status(job_id):
+    """Poll a background star search started by /get-next-star-dates."""
+    from modules import jobs
+    try:
+        job = jobs.get(job_id)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({'status': 'error', 'message': 'Internal Error'}), 500
+
+    if job is None:
+        return jsonify({'status': 'error', 'message': 'Unknown job'}), 404
+    if job['status'] == 'done':
+        return jsonify(job['result'])
+    if job['status'] == 'failed':
+        return jsonify({'status': 'error', 'message': 'Search failed'}), 500
+    return jsonify({'status': 'pending', 'job_id': job_id, 'progress': job['progress']})
+
 @utility_bp.route('/eng-to-mal')
 def eng_to_mal():
     date_str = request.args.get('date')
@@ -148,6 +215,93 @@ def mal_to_eng():
         traceback.print_exc()
         return jsonify({'status': 'error', 'message': 'Internal Error'}), 500
         
+@utility_bp.route('/month')
+def month_calendar():
+    """Whole-month calendar (Malayalam date, star, transitions) in one response."""
+    try:
+        today = datetime.date.today()
+        year = int(request.args.get('year', today.year))
+        month = int(request.args.get('month', today.month))
+        month_start = datetime.date(year, month, 1)
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'Invalid year or month'}), 400
+    error = _range_error(month_start)
+    if error:
+        return error
+
+    try:
+        settings, _ = get_cached_settings()
+        lat = settings.get('latitude', 10.85) if settings else 10.85
+        lon = settings.get('longitude', 76.27) if settings else 76.27
+
+        from modules.panchang import get_month_calendar
+        data = get_month_calendar(month_start, lat, lon)
+
+        response = jsonify({'status': 'success', 'latitude': lat, 'longitude': lon, **data})
+        # Results only depend on month and location; let the browser reuse them.
+        response.headers['Cache-Control'] = 'private, max-age=3600'
+        return response
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({'status': 'error', 'message': 'Internal Error'}), 500
+
+# Longest range a muhurtham search may cover (the rules are evaluated vectorized)
+MAX_MUHURTHAM_DAYS = 3 * 366
+
+def _name_list(param):
+    return [v.strip() for v in request.args.get(param, '').split(',') if v.strip()]
+
+@utility_bp.route('/muhurtham')
+def muhurtham_search():
+    """
+    Days matching combined rules, e.g.
+    ?stars=Rohini,Thiruvonam&exclude_months=Karkidakam&weekdays=Sunday&start_date=...&end_date=...
+    """
+    from modules.panchang import NAKSHATRAS_ENG, WEEKDAYS_ENG, find_muhurtham_days
+
+    try:
+        start_str = request.args.get('start_date')
+        start = datetime.datetime.strptime(start_str, "%Y-%m-%d").date() if start_str else datetime.date.today()
+        end_str = request.args.get('end_date')
+        end = datetime.datetime.strptime(end_str, "%Y-%m-%d").date() if end_str else start + datetime.timedelta(days=365)
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'Invalid date format'}), 400
+
+    days = (end - start).days + 1
+    if not 1 <= days <= MAX_MUHURTHAM_DAYS:
+        return jsonify({'status': 'error', 'message': f'Range must be between 1 and {MAX_MUHURTHAM_DAYS} days'}), 400
+    error = _range_error(start, end)
+    if error:
+        return error
+
+    stars = _name_list('stars')
+    exclude_months = _name_list('exclude_months')
+    weekday_names = _name_list('weekdays')
+    unknown = ([s for s in stars if s not in NAKSHATRAS_ENG] + [m for m in exclude_months if m not in MAL_MONTHS_ENG]
+               + [w for w in weekday_names if w not in WEEKDAYS_ENG])
+    if unknown:
+        return jsonify({'status': 'error', 'message': f"Unknown value(s): {', '.join(unknown)}"}), 400
+    weekdays = [WEEKDAYS_ENG.index(w) for w in weekday_names] or None
+
+    try:
+        settings, _ = get_cached_settings()
+        lat = settings.get('latitude', 10.85) if settings else 10.85
+        lon = settings.get('longitude', 76.27) if settings else 76.27
+
+        matches = find_muhurtham_days(start, days, stars, exclude_months, weekdays, lat, lon)
+        return jsonify({
+            'status': 'success',
+            'start_date': start.isoformat(),
+            'end_date': end.isoformat(),
+            'count': len(matches),
+            'days': matches
+        })
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({'status': 'error', 'message': 'Internal Error'}), 500
+
 @utility_bp.route('/panchangam')
 def panchangam_view():
     return render_template('utility/panchangam.html')
@@ -168,10 +322,11 @@ def get_panchangam_data_api():
         lat = settings.get('latitude', 10.85) if settings else 10.85
         lon = settings.get('longitude', 76.27) if settings else 76.27
         
-        from modules.panchang import get_nakshatra_timings
+        from modules.panchang import get_nakshatra_timings, get_panchanga
         data = get_nakshatra_timings(today, lat, lon)
         if data.get('status') == 'error':
              return jsonify({'status': 'error', 'message': 'Internal Error'}), 500
+        data['panchanga'] = get_panchanga(today, lat, lon)
         return jsonify(data)
     except Exception as e:
         import traceback
@@ -0,0 +1,36 @@
+import sys
+import os
+import time
+
+# Add root to sys.path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from database import migrate
+from modules import archive
+
+def run(db_path=None, year=None):
+    db_path = db_path or Config.DB_PATH
+    print("--- Archiving Closed Financial Years ---")
+    print(f"Database: {db_path}")
+    print(f"Archives: {archive.archive_dir(db_path)}")
+
+    # bill_archives is created by the schema migrations
+    migrate(db_path)
+
+    t0 = time.time()
+    if year is not None:
+        moved = {year: archive.archive_year(year, db_path)}
+    else:
+        moved = archive.archive_closed_years(db_path)
+    if not moved:
+        print("Nothing to archive.")
+    for fy, count in moved.items():
+        print(f"[+] {fy}-{(fy + 1) % 100:02d}: {count} bills -> {archive.archive_filename(fy)}")
+    print(f"Done in {time.time() - t0:.1f}s")
+
+if __name__ == "__main__":
+    # Optional: archive_bills.py [financial year, e.g. 2024 for 2024-25] [path to temple.db]
+    args = sys.argv[1:]
+    year = int(args.pop(0)) if args and args[0].isdigit() else None
+    run(args[0] if args else None, year)
@@ -0,0 +1,261 @@
+import sys
+import os
+import json
+import time
+import shutil
+import datetime
+import tempfile
+
+# Add root to sys.path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from modules import panchang, panchang_cache
+
+# Speed and accuracy regression check for the panchang module.
+#
+#   python scripts/benchmark_panchang.py            compare against the baseline
+#   python scripts/benchmark_panchang.py --record   (re)write the baseline
+#
+# Each public function is timed cold (in-process and disk caches emptied) and warm
+# (repeat call), for a single date and for a year of dates. Reference outputs are
+# checked on every run: star at sunrise and Malayalam date for every day of the
+# reference span, the reverse conversion, next star dates and star transition
+# instants (within TRANSITION_TOLERANCE_SECONDS). Runs offline: the skyfield engine
+# needs data/de421.bsp to be present; PANCHANG_ENGINE=analytic needs nothing.
+
+BASELINE_PATH = os.path.join(panchang.DATA_DIR, 'panchang_baseline.json')
+
+REF_START = datetime.date(2024, 1, 1)
+REF_DAYS = 731
+REF_MAL_YEARS = (1199, 1200, 1201)
+TIMINGS_DAYS = 60
+TRANSITION_TOLERANCE_SECONDS = 60
+
+BENCH_DATE = datetime.date(2025, 4, 14)
+BENCH_DAYS = 365
+WARM_REPEATS = 3
+# A timing fails when it is this much slower than the baseline...
+SLOWDOWN_FACTOR = 1.5
+# ...and slower by at least this much (sub-millisecond timings are mostly noise)
+SLOWDOWN_MIN_SECONDS = 0.005
+
+
+def _reset_caches():
+    """Empties every cache layer so the next call does the full computation."""
+    panchang.set_engine(panchang.get_engine())
+    panchang_cache.clear()
+
+
+def _dates(start, days):
+    return [start + datetime.timedelta(days=i) for i in range(days)]
+
+
+def _time(fn):
+    """Cold time of one call after a cache reset, then best of WARM_REPEATS warm calls."""
+    _reset_caches()
+    t0 = time.perf_counter()
+    fn()
+    cold = time.perf_counter() - t0
+
+    warm = None
+    for _ in range(WARM_REPEATS):
+        t0 = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - t0
+        warm = elapsed if warm is None else min(warm, elapsed)
+    return {'cold': round(cold, 5), 'warm': round(warm, 5)}
+
+
+def run_benchmarks():
+    year = _dates(BENCH_DATE, BENCH_DAYS)
+    mal_year = [panchang.get_malayalam_date(d) for d in year]
+
+    benches = {
+        'get_nakshatra_index[1 day]': lambda: panchang.get_nakshatra_index(BENCH_DATE),
+        'get_nakshatra_index[1 year]': lambda: [panchang.get_nakshatra_index(d) for d in year],
+        'get_malayalam_date[1 day]': lambda: panchang.get_malayalam_date(BENCH_DATE),
+        'get_malayalam_date[1 year]': lambda: [panchang.get_malayalam_date(d) for d in year],
+        'get_english_date[1 day]': lambda: panchang.get_english_date(
+            mal_year[0]['mal_year'], mal_year[0]['mal_month'], mal_year[0]['day']),
+        'get_english_date[1 year]': lambda: [
+            panchang.get_english_date(m['mal_year'], m['mal_month'], m['day']) for m in mal_year],
+        'get_next_star_dates[count 3]': lambda: panchang.get_next_star_dates('Rohini', BENCH_DATE, count=3),
+        'get_next_star_dates[12 months]': lambda: panchang.get_next_star_dates('Rohini', BENCH_DATE, months=12),
+        'get_nakshatra_timings[1 day]': lambda: panchang.get_nakshatra_timings(BENCH_DATE),
+        'get_nakshatra_timings[1 year]': lambda: [panchang.get_nakshatra_timings(d) for d in year],
+    }
+
+    results = {}
+    for name, fn in benches.items():
+        results[name] = _time(fn)
+        print(f"  {name:<34} cold {results[name]['cold']:9.4f}s   warm {results[name]['warm']:9.4f}s")
+    return results
+
+
+def _timing_instants(date_obj):
+    """(star name, end instant as Unix seconds or None) for each segment of the day."""
+    data = panchang.get_nakshatra_timings(date_obj)
+    if data.get('status') != 'success':
+        raise RuntimeError(f"get_nakshatra_timings failed for {date_obj}")
+    return [
+        [s['name'], s['end'].timestamp() if isinstance(s['end'], datetime.datetime) else None]
+        for s in data['timeline']
+    ]
+
+
+def reference_outputs():
+    _reset_caches()
+    days = _dates(REF_START, REF_DAYS)
+
+    english = {}
+    for mal_year in REF_MAL_YEARS:
+        for month in panchang.MAL_MONTHS_ENG:
+            d = panchang.get_english_date(mal_year, month, 1)
+            english[f"{mal_year} {month} 1"] = d.isoformat() if d else None
+
+    return {
+        'stars': [panchang.get_nakshatra_index(d) for d in days],
+        'mal_dates': [
+            f"{m['day']} {m['mal_month']} {m['mal_year']}" for m in (panchang.get_malayalam_date(d) for d in days)
+        ],
+        'english_dates': english,
+        'next_star_dates': {
+            star: panchang.get_next_star_dates(star, REF_START, count=3)
+            for star in panchang.NAKSHATRAS_ENG
+        },
+        'timings': {d.isoformat(): _timing_instants(d) for d in days[:TIMINGS_DAYS]}
+    }
+
+
+def check_reference(ref, expected):
+    """Returns a list of mismatch descriptions (empty when everything agrees)."""
+    problems = []
+    days = _dates(REF_START, REF_DAYS)
+
+    # The range API must agree with the per-day function as well as the baseline
+    range_stars = [int(i) for i in panchang.get_nakshatra_indices(REF_START, REF_DAYS)]
+    if range_stars != ref['stars']:
+        problems.append("get_nakshatra_indices disagrees with get_nakshatra_index")
+
+    for label, key in (('star', 'stars'), ('Malayalam date', 'mal_dates')):
+        for d, got, want in zip(days, ref[key], expected[key]):
+            if got != want:
+                problems.append(f"{label} {d}: got {got}, expected {want}")
+
+    for key, want in expected['english_dates'].items():
+        if ref['english_dates'].get(key) != want:
+            problems.append(f"English date of {key}: got {ref['english_dates'].get(key)}, expected {want}")
+
+    # Every Malayalam date must convert back to the day it came from
+    for d, mal in zip(days, ref['mal_dates']):
+        day, month, year = mal.split()
+        back = panchang.get_english_date(int(year), month, int(day))
+        if back != d:
+            problems.append(f"Round trip {d} -> {mal} -> {back}")
+
+    for star, want in expected['next_star_dates'].items():
+        if ref['next_star_dates'].get(star) != want:
+            problems.append(f"Next {star} dates: got {ref['next_star_dates'].get(star)}, expected {want}")
+
+    for day, want in expected['timings'].items():
+        got = ref['timings'].get(day, [])
+        if [s[0] for s in got] != [s[0] for s in want]:
+            problems.append(f"Timings {day}: stars {[s[0] for s in got]}, expected {[s[0] for s in want]}")
+            continue
+        for (name, t_got), (_, t_want) in zip(got, want):
+            if (t_got is None) != (t_want is None) or (t_got is not None and abs(t_got - t_want) > TRANSITION_TOLERANCE_SECONDS):
+                problems.append(f"Timings {day}: {name} ends {t_got}, expected {t_want}")
+
+    return problems
+
+
+def check_timings(results, expected):
+    problems = []
+    for name, timing in results.items():
+        base = expected.get(name)
+        if base is None:
+            continue
+        for phase in ('cold', 'warm'):
+            if timing[phase] > base[phase] * SLOWDOWN_FACTOR and timing[phase] - base[phase] > SLOWDOWN_MIN_SECONDS:
+                problems.append(f"{name} {phase}: {timing[phase]:.4f}s vs baseline {base[phase]:.4f}s")
+    return problems
+
+
+def main(record=False, baseline_path=BASELINE_PATH):
+    engine = panchang.get_engine()
+    print("--- Panchang Benchmark ---")
+    print(f"Engine: {engine}, cache version: {panchang._cache_version()}")
+
+    if engine == 'skyfield' and not os.path.exists(os.path.join(panchang.DATA_DIR, 'de421.bsp')):
+        print(f"[FAIL] {os.path.join(panchang.DATA_DIR, 'de421.bsp')} not found (the benchmark runs offline)")
+        return 2
+
+    # Private disk cache so cold runs really are cold and the live cache is untouched
+    cache_dir = tempfile.mkdtemp(prefix='panchang_bench_')
+    Config.PANCHANG_CACHE_PATH = os.path.join(cache_dir, 'panchang_cache.db')
+    try:
+        t0 = time.perf_counter()
+        panchang.warm_up()
+        load = round(time.perf_counter() - t0, 5)
+        print(f"\nLoad (ephemeris + tables): {load:.3f}s")
+
+        print("\n[Timings]")
+        timings = run_benchmarks()
+        timings['load'] = {'cold': load, 'warm': load}
+
+        print("\n[Reference outputs]")
+        ref = reference_outputs()
+    finally:
+        panchang_cache.close()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    baselines = {}
+    if os.path.exists(baseline_path):
+        with open(baseline_path, encoding='utf-8') as f:
+            baselines = json.load(f)
+
+    if record:
+        baselines[engine] = {
+            'recorded_at': datetime.datetime.now().isoformat(timespec='seconds'),
+            'cache_version': panchang._cache_version(),
+            'timings': timings,
+            'reference': ref
+        }
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump(baselines, f, indent=1, ensure_ascii=False)
+        print(f"[+] Baseline recorded -> {baseline_path}")
+        return 0
+
+    expected = baselines.get(engine)
+    if expected is None:
+        print(f"[FAIL] No baseline for engine '{engine}' in {baseline_path}; run with --record first")
+        return 2
+
+    accuracy = check_reference(ref, expected['reference'])
+    for problem in accuracy[:50]:
+        print(f"  {problem}")
+    if len(accuracy) > 50:
+        print(f"  ... {len(accuracy) - 50} more")
+    print(f"[{'PASS' if not accuracy else 'FAIL'}] {len(accuracy)} accuracy mismatch(es)")
+
+    print("\n[Speed vs baseline]")
+    for name, timing in timings.items():
+        base = expected['timings'].get(name)
+        if base:
+            print(f"  {name:<34} cold x{timing['cold'] / max(base['cold'], 1e-9):6.2f}   "
+                  f"warm x{timing['warm'] / max(base['warm'], 1e-9):6.2f}")
+    slow = check_timings(timings, expected['timings'])
+    for problem in slow:
+        print(f"  {problem}")
+    print(f"[{'PASS' if not slow else 'FAIL'}] {len(slow)} timing regression(s) (limit x{SLOWDOWN_FACTOR})")
+
+    return 1 if accuracy or slow else 0
+
+
+if __name__ == "__main__":
+    # Optional: --record, --baseline <path>
+    path = BASELINE_PATH
+    if '--baseline' in sys.argv:
+        path = sys.argv[sys.argv.index('--baseline') + 1]
+    sys.exit(main(record='--record' in sys.argv, baseline_path=path))
@@ -0,0 +1,37 @@
+import sys
+import os
+import time
+
+# Add root to sys.path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import panchang
+
+def build_tables(lat=panchang.DEFAULT_LAT, lon=panchang.DEFAULT_LON):
+    print("--- Building Panchang Tables ---")
+    print(f"Ayanamsa model: {panchang.AYANAMSA_MODEL}")
+    print(f"Span: {panchang.TABLE_START} to {panchang.TABLE_END}")
+
+    t0 = time.time()
+    path = panchang.build_nakshatra_table()
+    table = panchang._get_table('nakshatra_transitions')
+    print(f"[+] Nakshatra transitions: {len(table)} rows -> {path} ({time.time() - t0:.1f}s)")
+
+    t0 = time.time()
+    path = panchang.build_sankranti_table()
+    table = panchang._get_table('sankranti')
+    print(f"[+] Sankranti: {len(table)} rows -> {path} ({time.time() - t0:.1f}s)")
+
+    # Sunrise tables are per location; other years are built on first use.
+    this_year = time.localtime().tm_year
+    for year in (this_year, this_year + 1):
+        t0 = time.time()
+        path = panchang.build_sunrise_table(year, lat, lon)
+        print(f"[+] Sunrise {year} ({lat}, {lon}) -> {path} ({time.time() - t0:.1f}s)")
+
+if __name__ == "__main__":
+    # Optional: build_panchang_tables.py <latitude> <longitude>
+    if len(sys.argv) == 3:
+        build_tables(float(sys.argv[1]), float(sys.argv[2]))
+    else:
+        build_tables()
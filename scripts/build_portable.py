@@ -99,6 +99,20 @@ def build_portable():
         else:
             shutil.copy2(s, d)
             
+    # 6b. Ship the trimmed ephemeris only (tables are built from the full one first)
+    print("Trimming Ephemeris...")
+    data_dir = os.path.join(APP_DIR, "data")
+    full = os.path.join(data_dir, "de421.bsp")
+    if os.path.exists(full):
+        try:
+            subprocess.check_call([python_exe, os.path.join("scripts", "build_panchang_tables.py")], cwd=APP_DIR)
+            subprocess.check_call([python_exe, os.path.join("scripts", "trim_ephemeris.py")], cwd=APP_DIR)
+            os.remove(full)
+        except subprocess.CalledProcessError as e:
+            print(f"Ephemeris trimming failed, shipping the full de421.bsp: {e}")
+    else:
+        print("No data/de421.bsp to trim; it will be downloaded on first run.")
+
     # 7. Create Launcher
     print("Creating Launcher...")
     launcher_bat = os.path.join(DIST_DIR, "Devalaya_Start.bat")
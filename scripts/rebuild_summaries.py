@@ -0,0 +1,28 @@
+import sys
+import os
+import time
+
+# Add root to sys.path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from database import migrate
+from modules import rollups
+
+def rebuild(db_path=None):
+    db_path = db_path or Config.DB_PATH
+    print("--- Rebuilding Summary Tables ---")
+    print(f"Database: {db_path}")
+
+    # The summary tables are created by the schema migrations
+    migrate(db_path)
+
+    t0 = time.time()
+    counts = rollups.rebuild_all(db_path)
+    for table, count in counts.items():
+        print(f"[+] {table}: {count} rows")
+    print(f"Done in {time.time() - t0:.1f}s")
+
+if __name__ == "__main__":
+    # Optional: rebuild_summaries.py <path to temple.db>
+    rebuild(sys.argv[1] if len(sys.argv) == 2 else None)
@@ -0,0 +1,30 @@
+import sys
+import os
+import time
+
+# Add root to sys.path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import panchang
+
+def trim(start_year=panchang.TRIM_START_YEAR, end_year=panchang.TRIM_END_YEAR):
+    print("--- Trimming Ephemeris ---")
+    source = os.path.join(panchang.DATA_DIR, panchang.EPHEMERIS_FILE)
+    if not os.path.exists(source):
+        print(f"[-] {source} not found. Download it first (it is fetched on first start).")
+        return None
+
+    t0 = time.time()
+    path, start_jd, end_jd = panchang.trim_ephemeris(start_year, end_year, source)
+    start = panchang.datetime.date.fromordinal(int(start_jd - 1721424.5))
+    end = panchang.datetime.date.fromordinal(int(end_jd - 1721424.5))
+    print(f"Targets: {', '.join(str(t) for t in panchang.TRIMMED_EPHEMERIS_TARGETS)}  Span: {start} to {end}")
+    print(f"[+] {path}: {os.path.getsize(path) / 1e6:.1f} MB (from {os.path.getsize(source) / 1e6:.1f} MB) in {time.time() - t0:.1f}s")
+    return path
+
+if __name__ == "__main__":
+    # Optional: trim_ephemeris.py <start_year> <end_year>
+    if len(sys.argv) == 3:
+        trim(int(sys.argv[1]), int(sys.argv[2]))
+    else:
+        trim()
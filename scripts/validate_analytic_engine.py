@@ -0,0 +1,83 @@
+import sys
+import os
+import time
+import datetime
+import numpy as np
+
+# Add root to sys.path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import panchang
+
+# Compares the analytic engine with the Skyfield (de421) engine for every day in
+# the table span. Both engines are evaluated at the same instants, so only the
+# position theory is compared:
+#   - star at sunrise (nakshatra index)
+#   - solar month (rasi of the Sun at 6 AM IST)
+# Sunrise itself is compared for one year, since the Skyfield side needs the almanac.
+
+MAX_LISTED = 50
+
+def _positions(engine, unix):
+    panchang.set_engine(engine)
+    return panchang._nakshatra_positions(unix), panchang._rasi_positions(unix)
+
+def _report(label, dates, sky, ana, units_per_circle):
+    sky_idx = sky.astype(int)
+    ana_idx = ana.astype(int)
+    bad = np.flatnonzero(sky_idx != ana_idx)
+
+    diff_arcsec = ((ana - sky + units_per_circle / 2) % units_per_circle - units_per_circle / 2) * (360.0 / units_per_circle) * 3600
+    print(f"\n{label}: {len(bad)} disagreement(s) in {len(dates)} days")
+    print(f"  longitude difference: max {np.abs(diff_arcsec).max():.1f}\", mean {diff_arcsec.mean():.1f}\"")
+
+    for i in bad[:MAX_LISTED]:
+        # Distance of the Skyfield position from the nearest boundary
+        frac = sky[i] % 1
+        margin = min(frac, 1 - frac) * (360.0 / units_per_circle) * 3600
+        print(f"  {dates[i]}  skyfield={sky_idx[i]:2d}  analytic={ana_idx[i]:2d}  margin={margin:.1f}\"")
+    if len(bad) > MAX_LISTED:
+        print(f"  ... {len(bad) - MAX_LISTED} more")
+    return len(bad)
+
+def validate(start=panchang.TABLE_START, end=panchang.TABLE_END, lat=panchang.DEFAULT_LAT, lon=panchang.DEFAULT_LON):
+    print("--- Analytic Engine Validation ---")
+    print(f"Span: {start} to {end}, location ({lat}, {lon})")
+
+    days = (end - start).days + 1
+    dates = [start + datetime.timedelta(days=i) for i in range(days)]
+
+    panchang.set_engine('analytic')
+    sunrises = panchang._sunrise_unix(start, days, lat, lon)
+    six_am = panchang._date_to_unix(start) + 6 * 3600.0 + 86400.0 * np.arange(days)
+
+    t0 = time.time()
+    sky_nak, _ = _positions('skyfield', sunrises)
+    _, sky_rasi = _positions('skyfield', six_am)
+    print(f"Skyfield: {time.time() - t0:.1f}s")
+
+    t0 = time.time()
+    ana_nak, _ = _positions('analytic', sunrises)
+    _, ana_rasi = _positions('analytic', six_am)
+    print(f"Analytic: {time.time() - t0:.1f}s")
+
+    failures = _report("Star at sunrise", dates, sky_nak, ana_nak, 27)
+    failures += _report("Solar month at 6 AM", dates, sky_rasi, ana_rasi, 12)
+
+    # Sunrise: one year of almanac results against the analytic formula
+    year = datetime.date.today().year
+    year_days = (datetime.date(year + 1, 1, 1) - datetime.date(year, 1, 1)).days
+    panchang.set_engine('skyfield')
+    sky_rise, _ = panchang.get_sun_times(datetime.date(year, 1, 1), year_days, lat, lon)
+    panchang.set_engine('analytic')
+    ana_rise, _ = panchang.get_sun_times(datetime.date(year, 1, 1), year_days, lat, lon)
+    if np.isnan(sky_rise).all():
+        print(f"\nSunrise {year}: skipped (no Skyfield sunrise table)")
+    else:
+        diff = np.abs(ana_rise - sky_rise)
+        print(f"\nSunrise {year}: max difference {np.nanmax(diff):.1f}s, mean {np.nanmean(diff):.1f}s")
+
+    return failures
+
+if __name__ == "__main__":
+    validate()
@@ -0,0 +1,78 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# The app reads its paths and engine from the environment at import time: point
+# everything at a scratch directory and use the analytic engine, which needs no
+# ephemeris download.
+_scratch = tempfile.mkdtemp(prefix='devalaya-tests-')
+os.environ['DB_PATH'] = os.path.join(_scratch, 'temple.db')
+os.environ['PANCHANG_CACHE_PATH'] = os.path.join(_scratch, 'panchang_cache.db')
+os.environ['PANCHANG_ENGINE'] = 'analytic'
+os.environ['PANCHANG_WARMUP'] = '0'
+os.environ.pop('ARCHIVE_PATH', None)
+# The app writes logs/ and debug logs relative to the working directory
+os.chdir(_scratch)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """A migrated temple.db of its own for each test, used as Config.DB_PATH."""
+    from config import Config
+    from database import migrate
+
+    path = str(tmp_path / 'temple.db')
+    monkeypatch.setattr(Config, 'DB_PATH', path)
+    monkeypatch.setattr(Config, 'ARCHIVE_PATH', None)
+    migrate(path)
+    return path
+
+
+@pytest.fixture
+def conn(db_path):
+    import sqlite3
+
+    c = sqlite3.connect(db_path)
+    c.row_factory = sqlite3.Row
+    c.execute('PRAGMA foreign_keys=ON')
+    c.execute("INSERT INTO users (username, pin, role) VALUES ('cashier1', '1234', 'cashier')")
+    c.executemany("INSERT INTO puja_master (name, amount) VALUES (?, ?)",
+                  [('Pushpanjali', 10), ('Ganapathi Homam', 50), ('പായസം', 30)])
+    c.commit()
+    yield c
+    c.close()
+
+
+def add_bill(conn, created_at, items=((1, 1),), status='printed', payment_status='paid',
+             payment_date=None, devotee_name='Raman', star='Rohini', cashier_id=1,
+             scheduled_date=None, original_bill_id=None, phone=None):
+    """Inserts a bill with (puja_id, count) items priced from puja_master; returns its id."""
+    seq = (conn.execute('SELECT MAX(bill_seq) FROM bills').fetchone()[0] or 0) + 1
+    prices = {row[0]: row[1] for row in conn.execute('SELECT id, amount FROM puja_master')}
+    total = sum(prices[p] * n for p, n in items)
+    bill_id = conn.execute('''
+        INSERT INTO bills (bill_no, bill_seq, cashier_id, total_amount, devotee_name, star, phone,
+                           scheduled_date, status, created_at, original_bill_id, payment_status, payment_date)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (f"B-{created_at[:4]}-{seq}", seq, cashier_id, total, devotee_name, star, phone, scheduled_date,
+          status, created_at, original_bill_id, payment_status, payment_date)).lastrowid
+    for puja_id, count in items:
+        conn.execute('INSERT INTO bill_items (bill_id, puja_id, price_snapshot, count, total) VALUES (?, ?, ?, ?, ?)',
+                     (bill_id, puja_id, prices[puja_id], count, prices[puja_id] * count))
+    return bill_id
+
+
+@pytest.fixture
+def panchang_tables(tmp_path, monkeypatch):
+    """Precomputed panchang tables are built into and read from a scratch directory."""
+    from modules import panchang
+
+    table_dir = str(tmp_path / 'tables')
+    monkeypatch.setattr(panchang, '_table_dirs', lambda: [table_dir])
+    monkeypatch.setattr(panchang, '_tables', {})
+    monkeypatch.setattr(panchang, '_day_tables', {})
+    return table_dir
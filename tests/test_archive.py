@@ -0,0 +1,116 @@
+import datetime
+
+from conftest import add_bill
+from modules import archive, bill_search
+
+TODAY = datetime.date(2025, 6, 1)
+
+
+def _search(conn, text, schemas):
+    condition, params = bill_search.condition(text, schemas=schemas)
+    return conn.execute(f"SELECT b.* FROM {archive.source(conn, 'bills', schemas)} b WHERE {condition}", params).fetchall()
+
+
+def test_search_matches_each_bill_against_its_own_file(conn, db_path):
+    archived = add_bill(conn, '2023-05-10 09:00:00', devotee_name='Raman')
+    conn.commit()
+    assert archive.archive_year(2023, db_path, TODAY) == 1
+
+    # A bill in temple.db reusing the archived bill's id (e.g. after restoring an older backup)
+    conn.execute("DELETE FROM sqlite_sequence WHERE name = 'bills'")
+    assert add_bill(conn, '2025-05-10 09:00:00', devotee_name='Krishnan', items=((2, 1),)) == archived
+    conn.commit()
+
+    schemas = archive.attach_for_range(conn)
+    assert schemas == ['main', 'archive_2023']
+    found = lambda text: [(r['id'], r['devotee_name'], r['src']) for r in _search(conn, text, schemas)]
+    assert found('Raman') == [(archived, 'Raman', 'archive_2023')]
+    assert found('Krishnan') == [(archived, 'Krishnan', 'main')]
+
+    rows = conn.execute(f"SELECT * FROM {archive.source(conn, 'bills', schemas)} b ORDER BY b.src").fetchall()
+    items = {row['src']: conn.execute(f"SELECT puja_id FROM {archive.table_for(row, 'bill_items')} WHERE bill_id = ?",
+                                      (row['id'],)).fetchall() for row in rows}
+    assert {src: [r[0] for r in found] for src, found in items.items()} == {'archive_2023': [1], 'main': [2]}
+
+
+def _snapshot(conn, schemas, start='2000-01-01', end='2099-12-31'):
+    """What the reports read: bills, their items, the summaries and a search, over schemas."""
+    bills = conn.execute(f"SELECT * FROM {archive.source(conn, 'bills', schemas)} b WHERE b.effective_date BETWEEN ? AND ?",
+                         (start, end)).fetchall()
+    columns = [c for c in bills[0].keys() if c != 'src'] if bills else []
+    items = sorted(tuple(r) for bill in bills for r in conn.execute(
+        f"SELECT puja_id, count, total FROM {archive.table_for(bill, 'bill_items')} WHERE bill_id = ?", (bill['id'],)))
+    daily = conn.execute(f'''
+        SELECT effective_date, payment_status, status, SUM(bill_count), SUM(total_amount)
+        FROM {archive.source(conn, 'bill_daily_summary', schemas)} WHERE effective_date BETWEEN ? AND ?
+        GROUP BY 1, 2, 3 ORDER BY 1, 2, 3
+    ''', (start, end)).fetchall()
+    item_totals = conn.execute(f'''
+        SELECT puja_id, SUM(item_count), SUM(total_amount)
+        FROM {archive.source(conn, 'item_daily_summary', schemas)} WHERE bill_date BETWEEN ? AND ?
+        GROUP BY 1 ORDER BY 1
+    ''', (start, end)).fetchall()
+    return {
+        'bills': sorted(tuple(bill[c] for c in columns) for bill in bills),
+        'items': items,
+        'daily': [tuple(r) for r in daily],
+        'item_totals': [tuple(r) for r in item_totals],
+        'search': sorted(r['id'] for r in _search(conn, 'Raman', schemas) if start <= r['effective_date'] <= end),
+    }
+
+
+def test_archive_round_trip(conn, db_path):
+    # FY 2023-24 and FY 2024-25 are closed on TODAY; FY 2025-26 is open
+    for created_at in ('2023-04-01 06:00:00', '2023-12-31 20:00:00', '2024-03-31 23:30:00', '2024-04-01 07:00:00',
+                       '2025-03-15 10:00:00', '2025-04-02 09:00:00'):
+        add_bill(conn, created_at, items=((1, 2), (3, 1)))
+    pending = add_bill(conn, '2023-06-01 09:00:00', payment_status='pending', devotee_name='Raman Pending')
+    corrected = add_bill(conn, '2023-07-01 09:00:00', status='cancelled')
+    add_bill(conn, '2025-05-01 09:00:00', original_bill_id=corrected, devotee_name='Raman Correction')
+    conn.commit()
+    before = _snapshot(conn, archive.HOT)
+
+    assert archive.closed_years(conn, TODAY) == [2023, 2024]
+    assert archive.archive_closed_years(db_path, TODAY) == {2023: 3, 2024: 2}
+    # Pending bills and bills a correction points at stay in temple.db
+    assert sorted(r[0] for r in conn.execute("SELECT id FROM bills")) == sorted([pending, corrected, 6, 9])
+
+    schemas = archive.attach_for_range(conn)
+    assert schemas == ['main', 'archive_2024', 'archive_2023']
+    assert _snapshot(conn, schemas) == before
+    # A date range only attaches the archives it reaches, and reads the same
+    assert archive.attach_for_range(conn, '2024-01-01', '2024-03-31') == ['main', 'archive_2023']
+    assert _snapshot(conn, schemas, '2024-01-01', '2024-03-31') == _snapshot(conn, ['main', 'archive_2023'], '2024-01-01', '2024-03-31')
+
+    # Rerunning moves nothing and leaves no duplicates
+    assert archive.archive_closed_years(db_path, TODAY) == {}
+    assert archive.archive_year(2023, db_path, TODAY) == 0
+    assert _snapshot(conn, archive.attach_for_range(conn)) == before
+
+    archives = {row['fiscal_year']: row for row in archive.list_archives(conn)}
+    assert (archives[2023]['bill_count'], archives[2024]['bill_count']) == (3, 2)
+    assert (archives[2023]['first_date'], archives[2023]['last_date']) == ('2023-04-01', '2024-03-31')
+
+
+def test_bill_numbers_continue_after_archiving_the_latest_bills(conn, db_path, monkeypatch):
+    from app import app
+    from modules.printers import printer_manager
+
+    monkeypatch.setattr(printer_manager, 'print_text', lambda printer_name, text: True)
+    for created_at in ('2023-05-01 09:00:00', '2024-02-01 09:00:00'):
+        add_bill(conn, created_at)
+    conn.execute("INSERT INTO printers (name) VALUES ('Test Printer')")
+    conn.execute("INSERT INTO cashier_sessions (cashier_id, printer_id) VALUES (2, 1)")
+    conn.commit()
+    archive.archive_year(2023, db_path, TODAY)
+    assert conn.execute("SELECT COUNT(*) FROM bills").fetchone()[0] == 0
+    assert conn.execute("SELECT max_bill_seq FROM bill_archives").fetchone()[0] == 2
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = 2
+        session['role'] = 'cashier'
+        session['cart'] = {'mode': 'vazhipadu', 'devotee_name': 'Raman', 'star': 'Rohini', 'scheduled_date': '',
+                           'total': 10, 'items': [{'id': 1, 'name': 'Pushpanjali', 'amount': 10, 'count': 1, 'total': 10}]}
+    client.post('/cashier/billing/checkout', json={})
+    assert [tuple(r) for r in conn.execute("SELECT bill_seq, devotee_name FROM bills")] == [(3, 'Raman')]
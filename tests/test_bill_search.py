@@ -0,0 +1,58 @@
+import pytest
+
+from conftest import add_bill
+from modules import bill_search
+
+
+@pytest.fixture
+def bills(conn):
+    add_bill(conn, '2025-03-01 09:00:00', devotee_name='Raman Nair', star='Rohini', phone='9847012345')
+    add_bill(conn, '2025-03-01 10:00:00', devotee_name='Ramakrishnan', items=((2, 1),), star='Thiruvathira')
+    add_bill(conn, '2025-03-02 09:00:00', devotee_name='കൃഷ്ണൻ നമ്പൂതിരി', items=((3, 2), (1, 1)), star='Rohini')
+    for i in range(7):
+        add_bill(conn, f'2025-03-0{3 + i % 5} 08:00:00', devotee_name=f'Devotee {i}', items=((1 + i % 3, 1),), star=None)
+    conn.commit()
+
+
+def _search(conn, text):
+    condition, params = bill_search.condition(text)
+    return sorted(row[0] for row in conn.execute(f"SELECT b.id FROM bills b WHERE {condition}", params))
+
+
+def _like(conn, text):
+    """The search before the index: substring match on bill no, devotee and item names."""
+    wildcard = f'%{text}%'
+    return sorted(row[0] for row in conn.execute('''
+        SELECT b.id FROM bills b
+        WHERE b.bill_no LIKE ? OR b.devotee_name LIKE ? OR EXISTS (
+            SELECT 1 FROM bill_items bi JOIN puja_master pm ON bi.puja_id = pm.id
+            WHERE bi.bill_id = b.id AND pm.name LIKE ?)
+    ''', (wildcard, wildcard, wildcard)))
+
+
+@pytest.mark.parametrize('text', ['Raman', 'ram', 'Ramakrishnan', 'B-2025-1', 'B-2025-10', 'pushpanjali', 'Ganapathi Homam',
+                                  'Devotee', 'കൃഷ്ണൻ', 'നമ്പൂ', 'പായസം', 'പായ', 'nobody'])
+def test_index_finds_what_like_found(conn, bills, text):
+    # Every word of the query matching a word start: the same bills as the substring search
+    assert _search(conn, text) == _like(conn, text)
+
+
+def test_index_adds_star_and_phone(conn, bills):
+    assert _search(conn, 'Rohini') == _search(conn, 'രോഹിണി') == [1, 3]
+    assert _search(conn, '98470') == [1]
+    assert _search(conn, 'raman rohini') == [1]
+    assert _search(conn, '  "" ') == []
+
+
+def test_index_follows_edits(conn, bills):
+    conn.execute("UPDATE bills SET devotee_name = 'Sankaran' WHERE id = 1")
+    conn.execute("UPDATE puja_master SET name = 'Neyyabhishekam' WHERE id = 2")
+    conn.execute("INSERT INTO bill_items (bill_id, puja_id, price_snapshot, count, total) VALUES (3, 2, 50, 1, 50)")
+    conn.execute("DELETE FROM bill_items WHERE bill_id = 3 AND puja_id = 3")
+    conn.execute("DELETE FROM bill_items WHERE bill_id = 4")
+    conn.execute("DELETE FROM bills WHERE id = 4")
+    conn.commit()
+
+    for text in ('Sankaran', 'Raman', 'Neyyabhishekam', 'Ganapathi', 'പായസം', 'Devotee'):
+        assert _search(conn, text) == _like(conn, text), text
+    assert 3 in _search(conn, 'Neyyabhishekam') and 4 not in _search(conn, 'Devotee')
@@ -0,0 +1,44 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from modules import panchang
+
+skyfield_data = os.path.join(os.path.dirname(pytest.importorskip('skyfield').__file__), 'tests', 'data')
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """
+    A data folder where a short excerpt (Mar 2015) stands in for the trimmed kernel
+    and another (Jul-Aug 1969) for the full de421, both shipped with Skyfield's tests.
+    """
+    shutil.copy(os.path.join(skyfield_data, 'de430-2015-03-02.bsp'), tmp_path / panchang.TRIMMED_EPHEMERIS_FILE)
+    shutil.copy(os.path.join(skyfield_data, 'de441-1969.bsp'), tmp_path / panchang.EPHEMERIS_FILE)
+    monkeypatch.setattr(panchang, '_skyfield_data_dir', lambda: str(tmp_path))
+    for name in ('_ts', '_eph', '_eph_span', '_eph_full'):
+        monkeypatch.setattr(panchang, name, None)
+    monkeypatch.setattr(panchang, 'LOAD_METRICS', dict(panchang.LOAD_METRICS))
+    return tmp_path
+
+
+def test_trimmed_kernel_is_used_inside_its_span(data_dir):
+    ts, eph = panchang._get_skyfield_data()
+    assert panchang.LOAD_METRICS['ephemeris_file'] == panchang.TRIMMED_EPHEMERIS_FILE
+    assert panchang._ephemeris_for(ts.utc(2015, 3, 3, range(0, 24, 6))) is eph
+    assert panchang._eph_full is None
+
+
+def test_full_kernel_is_used_outside_it(data_dir):
+    ts, eph = panchang._get_skyfield_data()
+    times = ts.utc(1969, 7, 31, range(0, 24, 6))
+    full = panchang._ephemeris_for(times)
+    assert full is not eph
+
+    # Any instant outside the trimmed span sends the whole array to the full kernel
+    mixed = ts.utc([1969, 2015], [7, 3], [31, 3])
+    assert panchang._ephemeris_for(mixed) is full
+    lons = panchang.get_sun_longitudes(times)
+    assert np.all((lons > 125) & (lons < 130))
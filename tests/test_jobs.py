@@ -0,0 +1,65 @@
+import sqlite3
+import time
+
+import pytest
+
+from modules import jobs
+
+
+@pytest.fixture(autouse=True)
+def cache_path(tmp_path, monkeypatch):
+    from config import Config
+    monkeypatch.setattr(Config, 'PANCHANG_CACHE_PATH', str(tmp_path / 'cache.db'))
+    monkeypatch.setattr(jobs, '_queued', 0)
+
+
+def _wait(job_id):
+    for _ in range(200):
+        job = jobs.get(job_id)
+        if job['status'] in ('done', 'failed'):
+            return job
+        time.sleep(0.01)
+    raise AssertionError('job did not finish')
+
+
+def test_job_runs_and_result_is_reused():
+    job_id = jobs.submit('k', lambda progress, x: x * 2, 21)
+    assert _wait(job_id)['result'] == 42
+    assert jobs.cached_result('k') == 42
+    assert jobs._queued == 0 and job_id not in jobs._owned
+
+
+def test_swept_job_is_not_started():
+    job_id = jobs.submit('k', lambda progress: 1)
+    _wait(job_id)
+    conn = jobs._connect()
+    conn.execute("UPDATE jobs SET status='failed', error='Interrupted' WHERE id=?", (job_id,))
+    conn.commit()
+    conn.close()
+
+    calls = []
+    jobs._run(job_id, lambda progress: calls.append(1), ())
+    assert calls == []
+    assert jobs.get(job_id)['status'] == 'failed'
+
+
+def test_failed_insert_releases_queue_slot(monkeypatch):
+    real_connect = jobs._connect
+
+    class LockedConnection:
+        def __init__(self):
+            self._conn = real_connect()
+
+        def execute(self, sql, *args):
+            if sql.lstrip().startswith('INSERT'):
+                raise sqlite3.OperationalError('database is locked')
+            return self._conn.execute(sql, *args)
+
+        def __getattr__(self, name):
+            return getattr(self._conn, name)
+
+    monkeypatch.setattr(jobs, '_connect', LockedConnection)
+    for _ in range(jobs.MAX_QUEUED + 1):
+        with pytest.raises(sqlite3.OperationalError):
+            jobs.submit('k', lambda progress: 1)
+    assert jobs._queued == 0
@@ -0,0 +1,90 @@
+import sqlite3
+
+import pytest
+
+import database
+
+
+def test_migrate_refuses_old_sqlite(tmp_path, monkeypatch):
+    monkeypatch.setattr(sqlite3, 'sqlite_version_info', (3, 31, 1))
+    with pytest.raises(RuntimeError, match='3.33.0'):
+        database.migrate(str(tmp_path / 'temple.db'))
+    assert not (tmp_path / 'temple.db').exists()
+
+
+def _legacy_db(path):
+    """A temple.db from before versioned migrations: older columns, no schema_version."""
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE temple_settings (id INTEGER PRIMARY KEY DEFAULT 1, name_mal TEXT NOT NULL, name_eng TEXT,
+                                      place TEXT, receipt_footer TEXT, backup_enabled INTEGER DEFAULT 0);
+        INSERT INTO temple_settings (id, name_mal, name_eng) VALUES (1, 'ക്ഷേത്രം', 'Temple');
+        CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT UNIQUE NOT NULL, pin TEXT,
+                            role TEXT NOT NULL CHECK(role IN ('admin', 'cashier')), is_active INTEGER DEFAULT 1);
+        INSERT INTO users (username, pin, role) VALUES ('admin', '9999', 'admin');
+        CREATE TABLE puja_master (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, amount REAL NOT NULL,
+                                  type TEXT DEFAULT 'puja', is_active INTEGER DEFAULT 1);
+        INSERT INTO puja_master (name, amount) VALUES ('Pushpanjali', 10);
+        CREATE TABLE bills (id INTEGER PRIMARY KEY AUTOINCREMENT, bill_no TEXT UNIQUE, created_at TIMESTAMP,
+                            cashier_id INTEGER, printer_id INTEGER, total_amount REAL NOT NULL, devotee_name TEXT,
+                            star TEXT, type TEXT DEFAULT 'vazhipadu', status TEXT DEFAULT 'printed');
+        INSERT INTO bills (bill_no, created_at, cashier_id, total_amount, devotee_name, star)
+        VALUES ('B-1', '2024-01-05 10:15:00', 1, 20, 'Raman', 'Rohini');
+        CREATE TABLE bill_items (id INTEGER PRIMARY KEY AUTOINCREMENT, bill_id INTEGER NOT NULL, puja_id INTEGER NOT NULL,
+                                 price_snapshot REAL NOT NULL, count INTEGER DEFAULT 1, total REAL NOT NULL);
+        INSERT INTO bill_items (bill_id, puja_id, price_snapshot, count, total) VALUES (1, 1, 10, 2, 20);
+    ''')
+    conn.commit()
+    conn.close()
+
+
+def test_legacy_database_is_brought_up_to_date(tmp_path):
+    path = str(tmp_path / 'temple.db')
+    _legacy_db(path)
+
+    applied = database.migrate(path)
+    assert [v for v, _ in applied] == [v for v, _, _ in database.MIGRATIONS]
+    assert database.schema_status(path) == (database.MIGRATIONS[-1][0],) * 2
+    assert database.migrate(path) == []
+
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    bill = conn.execute("SELECT * FROM bills").fetchone()
+    assert (bill['bill_no'], bill['payment_status'], bill['created_date'], bill['effective_date']) == \
+        ('B-1', 'paid', '2024-01-05', '2024-01-05')
+    assert conn.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 1
+    settings = conn.execute("SELECT * FROM temple_settings").fetchone()
+    assert settings['name_mal'] == 'ക്ഷേത്രം' and settings['print_template_version'] == database.PRINT_TEMPLATE_VERSION
+    # Summaries and the search index are filled from the bills already there
+    assert tuple(conn.execute("SELECT SUM(bill_count), SUM(total_amount) FROM bill_daily_summary").fetchone()) == (1, 20)
+    assert tuple(conn.execute("SELECT item_count, total_amount FROM item_daily_summary").fetchone()) == (2, 20)
+    assert [tuple(r) for r in conn.execute("SELECT rowid FROM bill_search WHERE bill_search MATCH 'Pushpanjali'")] == [(1,)]
+    conn.close()
+
+
+def test_pending_migrations_resume_from_recorded_version(tmp_path):
+    path = str(tmp_path / 'temple.db')
+    database.migrate(path)
+    conn = sqlite3.connect(path)
+    conn.execute("DROP TABLE bill_archives")
+    conn.execute("DELETE FROM schema_version WHERE version = ?", (database.MIGRATIONS[-1][0],))
+    conn.commit()
+    conn.close()
+
+    assert database.migrate(path) == [database.MIGRATIONS[-1][:2]]
+    assert database.migrate(path) == []
+
+
+def test_failed_migration_leaves_database_unchanged(tmp_path, monkeypatch):
+    path = str(tmp_path / 'temple.db')
+    _legacy_db(path)
+
+    def broken(c):
+        raise sqlite3.OperationalError('boom')
+    monkeypatch.setattr(database, 'MIGRATIONS', database.MIGRATIONS[:3] + [(4, 'broken', broken)])
+    with pytest.raises(sqlite3.OperationalError):
+        database.migrate(path)
+    assert database.schema_status(path)[0] == 0
+    conn = sqlite3.connect(path)
+    assert 'subtitle_mal' not in [row[1] for row in conn.execute("PRAGMA table_info(temple_settings)")]
+    conn.close()
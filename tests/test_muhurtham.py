@@ -0,0 +1,49 @@
+import datetime
+
+import numpy as np
+
+from modules import panchang
+
+
+def _unix(text):
+    return datetime.datetime.strptime(text, '%Y-%m-%d %H:%M:%S').replace(tzinfo=panchang.IST).timestamp()
+
+
+def test_windows_bracket_sunrise_across_table_end():
+    # The window lookup leaves the precomputed span here and falls back to the ephemeris
+    start = panchang.TABLE_END - datetime.timedelta(days=5)
+    days = panchang.find_muhurtham_days(start, 10)
+    assert len(days) == 10
+
+    sunrises = panchang._sunrise_unix(start, 10)
+    for day, sunrise in zip(days, sunrises):
+        assert _unix(day['star_start']) <= sunrise < _unix(day['star_end']) + 1
+
+
+def test_window_left_out_when_transitions_do_not_bracket(monkeypatch):
+    start = datetime.date(2030, 1, 1)
+    sunrises = panchang._sunrise_unix(start, 3)
+
+    # A short slice, as returned at the edge of a table: nothing before the first
+    # sunrise and nothing after the last
+    monkeypatch.setattr(panchang, '_nakshatra_transition_times',
+                        lambda lo, hi: np.array([sunrises[1] - 3600.0, sunrises[1] + 3600.0]))
+    days = panchang.find_muhurtham_days(start, 3)
+    assert [d['star_start'] is None for d in days] == [True, False, True]
+    assert [d['star_end'] is None for d in days] == [True, False, True]
+
+    monkeypatch.setattr(panchang, '_nakshatra_transition_times', lambda lo, hi: np.zeros(0))
+    days = panchang.find_muhurtham_days(start, 3)
+    assert len(days) == 3
+    assert all(d['star_start'] is None and d['star_end'] is None for d in days)
+
+
+def test_route_rejects_dates_outside_ephemeris_range(db_path):
+    from app import app
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = 1
+    response = client.get('/utility/muhurtham?start_date=1899-12-01&end_date=1900-01-31')
+    assert response.status_code == 400
+    assert '1900-01-01' in response.get_json()['message']
@@ -0,0 +1,123 @@
+import datetime
+
+import numpy as np
+import pytest
+
+from modules import panchang
+
+START = datetime.date(2031, 3, 1)
+DAYS = 90
+
+
+def _days(start, days):
+    return [start + datetime.timedelta(days=i) for i in range(days)]
+
+
+def _star_at_sunrise(date_obj):
+    """One evaluation per day, as before the range API."""
+    sunrise = panchang._sunrise_unix(date_obj, 1)
+    return int(panchang._nakshatra_positions(sunrise)[0]) % 27
+
+
+# --- Range API (get_nakshatra_indices) ---
+
+def test_range_matches_day_by_day(panchang_tables):
+    indices = panchang.get_nakshatra_indices(START, DAYS)
+    assert list(indices) == [_star_at_sunrise(d) for d in _days(START, DAYS)]
+    assert len(panchang.get_nakshatra_indices(START, 0)) == 0
+
+
+@pytest.mark.parametrize('star', [panchang.NAKSHATRAS_ENG[i] for i in (0, 3, 21)])
+def test_next_star_dates_match_a_daily_scan(panchang_tables, star):
+    target = panchang.NAKSHATRAS_ENG.index(star)
+    expected, skip_until = [], None
+    for d in _days(START, DAYS):
+        # A star holding two sunrises in a row counts once
+        if _star_at_sunrise(d) == target and (skip_until is None or d >= skip_until):
+            expected.append(d.isoformat())
+            skip_until = d + datetime.timedelta(days=25)
+    assert panchang.get_next_star_dates(star, START, count=len(expected)) == expected
+
+
+# --- Nakshatra transition table ---
+
+@pytest.fixture
+def nakshatra_table(panchang_tables):
+    panchang.build_nakshatra_table(START - datetime.timedelta(days=10), START + datetime.timedelta(days=DAYS + 10))
+    return panchang._get_nakshatra_table()
+
+
+def test_table_holds_every_transition_once(nakshatra_table):
+    assert np.all(np.diff(nakshatra_table['t']) > 0)
+    assert np.all(np.diff(nakshatra_table['index'].astype(int)) % 27 == 1)
+
+
+def test_table_lookup_matches_ephemeris(nakshatra_table):
+    sunrises = panchang._sunrise_unix(START, DAYS)
+    assert list(panchang._lookup_nakshatra_indices(sunrises)) == [_star_at_sunrise(d) for d in _days(START, DAYS)]
+    # Outside the table the callers fall back to the ephemeris
+    assert panchang._lookup_nakshatra_indices(sunrises + 365 * 86400.0) is None
+
+
+def test_table_transitions_match_ephemeris(nakshatra_table):
+    start = datetime.datetime.combine(START, datetime.time()).replace(tzinfo=panchang.IST)
+    end = start + datetime.timedelta(days=30)
+    table = panchang._table_transitions(start, end)
+    found = panchang._find_nakshatra_times(start, end, panchang.DEFAULT_LAT, panchang.DEFAULT_LON)
+    assert [(t['nakshatra'], t['next_nakshatra']) for t in table] == [(t['nakshatra'], t['next_nakshatra']) for t in found]
+    assert all(abs((a['end_time'] - b['end_time']).total_seconds()) <= 2 for a, b in zip(table, found))
+
+
+def test_timings_are_the_same_with_and_without_table(panchang_tables):
+    days = _days(START, 5)
+    without = [panchang.get_nakshatra_timings(d)['timeline'] for d in days]
+    panchang.build_nakshatra_table(START - datetime.timedelta(days=5), START + datetime.timedelta(days=10))
+    with_table = [panchang.get_nakshatra_timings(d)['timeline'] for d in days]
+
+    for a, b in zip(without, with_table):
+        assert [s['name'] for s in a] == [s['name'] for s in b]
+        assert all(abs((x['end'] - y['end']).total_seconds()) <= 2 for x, y in zip(a, b))
+        # Consecutive segments of a day meet
+        assert all(s['end'] == n['start'] for s, n in zip(b, b[1:]))
+
+
+# --- Malayalam dates (sankranti table) ---
+
+def _scanned_malayalam_dates(start, days):
+    """The earlier method: the rasi at 6 AM IST each day, counting back the days it has held."""
+    first = start - datetime.timedelta(days=400)
+    span = _days(first, (start - first).days + days)
+    six_am = np.array([datetime.datetime.combine(d, datetime.time(6)).replace(tzinfo=panchang.IST).timestamp() for d in span])
+    rasis = np.floor(panchang._rasi_positions(six_am)).astype(int) % 12
+
+    results = []
+    for i in range(len(span) - days, len(span)):
+        day_one = i
+        while rasis[day_one - 1] == rasis[i]:
+            day_one -= 1
+        chingam_one = max(j for j in range(1, i + 1) if rasis[j] == panchang.CHINGAM_RASI and rasis[j - 1] != rasis[j])
+        month = panchang._mal_month_index(rasis[i])
+        results.append({
+            'day': i - day_one + 1,
+            'mal_month': panchang.MAL_MONTHS_ENG[month],
+            'mal_month_mal': panchang.MAL_MONTHS_MAL[month],
+            'mal_year': span[chingam_one].year - 824,
+            'eng_date': span[i].isoformat()
+        })
+    return results
+
+
+@pytest.mark.parametrize('with_table', [False, True])
+def test_malayalam_dates_match_daily_scan(panchang_tables, with_table):
+    start, days = datetime.date(2030, 7, 1), 400
+    if with_table:
+        panchang.build_sankranti_table(datetime.date(2029, 1, 1), datetime.date(2032, 1, 1))
+    assert panchang.get_malayalam_dates(start, days) == _scanned_malayalam_dates(start, days)
+
+
+def test_english_date_reverses_malayalam_date(panchang_tables):
+    panchang.build_sankranti_table(datetime.date(2029, 1, 1), datetime.date(2033, 1, 1))
+    for mal in panchang.get_malayalam_dates(datetime.date(2030, 8, 1), 400):
+        eng = panchang.get_english_date(mal['mal_year'], mal['mal_month'], mal['day'])
+        assert eng.isoformat() == mal['eng_date']
+    assert panchang.get_english_date(1206, 'Chingam', 33) is None
@@ -0,0 +1,112 @@
+import pytest
+
+from conftest import add_bill
+from modules import rollups
+
+
+def _rows(conn, table):
+    return sorted(tuple(row) for row in conn.execute(f"SELECT * FROM {table}"))
+
+
+def assert_matches_rebuild(conn, tables):
+    kept = {table: _rows(conn, table) for table in tables}
+    conn.execute("SAVEPOINT rebuild")
+    rollups.rebuild(conn, tables)
+    rebuilt = {table: _rows(conn, table) for table in tables}
+    conn.execute("ROLLBACK TO rebuild")
+    conn.execute("RELEASE rebuild")
+    assert kept == rebuilt
+
+
+@pytest.fixture
+def bills(conn):
+    """A mix of days, hours, cashiers and payment states, edited the ways the app edits bills."""
+    ids = [
+        add_bill(conn, '2025-03-01 06:30:00', items=((1, 2),)),
+        add_bill(conn, '2025-03-01 18:05:00', items=((1, 1), (2, 1)), cashier_id=2),
+        add_bill(conn, '2025-03-02 09:00:00', items=((3, 4),), payment_status='pending'),
+        add_bill(conn, '2025-03-02 23:59:59', items=((2, 2),), scheduled_date='2025-03-10'),
+        add_bill(conn, '2025-03-03 11:00:00', items=((1, 1),), status='draft'),
+    ]
+    conn.commit()
+    return ids
+
+
+BILL_TABLES = ['bill_daily_summary', 'bill_hourly_summary']
+
+
+def _apply_edits(conn, ids):
+    # Payment received later, a cancellation, an amount correction, a moved
+    # creation time, a printed draft and a deleted bill
+    conn.execute("UPDATE bills SET payment_status = 'paid', payment_date = '2025-03-05 10:00:00' WHERE id = ?", (ids[2],))
+    conn.execute("UPDATE bills SET status = 'cancelled' WHERE id = ?", (ids[1],))
+    conn.execute("UPDATE bills SET total_amount = total_amount + 5 WHERE id = ?", (ids[0],))
+    conn.execute("UPDATE bills SET created_at = '2025-03-04 07:45:00' WHERE id = ?", (ids[3],))
+    conn.execute("UPDATE bills SET status = 'printed' WHERE id = ?", (ids[4],))
+    conn.execute("DELETE FROM bill_items WHERE bill_id = ?", (ids[0],))
+    conn.execute("DELETE FROM bills WHERE id = ?", (ids[0],))
+    conn.commit()
+
+
+def test_bill_summaries_follow_every_change(conn, bills):
+    assert_matches_rebuild(conn, BILL_TABLES)
+    _apply_edits(conn, bills)
+    assert_matches_rebuild(conn, BILL_TABLES)
+
+
+def test_bill_summaries_answer_the_old_queries(conn, bills):
+    _apply_edits(conn, bills)
+    for day in ('2025-03-01', '2025-03-02', '2025-03-04', '2025-03-05'):
+        old = conn.execute('''
+            SELECT COUNT(*), IFNULL(SUM(total_amount), 0),
+                   IFNULL(SUM(CASE WHEN payment_status = 'pending' THEN total_amount END), 0)
+            FROM bills WHERE date(COALESCE(payment_date, created_at)) = ? AND status != 'cancelled'
+        ''', (day,)).fetchone()
+        new = conn.execute('''
+            SELECT IFNULL(SUM(bill_count), 0), IFNULL(SUM(total_amount), 0),
+                   IFNULL(SUM(CASE WHEN payment_status = 'pending' THEN total_amount END), 0)
+            FROM bill_daily_summary WHERE effective_date = ? AND status != 'cancelled'
+        ''', (day,)).fetchone()
+        assert tuple(old) == tuple(new), day
+
+    old = conn.execute('''
+        SELECT date(created_at), CAST(strftime('%H', created_at) AS INTEGER), COUNT(*)
+        FROM bills GROUP BY 1, 2 ORDER BY 1, 2
+    ''').fetchall()
+    new = conn.execute("SELECT created_date, hour, bill_count FROM bill_hourly_summary ORDER BY 1, 2").fetchall()
+    assert [tuple(r) for r in old] == [tuple(r) for r in new]
+
+
+def _edit_items(conn, ids):
+    # Lines added, re-counted, moved to another puja and removed, and a bill re-scheduled
+    conn.execute("INSERT INTO bill_items (bill_id, puja_id, price_snapshot, count, total) VALUES (?, 3, 30, 1, 30)", (ids[3],))
+    conn.execute("UPDATE bill_items SET count = 3, total = 30 WHERE bill_id = ? AND puja_id = 1", (ids[1],))
+    conn.execute("UPDATE bill_items SET puja_id = 1 WHERE bill_id = ? AND puja_id = 3", (ids[2],))
+    conn.execute("DELETE FROM bill_items WHERE bill_id = ? AND puja_id = 2", (ids[1],))
+    conn.execute("UPDATE bills SET scheduled_date = '2025-03-12' WHERE id = ?", (ids[3],))
+    conn.commit()
+
+
+def test_item_summary_follows_every_change(conn, bills):
+    assert_matches_rebuild(conn, ['item_daily_summary'])
+    _edit_items(conn, bills)
+    assert_matches_rebuild(conn, ['item_daily_summary'])
+    _apply_edits(conn, bills)
+    assert_matches_rebuild(conn, ['item_daily_summary'])
+
+
+def test_item_summary_answers_the_old_query(conn, bills):
+    _edit_items(conn, bills)
+    _apply_edits(conn, bills)
+    for start, end in (('2025-03-01', '2025-03-31'), ('2025-03-02', '2025-03-02'), ('2025-03-04', '2025-03-04')):
+        old = conn.execute('''
+            SELECT bi.puja_id, SUM(bi.count), SUM(bi.total)
+            FROM bill_items bi JOIN bills b ON b.id = bi.bill_id
+            WHERE date(b.created_at) BETWEEN ? AND ? AND b.status NOT IN ('cancelled', 'draft')
+            GROUP BY bi.puja_id ORDER BY bi.puja_id
+        ''', (start, end)).fetchall()
+        new = conn.execute('''
+            SELECT puja_id, SUM(item_count), SUM(total_amount) FROM item_daily_summary
+            WHERE bill_date BETWEEN ? AND ? GROUP BY puja_id ORDER BY puja_id
+        ''', (start, end)).fetchall()
+        assert [tuple(r) for r in old] == [tuple(r) for r in new], (start, end)